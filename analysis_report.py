@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Résultats structurés des analyses d'assets inutilisés et leur sortie machine
+Chaque analyse renvoie un Report (enregistrements compacts à __slots__ + résumé) qui peut
+être écrit en JSON, NDJSON ou CSV, enregistrement par enregistrement
+"""
+
+import csv
+import json
+
+FORMATS = ('text', 'json', 'ndjson', 'csv')
+
+
+class AssetUsage:
+    """Fichier CSS ou JS : taille, pages principales qui le chargent"""
+
+    __slots__ = ('path', 'kind', 'size', 'used', 'pages', 'category')
+
+    def __init__(self, path, kind, size, pages, category=None):
+        self.path = path
+        self.kind = kind            # 'css' ou 'js'
+        self.size = size
+        self.used = bool(pages)
+        self.pages = pages
+        self.category = category    # famille de fichier (custom, extracted, webflow...)
+
+
+class PageUsage:
+    """Page HTML : atteinte ou non depuis les racines, catégorie d'orphelin"""
+
+    __slots__ = ('path', 'kind', 'size', 'used', 'depth', 'category', 'safe_to_delete')
+
+    def __init__(self, path, size, depth, category=None, safe_to_delete=False):
+        self.path = path
+        self.kind = 'html'
+        self.size = size
+        self.used = depth is not None
+        self.depth = depth          # liens depuis la racine la plus proche (None : non atteinte)
+        self.category = category
+        self.safe_to_delete = safe_to_delete
+
+
+class Report:
+    """Résultat d'une analyse : enregistrements dans l'ordre du site et résumé chiffré"""
+
+    __slots__ = ('name', 'records', 'summary')
+
+    def __init__(self, name, records, summary):
+        self.name = name
+        self.records = records
+        self.summary = summary
+
+    def unused(self):
+        return [record for record in self.records if not record.used]
+
+
+def record_fields(record):
+    return {field: getattr(record, field) for field in record.__slots__}
+
+
+def write_json(reports, stream):
+    """Objet {analyse: {summary, records}} écrit au fil des enregistrements"""
+    stream.write('{')
+    for index, report in enumerate(reports):
+        stream.write(f'{"," if index else ""}\n  {json.dumps(report.name)}: {{\n    "summary": ')
+        stream.write(json.dumps(report.summary, ensure_ascii=False, sort_keys=True))
+        stream.write(',\n    "records": [')
+        for position, record in enumerate(report.records):
+            stream.write(',' if position else '')
+            stream.write('\n      ' + json.dumps(record_fields(record), ensure_ascii=False))
+        stream.write('\n    ]\n  }')
+    stream.write('\n}\n')
+
+
+def write_ndjson(reports, stream):
+    """Un enregistrement par ligne, puis une ligne de résumé par analyse"""
+    for report in reports:
+        for record in report.records:
+            stream.write(json.dumps({'report': report.name, **record_fields(record)}, ensure_ascii=False) + '\n')
+        stream.write(json.dumps({'report': report.name, 'summary': report.summary},
+                                ensure_ascii=False, sort_keys=True) + '\n')
+
+
+def write_csv(reports, stream):
+    """Une ligne par enregistrement ; colonnes : union des champs, listes jointes par « ; »"""
+    columns = ['report']
+    for report in reports:
+        for record in report.records[:1]:
+            columns += [field for field in record.__slots__ if field not in columns]
+    writer = csv.DictWriter(stream, fieldnames=columns, lineterminator='\n')
+    writer.writeheader()
+    for report in reports:
+        for record in report.records:
+            row = {'report': report.name}
+            for field, value in record_fields(record).items():
+                row[field] = ';'.join(value) if isinstance(value, list) else ('' if value is None else value)
+            writer.writerow(row)
+
+
+WRITERS = {'json': write_json, 'ndjson': write_ndjson, 'csv': write_csv}
+
+
+def write_reports(reports, output_format, stream):
+    WRITERS[output_format](reports, stream)
@@ -0,0 +1,703 @@
+#!/usr/bin/env python3
+"""
+Script pour trouver le JavaScript mort : handlers et timelines GSAP qui ciblent des éléments absents
+Découpe chaque script en instructions, relève les sélecteurs interrogés (querySelector,
+getElementById, $(), gsap.to('.x'), triggers ScrollTrigger, new Swiper) et les compare aux
+ids et classes des pages qui chargent le script
+"""
+
+import argparse
+import bisect
+import re
+
+from analyze_unused_selectors import SAFELIST, is_selector_used
+from asset_graph import SCRIPT, SITE_ROOT, get_asset_graph
+from optimize_scripts import library_globals
+
+# Blancs et commentaires entre deux lexèmes
+SKIP_PATTERN = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+NAME_PATTERN = re.compile(r'[A-Za-z_$][\w$]*')
+NUMBER_PATTERN = re.compile(r'\d[\w.]*|\.\d[\w]*')
+STRING_PATTERN = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+REGEX_PATTERN = re.compile(r'/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-z]*')
+PUNCT_PATTERN = re.compile(r'>>>=|===|!==|\*\*=|<<=|>>=|>>>|\.\.\.|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--'
+                           r'|[-+*/%&|^]=|<<|>>|\*\*|.', re.DOTALL)
+
+# Mots-clés après lesquels un « / » ouvre une regex, et qui ne terminent pas une expression
+KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+            'yield', 'await', 'instanceof', 'const', 'let', 'var', 'if', 'for', 'while', 'function'}
+# Instructions dont le corps { } termine l'instruction
+BLOCK_KEYWORDS = {'if', 'for', 'while', 'function', 'switch', 'try', 'class', 'do', 'with', 'async'}
+CONTINUATIONS = {'else', 'catch', 'finally'}
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+
+# Requêtes DOM : (fonction, résultat) ; 'single' vaut null si absent, 'list' est vide
+QUERIES = {
+    'querySelector': 'single',
+    'closest': 'single',
+    'getElementById': 'single',
+    'querySelectorAll': 'list',
+    'getElementsByClassName': 'list',
+    'getElementsByTagName': 'list',
+}
+JQUERY_NAMES = {'$', 'jQuery'}
+TWEEN_METHODS = {'to', 'from', 'fromTo', 'set'}
+# Appels qui enregistrent un callback : morts si le callback l'est
+REGISTRATIONS = {'addEventListener', 'on', 'setTimeout', 'setInterval', 'requestAnimationFrame'}
+OBSERVERS = {'MutationObserver', 'ResizeObserver', 'IntersectionObserver'}
+HANDLER_NAMES = REGISTRATIONS | OBSERVERS | {'click', 'hover', 'scroll', 'resize'}
+TIMELINE_NAMES = {'gsap', 'ScrollTrigger', 'timeline', 'Swiper'}
+
+
+class DeadCode:
+    """Fragment de script qui ne peut rien faire sur les pages analysées"""
+
+    __slots__ = ('kind', 'start', 'end', 'line', 'selectors')
+
+    def __init__(self, kind, start, end, line, selectors):
+        self.kind = kind            # 'handler', 'timeline' ou 'code'
+        self.start = start          # position dans le source
+        self.end = end
+        self.line = line
+        self.selectors = selectors  # sélecteurs introuvables qui le rendent mort
+
+    @property
+    def size(self):
+        return self.end - self.start
+
+
+class Binding:
+    """Variable issue d'une requête DOM, d'un tween ou d'une fonction"""
+
+    __slots__ = ('dead', 'kind', 'selectors')
+
+    def __init__(self, dead, kind, selectors=()):
+        self.dead = dead
+        self.kind = kind            # 'single', 'list', 'timeline', 'function' ou None
+        self.selectors = list(selectors)
+
+
+LIVE = Binding(False, None)
+
+
+def tokenize(code):
+    """Lexèmes (type, valeur, début, fin, précédé d'un saut de ligne)"""
+    tokens = []
+    position = SKIP_PATTERN.match(code, 0).end()
+    newline = False
+    while position < len(code):
+        char = code[position]
+        if char in '"\'':
+            match = STRING_PATTERN.match(code, position)
+            kind, end = 'string', match.end() if match else len(code)
+            value = code[position + 1:end - 1]
+        elif char == '`':
+            kind, end = 'template', template_end(code, position)
+            value = code[position + 1:end - 1]
+        elif char == '/' and regex_allowed(tokens) and REGEX_PATTERN.match(code, position):
+            kind, end = 'regex', REGEX_PATTERN.match(code, position).end()
+            value = code[position:end]
+        elif NAME_PATTERN.match(code, position):
+            kind, end = 'name', NAME_PATTERN.match(code, position).end()
+            value = code[position:end]
+        elif NUMBER_PATTERN.match(code, position):
+            kind, end = 'number', NUMBER_PATTERN.match(code, position).end()
+            value = code[position:end]
+        else:
+            kind, end = 'punct', PUNCT_PATTERN.match(code, position).end()
+            value = code[position:end]
+        tokens.append((kind, value, position, end, newline))
+
+        skipped = SKIP_PATTERN.match(code, end)
+        newline = '\n' in skipped.group()
+        position = skipped.end()
+    return tokens
+
+
+def template_end(code, start):
+    """Fin d'un gabarit `...${...}...`, expressions imbriquées comprises"""
+    index = start + 1
+    while index < len(code):
+        char = code[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '`':
+            return index + 1
+        if code.startswith('${', index):
+            depth = 1
+            index += 2
+            while index < len(code) and depth:
+                char = code[index]
+                if char == '`':
+                    index = template_end(code, index)
+                    continue
+                if char in '"\'':
+                    match = STRING_PATTERN.match(code, index)
+                    index = match.end() if match else index + 1
+                    continue
+                depth += (char == '{') - (char == '}')
+                index += 1
+            continue
+        index += 1
+    return len(code)
+
+
+def regex_allowed(tokens):
+    if not tokens:
+        return True
+    kind, value = tokens[-1][:2]
+    if kind == 'name':
+        return value in KEYWORDS
+    return kind == 'punct' and value not in (')', ']', '}')
+
+
+def match_brackets(tokens):
+    """Indice du lexème fermant de chaque parenthèse, crochet ou accolade"""
+    matching = {}
+    stack = []
+    for index, (kind, value, *_) in enumerate(tokens):
+        if kind != 'punct':
+            continue
+        if value in OPENERS:
+            stack.append(index)
+        elif value in (')', ']', '}'):
+            # Tolère un source mal équilibré : on dépile jusqu'à l'ouvrant correspondant
+            while stack and OPENERS[tokens[stack[-1]][1]] != value:
+                matching[stack.pop()] = index
+            if stack:
+                matching[stack.pop()] = index
+    for index in stack:
+        matching[index] = len(tokens) - 1
+    return matching
+
+
+def selector_absent(selector, names, safelist):
+    """Aucune partie du sélecteur ne peut trouver d'élément (gabarits dynamiques : présents)"""
+    if '${' in selector or not selector.strip():
+        return False
+    return not any(is_selector_used(part.strip(), names, safelist)
+                   for part in selector.split(',') if part.strip())
+
+
+class ScriptAnalysis:
+    """Analyse d'un script pour un ensemble de noms (ids, classes, balises) et d'URL de pages"""
+
+    def __init__(self, code, tokens, names, safelist, page_paths):
+        self.code = code
+        self.tokens = tokens
+        self.matching = match_brackets(tokens)
+        self.names = names
+        self.safelist = safelist
+        self.page_paths = page_paths
+        self.lines = [index for index, char in enumerate(code) if char == '\n']
+        self.queried = set()
+        self.missing = set()
+
+    # --- lexèmes
+
+    def value(self, index):
+        return self.tokens[index][1] if 0 <= index < len(self.tokens) else None
+
+    def kind(self, index):
+        return self.tokens[index][0] if 0 <= index < len(self.tokens) else None
+
+    def is_punct(self, index, value):
+        return self.kind(index) == 'punct' and self.value(index) == value
+
+    def close(self, index):
+        return self.matching.get(index, index)
+
+    def absent(self, selector):
+        self.queried.add(selector)
+        if selector_absent(selector, self.names, self.safelist):
+            self.missing.add(selector)
+            return True
+        return False
+
+    # --- découpage en instructions
+
+    def is_code_block(self, index, start):
+        """Une accolade ouvre-t-elle un bloc de code (et pas un objet littéral) ?"""
+        if index == start:
+            return True
+        previous = self.tokens[index - 1]
+        if previous[0] == 'punct':
+            return previous[1] in (')', '=>')
+        return previous[1] in ('else', 'try', 'finally', 'do') or self.value(start) == 'class'
+
+    def split_statements(self, low, high):
+        statements = []
+        start = index = low
+        while index < high:
+            kind, value, _, _, newline = self.tokens[index]
+            if index > start and newline and self.ends_expression(index - 1) and self.starts_statement(index):
+                statements.append((start, index))
+                start = index
+            if kind == 'punct' and value in OPENERS:
+                block = value == '{' and self.is_code_block(index, start)
+                index = self.close(index) + 1
+                lead = self.value(start + 1) if self.value(start) == 'async' else self.value(start)
+                if block and (lead in BLOCK_KEYWORDS or index - 1 == self.close(start)) \
+                        and self.value(index) not in CONTINUATIONS \
+                        and not (lead == 'do' and self.value(index) == 'while') and index < high:
+                    statements.append((start, index))
+                    start = index
+                continue
+            index += 1
+            if kind == 'punct' and value == ';':
+                statements.append((start, index))
+                start = index
+        if start < high:
+            statements.append((start, high))
+        return [(s, e) for s, e in statements if not (e - s == 1 and self.is_punct(s, ';'))]
+
+    def ends_expression(self, index):
+        kind, value = self.tokens[index][:2]
+        if kind == 'name':
+            return value not in KEYWORDS
+        return kind != 'punct' or value in (')', ']', '}')
+
+    def starts_statement(self, index):
+        kind, value = self.tokens[index][:2]
+        return kind == 'name' and value not in CONTINUATIONS and value not in ('instanceof', 'in', 'of')
+
+    def code_blocks(self, start, end):
+        """Blocs de code d'une instruction, sans descendre dans les blocs trouvés"""
+        blocks = []
+        index = start
+        while index < end:
+            if self.is_punct(index, '{') and self.is_code_block(index, start):
+                blocks.append((index + 1, self.close(index)))
+                index = self.close(index) + 1
+            else:
+                index += 1
+        return blocks
+
+    # --- expressions
+
+    def call_triggers(self, open_index):
+        """Sélecteurs `trigger: '...'` dans les arguments d'un appel"""
+        triggers = []
+        for index in range(open_index + 1, self.close(open_index)):
+            if (self.value(index) in ('trigger', 'endTrigger', 'pin') and self.is_punct(index + 1, ':')
+                    and self.kind(index + 2) == 'string' and self.value(index + 2)):
+                triggers.append(self.value(index + 2))
+        return triggers
+
+    def static_string(self, index):
+        """Chaîne littérale passée seule en argument (pas de concaténation)"""
+        if self.kind(index) == 'string' and self.value(index + 1) in (')', ','):
+            return self.value(index)
+        return None
+
+    def query(self, kind, selectors, dead_binding=None):
+        missing = [s for s in selectors if self.absent(s)]
+        dead = bool(missing) or bool(dead_binding and dead_binding.dead)
+        if dead_binding and dead_binding.dead:
+            missing = missing + dead_binding.selectors
+        return Binding(dead, kind, missing)
+
+    def tween(self, open_index, kind, bindings):
+        """gsap.to(cible, { scrollTrigger: { trigger } }) : mort si la cible ou un trigger manque"""
+        target = self.static_string(open_index + 1)
+        selectors = [target] if target else []
+        binding = bindings.get(self.value(open_index + 1)) if self.kind(open_index + 1) == 'name' else None
+        return self.query(kind, selectors + self.call_triggers(open_index), binding)
+
+    def expression(self, index, bindings):
+        """Binding de l'expression qui commence à index, ou None si elle n'est pas reconnue"""
+        value = self.value(index)
+        if value == 'new' and self.value(index + 1) == 'Swiper' and self.is_punct(index + 2, '('):
+            selector = self.static_string(index + 3)
+            return self.query('single', [selector] if selector else [])
+        if value == 'new' and self.value(index + 1) in OBSERVERS and self.is_punct(index + 2, '('):
+            callback = bindings.get(self.value(index + 3))
+            if callback and callback.kind == 'function' and callback.dead:
+                return Binding(True, 'single', callback.selectors)
+            return None
+        if value in JQUERY_NAMES and self.is_punct(index + 1, '('):
+            selector = self.static_string(index + 2)
+            if selector and not selector.lstrip().startswith('<'):
+                return self.chain(index + 1, self.query('list', [selector]), bindings)
+            return None
+        if value in REGISTRATIONS - {'on'} and self.is_punct(index + 1, '('):
+            return self.registration(index + 1, bindings)
+        if self.kind(index) != 'name' or not self.is_punct(index + 1, '.'):
+            binding = bindings.get(value) if self.kind(index) == 'name' else None
+            return binding if binding and binding.dead else None
+
+        method = self.value(index + 2)
+        open_index = index + 3
+        if not self.is_punct(open_index, '('):
+            binding = bindings.get(value)
+            return binding if binding and binding.dead else None
+        owner = bindings.get(value)
+        if value == 'gsap' and method in TWEEN_METHODS:
+            return self.chain(open_index, self.tween(open_index, 'timeline', bindings), bindings, tween=True)
+        if (value == 'gsap' and method == 'timeline') or (value == 'ScrollTrigger' and method == 'create'):
+            return self.chain(open_index, self.query('timeline', self.call_triggers(open_index)), bindings)
+        if owner is not None and owner.kind == 'timeline' and method in TWEEN_METHODS:
+            if owner.dead:
+                return owner
+            return self.chain(open_index, self.tween(open_index, 'timeline', bindings), bindings, tween=True)
+        if method in QUERIES:
+            selector = self.static_string(open_index + 1)
+            if selector is None:
+                return owner if owner and owner.dead else None
+            if method == 'getElementById':
+                selector = '#' + selector.strip()
+            elif method == 'getElementsByClassName':
+                selector = '.' + '.'.join(selector.split())
+            scoped = owner if value not in ('document', 'window') else None
+            return self.chain(open_index, self.query(QUERIES[method], [selector], scoped), bindings)
+        if method in REGISTRATIONS:
+            registered = self.registration(open_index, bindings)
+            if registered is not None:
+                return registered
+        if owner is not None and owner.dead:
+            return owner
+        return None
+
+    def chain(self, open_index, binding, bindings, tween=False):
+        """Suite d'appels chaînés `.x(...)` : une timeline reste vivante tant qu'une étape l'est
+
+        Si binding est lui-même un tween (`gsap.to(...)`, `tl.to(...)`), c'est la
+        première étape : sa cible absente ne tue pas les étapes suivantes.
+        """
+        index = self.close(open_index) + 1
+        steps = [binding]
+        while self.is_punct(index, '.') and self.is_punct(index + 2, '('):
+            if binding.kind == 'timeline' and self.value(index + 1) in TWEEN_METHODS:
+                steps.append(self.tween(index + 2, 'timeline', bindings))
+            index = self.close(index + 2) + 1
+        if len(steps) == 1 or (binding.dead and not tween):
+            return binding
+        dead = all(step.dead for step in steps[int(not tween):])
+        return Binding(dead, 'timeline', [s for step in steps for s in step.selectors] if dead else [])
+
+    def registration(self, open_index, bindings):
+        """addEventListener('x', fn) / setTimeout(fn) : mort si fn est une fonction morte"""
+        for index in (open_index + 1, open_index + 3):
+            callback = bindings.get(self.value(index))
+            if (self.kind(index) == 'name' and callback and callback.kind == 'function'
+                    and self.value(index + 1) in (')', ',')):
+                return Binding(callback.dead, None, callback.selectors) if callback.dead else None
+        return None
+
+    # --- conditions
+
+    def split_operator(self, low, high, operator):
+        parts = []
+        start = index = low
+        while index < high:
+            if self.kind(index) == 'punct' and self.value(index) in OPENERS:
+                index = self.close(index) + 1
+                continue
+            if self.is_punct(index, operator):
+                parts.append((start, index))
+                start = index + 1
+            index += 1
+        parts.append((start, high))
+        return parts
+
+    def pathname_test(self, low, high):
+        """location.pathname.includes('x') évalué sur les URL des pages"""
+        index = low + 2 if self.value(low) == 'window' and self.is_punct(low + 1, '.') else low
+        expected = ['location', '.', 'pathname', '.', 'includes', '(']
+        if [self.value(i) for i in range(index, index + 6)] == expected and high == index + 8:
+            needle = self.static_string(index + 6)
+            if needle is not None:
+                return any(needle in path for path in self.page_paths)
+        return None
+
+    def falsy_factor(self, low, high, bindings):
+        """Facteur d'une condition toujours faux ici : (sélecteurs en cause) ou None"""
+        while self.is_punct(low, '(') and self.close(low) == high - 1:
+            low, high = low + 1, high - 1
+        if low >= high or self.is_punct(low, '!'):
+            return None
+        if self.pathname_test(low, high) is False:
+            return []
+        binding = self.expression(low, bindings)
+        if binding is None or not binding.dead:
+            return None
+        # Une liste vide reste vraie : seul `liste.length` (ou autre propriété) est faux
+        if binding.kind == 'list' and high - low == 1:
+            return None
+        return binding.selectors
+
+    def falsy_condition(self, low, high, bindings):
+        selectors = []
+        for or_low, or_high in self.split_operator(low, high, '||'):
+            found = None
+            for and_low, and_high in self.split_operator(or_low, or_high, '&&'):
+                found = self.falsy_factor(and_low, and_high, bindings)
+                if found is not None:
+                    break
+            if found is None:
+                return None
+            selectors += found
+        return selectors
+
+    def guard(self, low, high, bindings):
+        """`if (!a || !b) return;` : sélecteurs si la garde se déclenche ici"""
+        for or_low, or_high in self.split_operator(low, high, '||'):
+            if self.is_punct(or_low, '!'):
+                found = self.falsy_factor(or_low + 1, or_high, bindings)
+                if found is not None:
+                    return found
+        return None
+
+    # --- instructions
+
+    def block(self, low, high, bindings):
+        """Analyse une suite d'instructions : (toutes mortes ?, fragments morts)"""
+        bindings = dict(bindings)
+        results = []  # (début, fin, mort, neutre, sélecteurs, genre)
+        units = []
+        statements = self.split_statements(low, high)
+        for position, (start, end) in enumerate(statements):
+            outcome = self.statement(start, end, bindings)
+            if outcome[0] == 'guard':
+                # Tout le reste du bloc ne s'exécute pas
+                guard_selectors = outcome[1]
+                for rest_start, rest_end in statements[position:]:
+                    results.append((rest_start, rest_end, True, False, guard_selectors, None))
+                break
+            dead, neutral, selectors, kind, inner = outcome
+            results.append((start, end, dead, neutral, selectors, kind))
+            units += inner
+
+        all_dead = any(r[2] for r in results) and all(r[2] or r[3] for r in results)
+        run = []
+        for result in results + [None]:
+            if result is not None and result[2]:
+                run.append(result)
+                continue
+            if run:
+                units.append(self.unit(run[0][0], run[-1][1], [s for r in run for s in r[4]],
+                                       next((r[5] for r in run if r[5]), None)))
+                run = []
+        return all_dead, units
+
+    def unit(self, start, end, selectors, kind=None):
+        start_offset = self.tokens[start][2]
+        end_offset = self.tokens[end - 1][3]
+        if kind is None:
+            values = {self.tokens[i][1] for i in range(start, end)}
+            kind = 'timeline' if values & TIMELINE_NAMES else 'handler' if values & HANDLER_NAMES else 'code'
+        line = bisect.bisect_left(self.lines, start_offset) + 1
+        return DeadCode(kind, start_offset, end_offset, line, sorted(set(selectors)))
+
+    def statement(self, start, end, bindings):
+        """('guard', sélecteurs) ou (mort, neutre, sélecteurs, genre, fragments morts internes)"""
+        value = self.value(start)
+
+        if value == 'if' and self.is_punct(start + 1, '('):
+            return self.if_statement(start, end, bindings)
+
+        lead = start + 1 if value == 'async' else start
+        if self.value(lead) == 'function' and self.kind(lead + 1) == 'name':
+            name = self.value(lead + 1)
+            blocks = self.code_blocks(start, end)
+            if blocks:
+                body_dead, inner = self.block(*blocks[0], bindings)
+                selectors = [s for unit in inner for s in unit.selectors]
+                bindings[name] = Binding(body_dead, 'function', selectors)
+                if body_dead:
+                    return True, False, selectors, None, []
+                return False, False, [], None, inner
+            return False, False, [], None, []
+
+        declared = None
+        index = start
+        if value in ('const', 'let', 'var') and self.kind(start + 1) == 'name' and self.is_punct(start + 2, '='):
+            declared, index = self.value(start + 1), start + 3
+        elif self.kind(start) == 'name' and value not in KEYWORDS and self.is_punct(start + 1, '='):
+            declared, index = value, start + 2
+        elif value == 'window' and self.is_punct(start + 1, '.') and self.is_punct(start + 3, '='):
+            declared, index = self.value(start + 2), start + 4
+
+        binding = self.expression(index, bindings) if value not in KEYWORDS or declared else None
+        if binding is not None and binding.dead:
+            if declared:
+                bindings[declared] = binding
+            kind = 'timeline' if binding.kind == 'timeline' else None
+            return True, False, binding.selectors, kind, []
+
+        # Instruction vivante : ses blocs (callbacks, corps de fonction) peuvent être morts
+        blocks = self.code_blocks(start, end)
+        inner = []
+        blocks_dead = bool(blocks)
+        for block_low, block_high in blocks:
+            block_dead, units = self.block(block_low, block_high, bindings)
+            blocks_dead = blocks_dead and block_dead
+            inner += units
+        selectors = [s for unit in inner for s in unit.selectors]
+
+        if declared:
+            if blocks_dead and binding is None and self.is_function_expression(index):
+                bindings[declared] = Binding(True, 'function', selectors)
+                return True, False, selectors, None, []
+            if binding is None and self.is_function_expression(index):
+                binding = Binding(False, 'function')
+            bindings[declared] = binding or LIVE
+            neutral = binding is not None and binding.kind in ('single', 'list', 'timeline')
+            return False, neutral, [], None, inner
+
+        if blocks_dead and self.is_wrapper(start, end):
+            return True, False, selectors, None, []
+        return False, False, [], None, inner
+
+    def is_function_expression(self, index):
+        if self.value(index) in ('function', 'async'):
+            return True
+        if self.is_punct(index, '('):
+            return self.is_punct(self.close(index) + 1, '=>')
+        return self.kind(index) == 'name' and self.is_punct(index + 1, '=>')
+
+    def is_wrapper(self, start, end):
+        """Instruction qui ne fait qu'enregistrer ou exécuter ses blocs (callbacks, IIFE)"""
+        values = {self.tokens[i][1] for i in range(start, end)}
+        return bool(values & (REGISTRATIONS | {'forEach', 'each'})) or self.value(start) in ('(', '!')
+
+    def if_statement(self, start, end, bindings):
+        condition_end = self.close(start + 1)
+        then_start = condition_end + 1
+        if self.is_punct(then_start, '{'):
+            then_end = self.close(then_start) + 1
+            then_low, then_high = then_start + 1, then_end - 1
+        else:
+            then_end = then_start
+            while then_end < end and not self.is_punct(then_end, ';'):
+                then_end = self.close(then_end) + 1 if self.value(then_end) in OPENERS else then_end + 1
+            then_end = min(then_end + 1, end)
+            then_low, then_high = then_start, then_end
+        else_start = then_end + 1 if self.value(then_end) == 'else' else None
+
+        if else_start is None and self.value(then_low) in ('return', 'continue', 'break'):
+            selectors = self.guard(start + 2, condition_end, bindings)
+            if selectors is not None:
+                return 'guard', selectors
+
+        falsy = self.falsy_condition(start + 2, condition_end, bindings)
+        inner = []
+        if falsy is not None:
+            if else_start is None:
+                return True, False, falsy, None, []
+            inner.append(self.unit(then_start, then_end, falsy))
+            else_dead, units = self.block(else_start, end, bindings)
+            return False, False, [], None, inner + units
+
+        then_dead, units = self.block(then_low, then_high, bindings)
+        inner += units
+        if else_start is not None:
+            else_dead, units = self.block(else_start, end, bindings)
+            inner += units
+            then_dead = then_dead and else_dead
+        if then_dead:
+            return True, False, [s for unit in inner for s in unit.selectors], None, []
+        return False, False, [], None, inner
+
+    def run(self):
+        _, units = self.block(0, len(self.tokens), {})
+        return sorted(units, key=lambda unit: unit.start)
+
+
+def page_paths(pages):
+    """URL sous lesquelles une page peut être servie"""
+    paths = []
+    for page in pages:
+        paths += ['/' + page, '/' + page[:-len('.html')] if page.endswith('.html') else '/' + page]
+        if page == 'index.html':
+            paths.append('/')
+    return paths
+
+
+def find_dead_code(code, names, safelist, pages, tokens=None):
+    """Fragments morts d'un script et (sélecteurs interrogés, sélecteurs introuvables)"""
+    analysis = ScriptAnalysis(code, tokens if tokens is not None else tokenize(code), names,
+                              safelist, page_paths(pages))
+    units = analysis.run()
+    return units, analysis.queried, analysis.missing
+
+
+def script_pages(graph):
+    """Scripts locaux lisibles (hors bibliothèques connues) et pages qui les chargent"""
+    loaded = {}
+    for page in graph.pages():
+        for script in graph.references(page, SCRIPT):
+            if graph.exists(script) and script.endswith('.js') and library_globals(script) is None:
+                loaded.setdefault(script, []).append(page)
+    return loaded
+
+
+def html_names(graph, pages):
+    """Ids, classes et balises du HTML seul : les chaînes des scripts ne prouvent pas l'élément"""
+    names = set()
+    for page in pages:
+        names.update(graph.names.get(page, ()))
+    return names
+
+
+def analyze_dead_js(graph=None, per_page=False, safelist=SAFELIST):
+    """Analyse le code JavaScript qui cible des éléments absents des pages"""
+
+    if graph is None:
+        graph = get_asset_graph()
+    safelist_pattern = re.compile('|'.join(safelist) or r'(?!)')
+
+    targets = []
+    for script, pages in sorted(script_pages(graph).items()):
+        if per_page:
+            targets += [(script, [page]) for page in pages]
+        else:
+            targets.append((script, pages))
+
+    print("🔍 Analyse du JavaScript mort :")
+
+    totals = {'handler': 0, 'timeline': 0, 'code': 0}
+    dead_bytes = 0
+    total_bytes = 0
+    tokens_cache = {}
+    for script, pages in targets:
+        if script not in tokens_cache:
+            with open(f'{graph.root}/{script}', 'r', encoding='utf-8', errors='replace') as f:
+                code = f.read()
+            tokens_cache[script] = (code, tokenize(code))
+        code, tokens = tokens_cache[script]
+
+        units, queried, missing = find_dead_code(code, html_names(graph, pages), safelist_pattern,
+                                                 pages, tokens)
+        size = len(code.encode('utf-8'))
+        dead = sum(unit.size for unit in units)
+        total_bytes += size
+        dead_bytes += dead
+
+        label = pages[0] if per_page else f"{len(pages)} page(s)"
+        print(f"\n📄 {script} ({label}) : {len(queried)} sélecteurs, {len(missing)} introuvables")
+        for unit in units:
+            totals[unit.kind] += 1
+            selectors = ', '.join(unit.selectors) or 'page non concernée'
+            print(f"   💀 l.{unit.line:<4} {unit.kind:<8} {selectors} ({unit.size/1024:.1f} KB)")
+        if units:
+            print(f"   📊 {dead/1024:.1f} KB morts sur {size/1024:.1f} KB ({dead / size:.0%})")
+
+    print(f"\n📊 Résumé :")
+    print(f"   Scripts analysés : {len(targets)}")
+    print(f"   Handlers morts : {totals['handler']}")
+    print(f"   Timelines mortes : {totals['timeline']}")
+    print(f"   Autres fragments morts : {totals['code']}")
+    print(f"\n💾 Code mort : {dead_bytes/1024:.1f} KB sur {total_bytes/1024:.1f} KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse le JavaScript qui cible des éléments absents")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--per-page', action='store_true',
+                        help="analyser chaque script pour chaque page qui le charge")
+    parser.add_argument('--safelist', nargs='*', default=SAFELIST,
+                        help="regex de classes à toujours considérer présentes")
+    args = parser.parse_args()
+
+    analyze_dead_js(get_asset_graph(args.root), args.per_page, args.safelist)
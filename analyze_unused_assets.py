@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script pour lancer les trois analyses (CSS, JS, HTML) sur un seul graphe
+Le site n'est lu qu'une seule fois pour l'audit complet
+"""
+
+import argparse
+import sys
+
+from analysis_report import FORMATS, write_reports
+from analyze_unused_css import analyze_unused_css
+from analyze_unused_html import analyze_unused_html
+from analyze_unused_js import analyze_unused_js
+from asset_graph import SITE_ROOT, get_asset_graph
+
+ANALYSES = [
+    ('css', '🎨 CSS', analyze_unused_css),
+    ('js', '⚙️  JavaScript', analyze_unused_js),
+    ('html', '📄 HTML', analyze_unused_html),
+]
+
+def analyze_unused_assets(graph=None, only=None, quiet=False):
+    """Analyse les fichiers CSS, JS et HTML inutilisés en une seule passe"""
+    
+    if graph is None:
+        graph = get_asset_graph()
+    
+    reports = []
+    for name, title, analyze in ANALYSES:
+        if only and name not in only:
+            continue
+        if not quiet:
+            print(("\n" if reports else "") + "=" * 60)
+            print(title)
+            print("=" * 60)
+        reports.append(analyze(graph, quiet=quiet))
+    return reports
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse les fichiers CSS, JS et HTML inutilisés")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--only', nargs='+', choices=[name for name, _, _ in ANALYSES],
+                        help="analyses à lancer (défaut : toutes)")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="sortie lisible (défaut) ou machine")
+    parser.add_argument('--output', default=None,
+                        help="fichier où écrire la sortie machine (défaut : sortie standard)")
+    args = parser.parse_args()
+
+    machine = args.format != 'text'
+    reports = analyze_unused_assets(get_asset_graph(args.root), args.only, quiet=machine)
+    if machine:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                write_reports(reports, args.format, f)
+        else:
+            write_reports(reports, args.format, sys.stdout)
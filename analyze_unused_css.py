@@ -3,86 +3,88 @@
 Script pour analyser les fichiers CSS inutilisés
 """
 
-import os
-import glob
-import re
+import argparse
+import sys
 
-def analyze_unused_css():
-    """Analyse les fichiers CSS inutilisés"""
-    
-    # Lister tous les fichiers CSS
-    css_files = []
-    for css_file in glob.glob('www.victorberbel.work/css/*.css'):
-        css_files.append(os.path.basename(css_file))
+from analysis_report import FORMATS, AssetUsage, Report, write_reports
+from asset_graph import MAIN_PAGES, SITE_ROOT, STYLESHEET, get_asset_graph
+
+def find_unused_css(graph, pages=MAIN_PAGES):
+    """Un enregistrement par fichier CSS avec les pages principales qui le chargent"""
     
-    print("📁 Fichiers CSS trouvés :")
-    for css in sorted(css_files):
-        print(f"   - {css}")
+    loaded_by = {}
+    for page in pages:
+        if not graph.exists(page):
+            continue
+        for css in graph.references(page, STYLESHEET):
+            if css.startswith('css/'):
+                loaded_by.setdefault(css, []).append(page)
     
-    # Lister les pages principales
-    main_pages = [
-        'www.victorberbel.work/index.html',
-        'www.victorberbel.work/services.html',
-        'www.victorberbel.work/work.html', 
-        'www.victorberbel.work/about.html',
-        'www.victorberbel.work/contact.html'
-    ]
+    records = [AssetUsage(css, 'css', graph.size(css), loaded_by.get(css, []))
+               for css in sorted(graph.files(directory='css', extension='.css'))]
+    unused = [record for record in records if not record.used]
+    summary = {
+        'total': len(records),
+        'used': sum(record.used for record in records),
+        'unused': len(unused),
+        'missing': sorted(css for css in loaded_by if not graph.exists(css)),
+        'reclaimable_bytes': sum(record.size for record in unused),
+    }
+    return Report('css', records, summary)
+
+def print_unused_css(graph, report, pages=MAIN_PAGES):
+    """Affiche le rapport CSS lisible"""
     
-    # Analyser les références CSS dans chaque page
-    used_css = set()
+    print("📁 Fichiers CSS trouvés :")
+    for record in report.records:
+        print(f"   - {record.path[len('css/'):]}")
     
     print("\n🔍 Analyse des références CSS :")
     
-    for page in main_pages:
-        if not os.path.exists(page):
+    for page in pages:
+        if not graph.exists(page):
             continue
             
-        page_name = os.path.basename(page)
-        print(f"\n📄 {page_name} :")
-        
-        with open(page, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Chercher toutes les références CSS
-        css_refs = re.findall(r'href="css/([^"]+\.css)"', content)
-        
-        for css_ref in css_refs:
-            used_css.add(css_ref)
-            print(f"   ✅ {css_ref}")
-    
-    # Identifier les fichiers inutilisés
-    unused_css = []
-    for css_file in css_files:
-        if css_file not in used_css:
-            unused_css.append(css_file)
+        print(f"\n📄 {page} :")
+        for css_ref in graph.references(page, STYLESHEET):
+            if css_ref.startswith('css/'):
+                print(f"   ✅ {css_ref[len('css/'):]}")
     
+    summary = report.summary
     print(f"\n📊 Résumé :")
-    print(f"   Total CSS : {len(css_files)}")
-    print(f"   CSS utilisés : {len(used_css)}")
-    print(f"   CSS inutilisés : {len(unused_css)}")
+    print(f"   Total CSS : {summary['total']}")
+    # Le texte compte aussi les fichiers référencés mais absents
+    print(f"   CSS utilisés : {summary['used'] + len(summary['missing'])}")
+    print(f"   CSS inutilisés : {summary['unused']}")
     
+    unused_css = report.unused()
     if unused_css:
         print(f"\n🗑️  Fichiers CSS inutilisés :")
-        for css in sorted(unused_css):
-            # Calculer la taille du fichier
-            file_path = f'www.victorberbel.work/css/{css}'
-            if os.path.exists(file_path):
-                size = os.path.getsize(file_path)
-                size_kb = size / 1024
-                print(f"   ❌ {css} ({size_kb:.1f} KB)")
-            else:
-                print(f"   ❌ {css} (fichier non trouvé)")
+        for record in unused_css:
+            print(f"   ❌ {record.path[len('css/'):]} ({record.size/1024:.1f} KB)")
         
-        # Calculer l'espace total récupérable
-        total_size = 0
-        for css in unused_css:
-            file_path = f'www.victorberbel.work/css/{css}'
-            if os.path.exists(file_path):
-                total_size += os.path.getsize(file_path)
-        
-        print(f"\n💾 Espace récupérable : {total_size/1024:.1f} KB")
+        print(f"\n💾 Espace récupérable : {summary['reclaimable_bytes']/1024:.1f} KB")
     else:
         print(f"\n✅ Aucun fichier CSS inutilisé trouvé !")
 
+def analyze_unused_css(graph=None, pages=MAIN_PAGES, quiet=False):
+    """Analyse les fichiers CSS inutilisés et renvoie le rapport structuré"""
+    
+    if graph is None:
+        graph = get_asset_graph()
+    
+    report = find_unused_css(graph, pages)
+    if not quiet:
+        print_unused_css(graph, report, pages)
+    return report
+
 if __name__ == "__main__":
-    analyze_unused_css()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyse les fichiers CSS inutilisés")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="sortie lisible (défaut) ou machine sur la sortie standard")
+    args = parser.parse_args()
+
+    report = analyze_unused_css(get_asset_graph(args.root), quiet=args.format != 'text')
+    if args.format != 'text':
+        write_reports([report], args.format, sys.stdout)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Script pour analyser les polices inutilisées
+Associe chaque @font-face aux couples font-family / font-weight réellement utilisés,
+puis réduit les polices utilisées aux caractères du site (WOFF2, si fontTools est installé)
+"""
+
+import argparse
+import os
+import posixpath
+import re
+from html.parser import HTMLParser
+
+try:
+    from fontTools import subset
+except ImportError:
+    subset = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from analyze_unused_selectors import SAFELIST, is_selector_used
+from asset_graph import CSS_URL_PATTERN, STYLESHEET, get_asset_graph, normalize_reference
+from clean_pages import TOKEN_PATTERN
+from css_parser import AtRule, Rule, parse_css
+from minify_assets import split_declarations
+
+FONT_EXTENSIONS = ('.otf', '.ttf', '.woff', '.woff2')
+WEIGHT_KEYWORDS = {'normal': 400, 'bold': 700}
+# Feuille de style par défaut du navigateur : ces balises sont en gras
+BOLD_TAGS = {'b', 'strong', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'th'}
+
+# Jeu de caractères toujours conservé : le contenu injecté par le CMS n'est pas
+# dans les pages statiques (latin de base, latin-1, ponctuation typographique)
+FALLBACK_UNICODES = (list(range(0x20, 0x7f)) + list(range(0xa0, 0x100))
+                     + [0x2013, 0x2014, 0x2018, 0x2019, 0x201c, 0x201d, 0x2022, 0x2026, 0x20ac])
+
+VAR_PATTERN = re.compile(r'var\(\s*(--[\w-]+)\s*(?:,\s*([^()]*))?\)')
+STYLE_ATTR_PATTERN = re.compile(r'\sstyle\s*=\s*"([^"]*)"', re.IGNORECASE)
+FONT_SIZE_PATTERN = re.compile(r'^(?:[\d.]+(?:px|em|rem|%|pt|vw|vh|ch)(?:/\S+)?'
+                               r'|(?:xx?-)?(?:small|large)|medium|smaller|larger)$')
+TEXT_ATTRIBUTES = ('alt', 'title', 'placeholder', 'value', 'aria-label')
+# Polices écrites par subset_font : des sorties, pas des polices inutilisées
+SUBSET_PATTERN = re.compile(r'-subset\.woff2?$')
+
+
+class FontFace:
+    """Déclaration @font-face"""
+
+    __slots__ = ('family', 'weights', 'style', 'sources')
+
+    def __init__(self, family, weights, style, sources):
+        self.family = family      # nom en minuscules, sans guillemets
+        self.weights = weights    # (min, max) : une graisse ou une plage variable
+        self.style = style        # 'normal', 'italic'...
+        self.sources = sources    # fichiers locaux (chemins relatifs au site)
+
+
+class TextParser(HTMLParser):
+    """Texte visible d'une page (hors <script> et <style>)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chars = set()
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self.skip += 1
+        for name, value in attrs:
+            if name in TEXT_ATTRIBUTES and value:
+                self.chars.update(value)
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self.skip:
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.chars.update(data)
+
+
+def unquote(value):
+    return value.strip().strip('"\'').strip()
+
+
+def resolve_vars(value, variables, depth=0):
+    """Valeurs possibles d'une valeur CSS après substitution des var()"""
+    match = VAR_PATTERN.search(value)
+    if not match or depth > 10:
+        return {value}
+    options = variables.get(match.group(1)) or ({match.group(2)} if match.group(2) else set())
+    results = set()
+    for option in options:
+        replaced = value[:match.start()] + option + value[match.end():]
+        results.update(resolve_vars(replaced, variables, depth + 1))
+    return results
+
+
+def parse_weight(value):
+    value = value.strip().lower()
+    if value in WEIGHT_KEYWORDS:
+        return WEIGHT_KEYWORDS[value]
+    return int(float(value)) if re.fullmatch(r'\d+(?:\.\d+)?', value) else None
+
+
+def parse_font_shorthand(value):
+    """'italic 700 16px/1.2 "PP Neue Montreal", sans-serif' -> (familles, graisse)"""
+    tokens = value.split()
+    for index, token in enumerate(tokens):
+        if FONT_SIZE_PATTERN.match(token.lower()):
+            weights = [parse_weight(t) for t in tokens[:index]]
+            weight = next((w for w in weights if w), None)
+            return ' '.join(tokens[index + 1:]), weight
+    return None, None
+
+
+def match_weight(desired, faces):
+    """Face choisie par l'algorithme de correspondance CSS Fonts pour une graisse"""
+    def distance(face):
+        low, high = face.weights
+        if low <= desired <= high:
+            return (0, 0)
+        weight = low if low > desired else high
+        if 400 <= desired <= 500:
+            # D'abord jusqu'à 500, puis en dessous, puis au-dessus de 500
+            if desired < weight <= 500:
+                return (1, weight - desired)
+            if weight < desired:
+                return (2, desired - weight)
+            return (3, weight - desired)
+        if desired < 400:
+            return (1, desired - weight) if weight < desired else (2, weight - desired)
+        return (1, weight - desired) if weight > desired else (2, desired - weight)
+
+    return min(faces, key=distance) if faces else None
+
+
+def collect_css(graph, pages):
+    """(source, règles) des feuilles de style locales et des <style> inline des pages"""
+    sources = []
+    stylesheets = []
+    for page in pages:
+        for css in graph.references(page, STYLESHEET):
+            if graph.exists(css) and css not in stylesheets:
+                stylesheets.append(css)
+
+    for css in stylesheets:
+        with open(os.path.join(graph.root, css), 'r', encoding='utf-8', errors='replace') as f:
+            sources.append((css, parse_css(f.read())))
+
+    for page in pages:
+        with open(os.path.join(graph.root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+        for match in TOKEN_PATTERN.finditer(content):
+            if (match.group('tag') or '').lower() == 'style':
+                sources.append((page, parse_css(match.group('content'))))
+        # Les attributs style="" s'appliquent toujours
+        inline = ';'.join(STYLE_ATTR_PATTERN.findall(content))
+        if inline:
+            sources.append((page, [Rule('*', inline)]))
+    return sources
+
+
+def iter_rules(nodes):
+    for node in nodes:
+        if isinstance(node, Rule):
+            yield node
+        elif isinstance(node, AtRule) and node.children is not None:
+            yield from iter_rules(node.children)
+
+
+def find_font_faces(sources):
+    """@font-face distincts : une même déclaration répétée dans plusieurs feuilles n'est gardée qu'une fois"""
+    faces = []
+    seen = set()
+    for source, nodes in sources:
+        for node in nodes:
+            if not isinstance(node, AtRule) or node.name != 'font-face' or node.body is None:
+                continue
+            declarations = {}
+            for declaration in split_declarations(node.body):
+                prop, _, value = declaration.partition(':')
+                declarations[prop.strip().lower()] = value.strip()
+
+            weights = [parse_weight(w) for w in declarations.get('font-weight', 'normal').split()]
+            weights = [w for w in weights if w] or [400]
+            files = [path for path in (normalize_reference(source, url)
+                                       for url in CSS_URL_PATTERN.findall(declarations.get('src', '')))
+                     if path and path.endswith(FONT_EXTENSIONS)]
+            face = FontFace(unquote(declarations.get('font-family', '')).lower(),
+                            (min(weights), max(weights)),
+                            declarations.get('font-style', 'normal').lower(), files)
+            key = (face.family, face.weights, face.style, tuple(face.sources))
+            if key not in seen:
+                seen.add(key)
+                faces.append(face)
+    return faces
+
+
+def find_font_usage(sources, names, safelist):
+    """Familles et graisses demandées par les règles dont le sélecteur est utilisé"""
+    variables = {}
+    for _, nodes in sources:
+        for rule in iter_rules(nodes):
+            for declaration in split_declarations(rule.body):
+                prop, _, value = declaration.partition(':')
+                if prop.strip().startswith('--'):
+                    variables.setdefault(prop.strip(), set()).add(value.replace('!important', '').strip())
+
+    families = set()
+    weights = {400}
+    styles = {'normal'}
+    for _, nodes in sources:
+        for rule in iter_rules(nodes):
+            if not any(is_selector_used(s, names, safelist) for s in rule.selectors()):
+                continue
+            for declaration in split_declarations(rule.body):
+                prop, _, value = declaration.partition(':')
+                prop = prop.strip().lower()
+                value = value.replace('!important', '').strip()
+                for resolved in resolve_vars(value, variables):
+                    if prop == 'font':
+                        family_list, weight = parse_font_shorthand(resolved)
+                        if family_list:
+                            families.update(unquote(f).lower() for f in family_list.split(','))
+                        if weight:
+                            weights.add(weight)
+                    elif prop == 'font-family':
+                        families.update(unquote(f).lower() for f in resolved.split(','))
+                    elif prop == 'font-weight' and parse_weight(resolved):
+                        weights.add(parse_weight(resolved))
+                    elif prop == 'font-style' and resolved.lower() in ('normal', 'italic', 'oblique'):
+                        styles.add(resolved.lower())
+
+    if names & BOLD_TAGS:
+        weights.add(700)
+    return families, weights, styles
+
+
+def site_characters(graph, pages):
+    chars = set()
+    for page in pages:
+        parser = TextParser()
+        with open(os.path.join(graph.root, page), 'r', encoding='utf-8') as f:
+            parser.feed(f.read())
+        chars.update(parser.chars)
+    return {ord(char) for char in chars if not char.isspace() or char == ' '}
+
+
+def subset_font(root, font_path, unicodes, output_dir):
+    """Écrit la version réduite d'une police ; renvoie son chemin relatif"""
+    options = subset.Options()
+    options.flavor = 'woff2' if brotli is not None else 'woff'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+
+    font = subset.load_font(os.path.join(root, font_path), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+
+    name = posixpath.splitext(posixpath.basename(font_path))[0]
+    output_path = posixpath.join(output_dir, f'{name}-subset.{options.flavor}')
+    os.makedirs(os.path.join(root, output_dir), exist_ok=True)
+    subset.save_font(font, os.path.join(root, output_path), options)
+    return output_path
+
+
+def analyze_unused_fonts(graph=None, subset_output=None, strict=False):
+    """Analyse les polices inutilisées et réduit celles qui sont utilisées"""
+
+    if graph is None:
+        graph = get_asset_graph()
+    pages = graph.pages()
+
+    sources = collect_css(graph, pages)
+    faces = find_font_faces(sources)
+    declared_files = {path for face in faces for path in face.sources}
+
+    font_files = [path for path in graph.files() if path.endswith(FONT_EXTENSIONS)
+                  and (path in declared_files or not SUBSET_PATTERN.search(path))]
+    print("📁 Polices trouvées :")
+    for path in font_files:
+        print(f"   - {path} ({graph.size(path)/1024:.1f} KB)")
+
+    names = set()
+    for page in pages:
+        names.update(graph.page_names(page))
+    safelist = re.compile('|'.join(SAFELIST))
+    families, weights, styles = find_font_usage(sources, names, safelist)
+
+    print(f"\n🔍 Graisses demandées : {', '.join(str(w) for w in sorted(weights))}")
+    print(f"🔍 Styles demandés : {', '.join(sorted(styles))}")
+    print("\n🔍 Analyse des @font-face :")
+
+    used_faces = []
+    for family in sorted({face.family for face in faces}):
+        family_faces = [face for face in faces if face.family == family]
+        if family not in families:
+            for face in family_faces:
+                print(f"   ❌ {family} {face.weights[0]} : famille jamais utilisée")
+            continue
+
+        chosen = {}
+        for style in styles:
+            candidates = [face for face in family_faces if face.style == style] or family_faces
+            for weight in weights:
+                face = match_weight(weight, candidates)
+                chosen.setdefault(id(face), (face, set()))[1].add(weight)
+
+        for face in family_faces:
+            label = f"{family} {face.weights[0]}" + (f"-{face.weights[1]}" if face.weights[1] != face.weights[0] else '')
+            files = ', '.join(posixpath.basename(path) for path in face.sources) or 'aucun fichier local'
+            if id(face) in chosen:
+                used_faces.append(face)
+                requested = ', '.join(str(w) for w in sorted(chosen[id(face)][1]))
+                print(f"   ✅ {label} ({files}) : utilisée pour {requested}")
+            else:
+                print(f"   ❌ {label} ({files}) : aucune graisse ne la sélectionne")
+
+    used_files = {path for face in used_faces for path in face.sources}
+    unused_files = [path for path in font_files if path not in used_files]
+
+    print(f"\n📊 Résumé :")
+    print(f"   Total polices : {len(font_files)}")
+    print(f"   Polices utilisées : {len(used_files & set(font_files))}")
+    print(f"   Polices inutilisées : {len(unused_files)}")
+
+    if unused_files:
+        print(f"\n🗑️  Polices inutilisées :")
+        for path in unused_files:
+            reason = '' if path in declared_files else ' (aucun @font-face)'
+            print(f"   ❌ {path} ({graph.size(path)/1024:.1f} KB){reason}")
+        total_size = sum(graph.size(path) for path in unused_files)
+        print(f"\n💾 Espace récupérable : {total_size/1024:.1f} KB")
+    else:
+        print(f"\n✅ Aucune police inutilisée trouvée !")
+
+    if subset_output is None:
+        return
+    if subset is None:
+        print("\nℹ️  fontTools absent : réduction des polices impossible (pip install fonttools brotli)")
+        return
+
+    unicodes = site_characters(graph, pages)
+    if not strict:
+        unicodes.update(FALLBACK_UNICODES)
+    print(f"\n✂️  Réduction à {len(unicodes)} caractères :")
+    for path in sorted(used_files & set(font_files)):
+        output_path = subset_font(graph.root, path, unicodes, subset_output)
+        after = os.path.getsize(os.path.join(graph.root, output_path))
+        print(f"   📄 {path} : {graph.size(path)/1024:.1f} KB -> {output_path} ({after/1024:.1f} KB)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse les polices inutilisées")
+    parser.add_argument('--subset', nargs='?', const='fonts', default=None, metavar='DOSSIER',
+                        help="réduire les polices utilisées (dossier relatif au site, défaut : fonts)")
+    parser.add_argument('--strict', action='store_true',
+                        help="ne garder que les caractères des pages, sans le latin-1 de secours")
+    args = parser.parse_args()
+
+    analyze_unused_fonts(subset_output=args.subset, strict=args.strict)
@@ -3,167 +3,126 @@
 Script pour analyser les pages HTML inutilisées
 """
 
-import os
-import glob
-import re
+import argparse
+import sys
 
-def analyze_unused_html():
-    """Analyse les pages HTML inutilisées"""
-    
-    # Lister tous les fichiers HTML
-    html_files = []
-    for html_file in glob.glob('www.victorberbel.work/*.html'):
-        html_files.append(os.path.basename(html_file))
+from analysis_report import FORMATS, PageUsage, Report, write_reports
+from asset_graph import SITE_ROOT, get_asset_graph
+from crawl_site import DEFAULT_ROOTS, crawl_site, orphans_by_category
+
+# Sections du rapport lisible : catégorie, titre, marqueur et remarque
+CATEGORY_SECTIONS = [
+    ('backup', '💾 Pages de sauvegarde', '❌', ''),
+    ('test', '🧪 Pages de test', '❌', ''),
+    ('generated', '🛠️  Pages générées par les outils', '⚠️ ', ' - Régénérable'),
+    ('detached', '🎨 Pages de contenu sans lien entrant', '⚠️ ',
+     " - Lie vers le site mais aucune page n'y mène"),
+    ('variant', '🔍 Pages de filtres', '⚠️ ', ' - Peut-être utilisée via JavaScript'),
+    ('isolated', '❓ Autres pages', '❌', ''),
+]
+# Catégories d'orphelins qui peuvent être supprimés sans risque
+SAFE_CATEGORIES = ('backup', 'test')
+
+def find_unused_html(graph, roots=DEFAULT_ROOTS):
+    """Un enregistrement par page : profondeur depuis les racines ou catégorie d'orphelin"""
+    
+    # Parcourir le site depuis les racines : une page est utilisée si un
+    # chemin de liens (pages, scripts, sitemap...) y mène
+    result = crawl_site(graph, roots)
+    html_files = graph.pages()
+    
+    category_of = {}
+    for category, pages in orphans_by_category(graph, result, html_files).items():
+        for page in pages:
+            category_of[page] = category
+    
+    records = []
+    for page in sorted(html_files):
+        category = category_of.get(page)
+        records.append(PageUsage(page, graph.size(page), result.depth.get(page), category,
+                                 category in SAFE_CATEGORIES))
+    
+    unused = [record for record in records if not record.used]
+    categories = {}
+    for record in unused:
+        categories[record.category] = categories.get(record.category, 0) + 1
+    summary = {
+        'total': len(records),
+        'roots': len(roots) - len(result.missing_roots),
+        'missing_roots': list(result.missing_roots),
+        'max_depth': max((record.depth for record in records if record.used), default=0),
+        'used': len(records) - len(unused),
+        'unused': len(unused),
+        'unused_categories': categories,
+        'reclaimable_bytes': sum(record.size for record in unused if record.safe_to_delete),
+    }
+    return Report('html', records, summary)
+
+def print_unused_html(report, roots=DEFAULT_ROOTS):
+    """Affiche le rapport HTML lisible"""
     
     print("📁 Pages HTML trouvées :")
-    for html in sorted(html_files):
-        print(f"   - {html}")
-    
-    # Catégoriser les pages
-    main_pages = [
-        'index.html',
-        'services.html', 
-        'work.html',
-        'about.html',
-        'contact.html'
-    ]
-    
-    backup_pages = [
-        'index-original.html',
-        'services-original.html',
-        'work-original.html',
-        'about-original.html',
-        'contact-original.html'
-    ]
-    
-    test_pages = [
-        'test-animations.html',
-        'test-title-animations.html'
-    ]
-    
-    portfolio_pages = [
-        'booksprout-saas.html',
-        'booksprout.html',
-        'greco-gum.html',
-        'investy-club.html',
-        'journaler.html',
-        'moments.html',
-        'netflix.html',
-        'nobe-saas.html',
-        'nobe.html',
-        'ordine.html',
-        'poesial.html',
-        'zesty.html'
-    ]
-    
-    filter_pages = [
-        'work@filter=mobile.html',
-        'work@filter=product.html',
-        'work@filter=website.html'
-    ]
-    
-    utility_pages = [
-        'privacy.html'
-    ]
-    
-    # Analyser les liens internes dans les pages principales
-    internal_links = set()
-    
-    for page in main_pages:
-        page_path = f'www.victorberbel.work/{page}'
-        if os.path.exists(page_path):
-            with open(page_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Chercher les liens href vers d'autres pages HTML
-            links = re.findall(r'href="([^"]+\.html)"', content)
-            for link in links:
-                # Nettoyer le lien (enlever les paramètres, etc.)
-                clean_link = link.split('?')[0].split('#')[0]
-                if not clean_link.startswith('http'):
-                    internal_links.add(clean_link)
-    
-    print(f"\n🔗 Liens internes trouvés dans les pages principales :")
-    for link in sorted(internal_links):
-        print(f"   - {link}")
+    for record in report.records:
+        print(f"   - {record.path}")
     
-    # Identifier les pages inutilisées
-    used_pages = set(main_pages + list(internal_links))
-    unused_pages = []
+    summary = report.summary
+    for root in summary['missing_roots']:
+        print(f"\n⚠️  Racine introuvable : {root}")
     
-    for html_file in html_files:
-        if html_file not in used_pages:
-            unused_pages.append(html_file)
+    print(f"\n🔗 Pages atteignables depuis {', '.join(roots)} :")
+    for record in sorted(report.records, key=lambda r: (r.depth if r.used else -1, r.path)):
+        if record.used:
+            print(f"   - {record.path} (profondeur {record.depth})")
     
     print(f"\n📊 Résumé :")
-    print(f"   Total pages HTML : {len(html_files)}")
-    print(f"   Pages principales : {len(main_pages)}")
-    print(f"   Pages liées : {len(internal_links)}")
-    print(f"   Pages utilisées : {len(used_pages)}")
-    print(f"   Pages inutilisées : {len(unused_pages)}")
+    print(f"   Total pages HTML : {summary['total']}")
+    print(f"   Racines : {summary['roots']}")
+    print(f"   Profondeur maximale : {summary['max_depth']}")
+    print(f"   Pages utilisées : {summary['used']}")
+    print(f"   Pages inutilisées : {summary['unused']}")
     
+    unused_pages = report.unused()
     if unused_pages:
         print(f"\n📋 Catégorisation des pages inutilisées :")
         
-        backup_unused = [p for p in unused_pages if p in backup_pages]
-        test_unused = [p for p in unused_pages if p in test_pages]
-        portfolio_unused = [p for p in unused_pages if p in portfolio_pages]
-        filter_unused = [p for p in unused_pages if p in filter_pages]
-        utility_unused = [p for p in unused_pages if p in utility_pages]
-        other_unused = [p for p in unused_pages if p not in backup_pages + test_pages + portfolio_pages + filter_pages + utility_pages]
+        for category, title, marker, remark in CATEGORY_SECTIONS:
+            pages = [record for record in unused_pages if record.category == category]
+            if pages:
+                print(f"\n{title} ({len(pages)}) :")
+                for record in pages:
+                    print(f"   {marker} {record.path} ({record.size/1024:.1f} KB){remark}")
         
-        if backup_unused:
-            print(f"\n💾 Pages de sauvegarde ({len(backup_unused)}) :")
-            for page in sorted(backup_unused):
-                size = os.path.getsize(f'www.victorberbel.work/{page}') / 1024
-                print(f"   ❌ {page} ({size:.1f} KB)")
-        
-        if test_unused:
-            print(f"\n🧪 Pages de test ({len(test_unused)}) :")
-            for page in sorted(test_unused):
-                size = os.path.getsize(f'www.victorberbel.work/{page}') / 1024
-                print(f"   ❌ {page} ({size:.1f} KB)")
-        
-        if portfolio_unused:
-            print(f"\n🎨 Pages de portfolio ({len(portfolio_unused)}) :")
-            for page in sorted(portfolio_unused):
-                size = os.path.getsize(f'www.victorberbel.work/{page}') / 1024
-                print(f"   ⚠️  {page} ({size:.1f} KB) - Peut-être utilisée via work.html")
-        
-        if filter_unused:
-            print(f"\n🔍 Pages de filtres ({len(filter_unused)}) :")
-            for page in sorted(filter_unused):
-                size = os.path.getsize(f'www.victorberbel.work/{page}') / 1024
-                print(f"   ⚠️  {page} ({size:.1f} KB) - Peut-être utilisée via JavaScript")
-        
-        if utility_unused:
-            print(f"\n📄 Pages utilitaires ({len(utility_unused)}) :")
-            for page in sorted(utility_unused):
-                size = os.path.getsize(f'www.victorberbel.work/{page}') / 1024
-                print(f"   ⚠️  {page} ({size:.1f} KB) - Peut-être nécessaire légalement")
-        
-        if other_unused:
-            print(f"\n❓ Autres pages ({len(other_unused)}) :")
-            for page in sorted(other_unused):
-                size = os.path.getsize(f'www.victorberbel.work/{page}') / 1024
-                print(f"   ❌ {page} ({size:.1f} KB)")
-        
-        # Calculer l'espace total récupérable
-        total_size = 0
-        safe_to_delete = backup_unused + test_unused
-        
-        for page in safe_to_delete:
-            total_size += os.path.getsize(f'www.victorberbel.work/{page}')
-        
-        print(f"\n💾 Espace récupérable (pages sûres à supprimer) : {total_size/1024:.1f} KB")
+        print(f"\n💾 Espace récupérable (pages sûres à supprimer) : {summary['reclaimable_bytes']/1024:.1f} KB")
         
+        safe_to_delete = [record for record in unused_pages if record.safe_to_delete]
         if safe_to_delete:
             print(f"\n✅ Pages sûres à supprimer :")
-            for page in sorted(safe_to_delete):
-                print(f"   🗑️  {page}")
+            for record in safe_to_delete:
+                print(f"   🗑️  {record.path}")
     
     else:
         print(f"\n✅ Aucune page HTML inutilisée trouvée !")
 
+def analyze_unused_html(graph=None, roots=DEFAULT_ROOTS, quiet=False):
+    """Analyse les pages HTML inutilisées et renvoie le rapport structuré"""
+    
+    if graph is None:
+        graph = get_asset_graph()
+    
+    report = find_unused_html(graph, roots)
+    if not quiet:
+        print_unused_html(report, roots)
+    return report
+
 if __name__ == "__main__":
-    analyze_unused_html()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyse les pages HTML inutilisées")
+    parser.add_argument('roots', nargs='*', default=DEFAULT_ROOTS,
+                        help="fichiers de départ relatifs au site")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="sortie lisible (défaut) ou machine sur la sortie standard")
+    args = parser.parse_args()
+
+    report = analyze_unused_html(get_asset_graph(args.root), args.roots, quiet=args.format != 'text')
+    if args.format != 'text':
+        write_reports([report], args.format, sys.stdout)
@@ -3,101 +3,113 @@
 Script pour analyser les fichiers JavaScript inutilisés
 """
 
-import os
-import glob
-import re
+import argparse
+import posixpath
+import sys
 
-def analyze_unused_js():
-    """Analyse les fichiers JavaScript inutilisés"""
-    
-    # Lister tous les fichiers JS
-    js_files = []
-    for js_file in glob.glob('www.victorberbel.work/js/*.js'):
-        js_files.append(os.path.basename(js_file))
+from analysis_report import FORMATS, AssetUsage, Report, write_reports
+from asset_graph import MAIN_PAGES, SCRIPT, SITE_ROOT, get_asset_graph
+
+# Familles de fichiers, reconnues au nom (la première qui correspond l'emporte)
+CATEGORIES = [
+    ('custom', '🎨 Custom'),
+    ('extracted', '📤 Extracted'),
+    ('animations', '🎬 Animations'),
+    ('webflow', '🌊 Webflow'),
+]
+OTHER_CATEGORY = ('other', '📦 Autres')
+
+def js_category(path):
+    name = posixpath.basename(path)
+    return next((category for category, _ in CATEGORIES if category in name), OTHER_CATEGORY[0])
+
+def find_unused_js(graph, pages=MAIN_PAGES):
+    """Un enregistrement par fichier JS avec les pages principales qui le chargent"""
     
-    print("📁 Fichiers JavaScript trouvés :")
-    for js in sorted(js_files):
-        print(f"   - {js}")
+    loaded_by = {}
+    for page in pages:
+        if not graph.exists(page):
+            continue
+        for js in graph.references(page, SCRIPT):
+            if js.startswith('js/'):
+                loaded_by.setdefault(js, []).append(page)
     
-    # Lister les pages principales
-    main_pages = [
-        'www.victorberbel.work/index.html',
-        'www.victorberbel.work/services.html',
-        'www.victorberbel.work/work.html', 
-        'www.victorberbel.work/about.html',
-        'www.victorberbel.work/contact.html'
-    ]
+    records = [AssetUsage(js, 'js', graph.size(js), loaded_by.get(js, []), js_category(js))
+               for js in sorted(graph.files(directory='js', extension='.js'))]
+    unused = [record for record in records if not record.used]
+    categories = {}
+    for record in unused:
+        categories[record.category] = categories.get(record.category, 0) + 1
+    summary = {
+        'total': len(records),
+        'used': sum(record.used for record in records),
+        'unused': len(unused),
+        'missing': sorted(js for js in loaded_by if not graph.exists(js)),
+        'reclaimable_bytes': sum(record.size for record in unused),
+        'unused_categories': categories,
+    }
+    return Report('js', records, summary)
+
+def print_unused_js(graph, report, pages=MAIN_PAGES):
+    """Affiche le rapport JavaScript lisible"""
     
-    # Analyser les références JS dans chaque page
-    used_js = set()
+    print("📁 Fichiers JavaScript trouvés :")
+    for record in report.records:
+        print(f"   - {record.path[len('js/'):]}")
     
     print("\n🔍 Analyse des références JavaScript :")
     
-    for page in main_pages:
-        if not os.path.exists(page):
+    for page in pages:
+        if not graph.exists(page):
             continue
             
-        page_name = os.path.basename(page)
-        print(f"\n📄 {page_name} :")
-        
-        with open(page, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Chercher toutes les références JS
-        js_refs = re.findall(r'src="js/([^"]+\.js)"', content)
-        
-        for js_ref in js_refs:
-            used_js.add(js_ref)
-            print(f"   ✅ {js_ref}")
-    
-    # Identifier les fichiers inutilisés
-    unused_js = []
-    for js_file in js_files:
-        if js_file not in used_js:
-            unused_js.append(js_file)
+        print(f"\n📄 {page} :")
+        for js_ref in graph.references(page, SCRIPT):
+            if js_ref.startswith('js/'):
+                print(f"   ✅ {js_ref[len('js/'):]}")
     
+    summary = report.summary
     print(f"\n📊 Résumé :")
-    print(f"   Total JS : {len(js_files)}")
-    print(f"   JS utilisés : {len(used_js)}")
-    print(f"   JS inutilisés : {len(unused_js)}")
+    print(f"   Total JS : {summary['total']}")
+    # Le texte compte aussi les fichiers référencés mais absents
+    print(f"   JS utilisés : {summary['used'] + len(summary['missing'])}")
+    print(f"   JS inutilisés : {summary['unused']}")
     
+    unused_js = report.unused()
     if unused_js:
         print(f"\n🗑️  Fichiers JavaScript inutilisés :")
-        total_size = 0
-        for js in sorted(unused_js):
-            # Calculer la taille du fichier
-            file_path = f'www.victorberbel.work/js/{js}'
-            if os.path.exists(file_path):
-                size = os.path.getsize(file_path)
-                size_kb = size / 1024
-                total_size += size
-                print(f"   ❌ {js} ({size_kb:.1f} KB)")
-            else:
-                print(f"   ❌ {js} (fichier non trouvé)")
-        
-        print(f"\n💾 Espace récupérable : {total_size/1024:.1f} KB")
+        for record in unused_js:
+            print(f"   ❌ {record.path[len('js/'):]} ({record.size/1024:.1f} KB)")
         
-        # Analyser les types de fichiers inutilisés
-        custom_unused = [js for js in unused_js if 'custom' in js]
-        extracted_unused = [js for js in unused_js if 'extracted' in js]
-        animations_unused = [js for js in unused_js if 'animations' in js]
-        webflow_unused = [js for js in unused_js if 'webflow' in js]
-        other_unused = [js for js in unused_js if js not in custom_unused + extracted_unused + animations_unused + webflow_unused]
+        print(f"\n💾 Espace récupérable : {summary['reclaimable_bytes']/1024:.1f} KB")
         
         print(f"\n📋 Catégories de fichiers inutilisés :")
-        if custom_unused:
-            print(f"   🎨 Custom : {len(custom_unused)} fichiers")
-        if extracted_unused:
-            print(f"   📤 Extracted : {len(extracted_unused)} fichiers")
-        if animations_unused:
-            print(f"   🎬 Animations : {len(animations_unused)} fichiers")
-        if webflow_unused:
-            print(f"   🌊 Webflow : {len(webflow_unused)} fichiers")
-        if other_unused:
-            print(f"   📦 Autres : {len(other_unused)} fichiers")
+        for category, label in CATEGORIES + [OTHER_CATEGORY]:
+            count = summary['unused_categories'].get(category)
+            if count:
+                print(f"   {label} : {count} fichiers")
             
     else:
         print(f"\n✅ Aucun fichier JavaScript inutilisé trouvé !")
 
+def analyze_unused_js(graph=None, pages=MAIN_PAGES, quiet=False):
+    """Analyse les fichiers JavaScript inutilisés et renvoie le rapport structuré"""
+    
+    if graph is None:
+        graph = get_asset_graph()
+    
+    report = find_unused_js(graph, pages)
+    if not quiet:
+        print_unused_js(graph, report, pages)
+    return report
+
 if __name__ == "__main__":
-    analyze_unused_js()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyse les fichiers JavaScript inutilisés")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="sortie lisible (défaut) ou machine sur la sortie standard")
+    args = parser.parse_args()
+
+    report = analyze_unused_js(get_asset_graph(args.root), quiet=args.format != 'text')
+    if args.format != 'text':
+        write_reports([report], args.format, sys.stdout)
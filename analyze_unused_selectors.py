@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Script pour analyser les règles CSS inutilisées (au niveau des sélecteurs)
+Élague chaque feuille de style selon les classes, ids et balises réellement présents
+"""
+
+import argparse
+import os
+import re
+
+from asset_graph import STYLESHEET, get_asset_graph
+from css_parser import AtRule, Rule, parse_css, selector_names, serialize_css
+
+# Classes ajoutées dynamiquement (Webflow, bibliothèques, états JS) : toujours conservées
+SAFELIST = [
+    r'^w--',
+    r'^w-mod-',
+    r'^is-',
+    r'^active$',
+    # Swiper pose ses classes d'état à l'exécution (swiper-slide-active, swiper-initialized...)
+    r'^swiper-',
+]
+
+# Balises toujours présentes dans un document
+ALWAYS_PRESENT_TAGS = {'html', 'body', 'head'}
+
+
+def is_selector_used(selector, names, safelist):
+    """Un sélecteur est gardé si tous ses classes, ids et balises existent"""
+    classes, ids, tags = selector_names(selector)
+
+    for name in classes:
+        if f'.{name}' not in names and name not in names and not safelist.search(name):
+            return False
+    for name in ids:
+        if f'#{name}' not in names and name not in names:
+            return False
+    for tag in tags:
+        if tag not in names and tag not in ALWAYS_PRESENT_TAGS:
+            return False
+    return True
+
+
+def prune_nodes(nodes, names, safelist):
+    """Renvoie les règles utilisées et le nombre de sélecteurs retirés"""
+    kept = []
+    removed = 0
+
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = node.selectors()
+            used = [s for s in selectors if is_selector_used(s, names, safelist)]
+            removed += len(selectors) - len(used)
+            if used:
+                kept.append(Rule(', '.join(used), node.body) if len(used) != len(selectors) else node)
+        elif node.children is not None:
+            children, child_removed = prune_nodes(node.children, names, safelist)
+            removed += child_removed
+            if children:
+                kept.append(AtRule(node.name, node.prelude, children=children))
+        else:
+            # @font-face, @keyframes, @import... : conservés tels quels
+            kept.append(node)
+
+    return kept, removed
+
+
+def prune_stylesheet(graph, css_path, names, safelist):
+    """Renvoie (css élagué, sélecteurs retirés) pour un ensemble de noms"""
+    with open(os.path.join(graph.root, css_path), 'r', encoding='utf-8', errors='replace') as f:
+        nodes = parse_css(f.read())
+    kept, removed = prune_nodes(nodes, names, safelist)
+    return serialize_css(kept) + '\n', removed
+
+
+def write_output(output_dir, relative_path, css):
+    file_path = os.path.join(output_dir, relative_path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(css)
+
+
+def analyze_unused_selectors(graph=None, per_page=False, output_dir=None, safelist=SAFELIST):
+    """Analyse les règles CSS inutilisées de chaque feuille de style"""
+
+    if graph is None:
+        graph = get_asset_graph()
+    safelist_pattern = re.compile('|'.join(safelist) or r'(?!)')
+
+    # Feuilles de style locales et pages qui les chargent
+    stylesheet_pages = {}
+    for page in graph.pages():
+        for css in graph.references(page, STYLESHEET):
+            if graph.exists(css):
+                stylesheet_pages.setdefault(css, []).append(page)
+
+    if per_page:
+        # Une version élaguée de chaque feuille pour chaque page
+        targets = [(css, [page], f'{os.path.splitext(page)[0]}/{css}')
+                   for css, pages in sorted(stylesheet_pages.items()) for page in pages]
+    else:
+        # Une version par feuille, valable pour toutes les pages qui la chargent
+        targets = [(css, pages, css) for css, pages in sorted(stylesheet_pages.items())]
+
+    print("🔍 Analyse des sélecteurs CSS :")
+
+    total_before = 0
+    total_after = 0
+
+    for css, pages, output_path in targets:
+        names = set()
+        for page in pages:
+            names.update(graph.page_names(page))
+
+        pruned, removed = prune_stylesheet(graph, css, names, safelist_pattern)
+        before = graph.size(css)
+        after = len(pruned.encode('utf-8'))
+        total_before += before
+        total_after += after
+
+        label = f"{css} ({pages[0]})" if per_page else f"{css} ({len(pages)} pages)"
+        saved = max(0, before - after)
+        print(f"   📄 {label} : {before/1024:.1f} KB -> {after/1024:.1f} KB "
+              f"(-{saved/1024:.1f} KB, {removed} sélecteurs retirés)")
+
+        if output_dir:
+            write_output(output_dir, output_path, pruned)
+
+    print(f"\n📊 Résumé :")
+    print(f"   Feuilles analysées : {len(targets)}")
+    print(f"   Taille avant : {total_before/1024:.1f} KB")
+    print(f"   Taille après : {total_after/1024:.1f} KB")
+    print(f"\n💾 Économie : {(total_before - total_after)/1024:.1f} KB")
+
+    if output_dir:
+        print(f"\n📁 Feuilles élaguées écrites dans {output_dir}/")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse les règles CSS inutilisées")
+    parser.add_argument('--per-page', action='store_true',
+                        help="élaguer chaque feuille séparément pour chaque page")
+    parser.add_argument('--output', default=None,
+                        help="dossier où écrire les feuilles élaguées")
+    parser.add_argument('--safelist', nargs='*', default=SAFELIST,
+                        help="regex de classes à toujours conserver")
+    args = parser.parse_args()
+
+    analyze_unused_selectors(per_page=args.per_page, output_dir=args.output, safelist=args.safelist)
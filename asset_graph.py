@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Graphe des assets du site, partagé par les scripts d'analyse
+Lit chaque fichier HTML, CSS et JS une seule fois et enregistre les références
+"""
+
+import argparse
+import codecs
+import hashlib
+import os
+import pickle
+import posixpath
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+SITE_ROOT = 'www.victorberbel.work'
+
+# Index persistant : seuls les fichiers modifiés depuis le dernier audit sont relus
+CACHE_DIR = '.asset_cache'
+CACHE_VERSION = 4
+
+# En dessous de ce nombre de fichiers à relire, le pool de processus coûte
+# plus cher à démarrer qu'il ne fait gagner
+PARALLEL_THRESHOLD = 64
+# ... sauf si ces fichiers sont gros (vidéos) : le hachage domine alors
+PARALLEL_BYTES_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_CHUNKSIZE = 16
+
+# Pages principales du site
+MAIN_PAGES = [
+    'index.html',
+    'services.html',
+    'work.html',
+    'about.html',
+    'contact.html'
+]
+
+# Types d'arêtes du graphe
+STYLESHEET = 'stylesheet'  # page -> feuille de style
+SCRIPT = 'script'          # page -> script
+PAGE = 'page'              # page -> page
+ASSET = 'asset'            # page ou CSS -> image, police, vidéo, @import...
+JS_ASSET = 'js-asset'      # JS -> asset cité dans une chaîne
+ANCHOR = 'anchor'          # page -> 'page.html#id' (lien vers une ancre)
+
+# Chaîne littérale JS : ses mots alimentent l'index des noms (classes, ids)
+NAME = 'name'
+
+SCANNED_EXTENSIONS = ('.html', '.css', '.js')
+
+# Les fichiers sont lus par morceaux : la mémoire par fichier reste bornée
+CHUNK_SIZE = 64 * 1024
+# Blocs plus grands pour le simple hachage des médias (moins d'appels système)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+CSS_URL_PATTERN = re.compile(r'url\(\s*[\'"]?([^\'")]+?)[\'"]?\s*\)')
+CSS_IMPORT_PATTERN = re.compile(r'@import\s+[\'"]([^\'"]+)[\'"]|@import\s+url\(\s*[\'"]?([^\'")]+?)[\'"]?\s*\)')
+JS_STRING_PATTERN = re.compile(
+    r'[\'"`]([^\'"`\s]+\.(?:png|jpe?g|gif|svg|webp|avif|ico|mp4|webm|woff2?|otf|ttf|css|js|html|json))[\'"`]'
+)
+JS_LITERAL_PATTERN = re.compile(r'\'([^\'\\\n]*)\'|"([^"\\\n]*)"|`([^`\\]*)`')
+NAME_PATTERN = re.compile(r'-?[_a-zA-Z][\w-]*')
+EXTERNAL_PATTERN = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|//)', re.IGNORECASE)
+
+
+def normalize_reference(source, ref):
+    """Résout une référence par rapport au fichier source (None si externe)"""
+    ref = ref.strip()
+    if not ref or ref.startswith('#') or EXTERNAL_PATTERN.match(ref):
+        return None
+
+    # Enlever les paramètres et les ancres
+    ref = ref.split('#')[0].split('?')[0]
+    if not ref:
+        return None
+
+    if ref.startswith('/'):
+        path = ref.lstrip('/')
+    else:
+        path = posixpath.join(posixpath.dirname(source), ref)
+
+    path = posixpath.normpath(path)
+    if path == '.' or path.startswith('..'):
+        return None
+    return path
+
+
+def classify_reference(path):
+    """Détermine le type d'arête d'une référence faite depuis une page"""
+    if path.endswith('.css'):
+        return STYLESHEET
+    if path.endswith('.js'):
+        return SCRIPT
+    if path.endswith('.html'):
+        return PAGE
+    return ASSET
+
+
+class PatternStream:
+    """Applique des regex à un texte reçu par morceaux
+
+    Le texte n'est analysé que jusqu'au dernier séparateur reçu (fin de
+    règle CSS, fin d'instruction JS...) ; le reste attend le morceau suivant,
+    pour ne jamais couper une référence en deux.
+    """
+
+    def __init__(self, patterns, separators):
+        self.patterns = patterns      # [(type, regex), ...]
+        self.separators = separators
+        self.buffer = ''
+
+    def _matches(self, text):
+        refs = []
+        for kind, pattern in self.patterns:
+            for match in pattern.finditer(text):
+                ref = next(group for group in match.groups() if group is not None)
+                refs.append((match.start(), kind, ref))
+        return [(kind, ref) for _, kind, ref in sorted(refs)]
+
+    def feed(self, text):
+        self.buffer += text
+        cut = max(self.buffer.rfind(sep) for sep in self.separators)
+        if cut < 0 and len(self.buffer) < CHUNK_SIZE:
+            return []
+        if cut < 0:
+            cut = len(self.buffer) - 1
+        text, self.buffer = self.buffer[:cut + 1], self.buffer[cut + 1:]
+        return self._matches(text)
+
+    def close(self):
+        text, self.buffer = self.buffer, ''
+        return self._matches(text)
+
+
+def css_stream(import_kind=ASSET):
+    return PatternStream([(ASSET, CSS_URL_PATTERN), (import_kind, CSS_IMPORT_PATTERN)], '};')
+
+
+def js_stream():
+    return PatternStream([(JS_ASSET, JS_STRING_PATTERN), (NAME, JS_LITERAL_PATTERN)], ';\n')
+
+
+# Attributs qui contiennent une URL, quelle que soit la balise
+URL_ATTRIBUTES = ('href', 'src', 'poster', 'data', 'data-src')
+SRCSET_ATTRIBUTES = ('srcset', 'imagesrcset', 'data-srcset')
+
+# <link rel="preload" as="..."> -> type d'arête
+PRELOAD_KINDS = {'style': STYLESHEET, 'script': SCRIPT, 'document': PAGE}
+
+
+class ReferenceParser(HTMLParser):
+    """Tokenizer HTML qui collecte les références au fil de la lecture
+
+    Gère les attributs entre guillemets simples, doubles ou sans guillemets,
+    srcset, <link rel=preload/modulepreload>, les attributs style et le
+    contenu des balises <style> (url(), @import) et <script> inline.
+    Indexe aussi les balises, classes et ids rencontrés.
+    """
+
+    def __init__(self, source):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.found = []        # références pas encore renvoyées
+        self.names = set()     # 'div', '.classe', '#id', mots des scripts inline
+        self.inline = None     # flux CSS/JS de la balise <style>/<script> en cours
+
+    def add(self, kind, ref):
+        if kind == NAME:
+            self.names.update(NAME_PATTERN.findall(ref))
+            return
+        target = normalize_reference(self.source, ref)
+        if target:
+            self.found.append((kind or classify_reference(target), target))
+
+    def add_anchor(self, ref):
+        """Lien vers une ancre : 'page.html#id', ou la page elle-même pour '#id'"""
+        path, _, fragment = ref.strip().partition('#')
+        if not fragment or fragment.startswith(('!', '/')) or EXTERNAL_PATTERN.match(path):
+            return
+        target = normalize_reference(self.source, path) if path else self.source
+        if target and target.endswith('.html'):
+            self.found.append((ANCHOR, f'{target}#{fragment}'))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+
+        self.names.add(tag)
+        self.names.update('.' + name for name in attrs.get('class', '').split())
+        if attrs.get('id'):
+            self.names.add('#' + attrs['id'])
+
+        kind = None
+        if tag == 'link':
+            rel = attrs.get('rel', '').lower().split()
+            if 'stylesheet' in rel:
+                kind = STYLESHEET
+            elif 'modulepreload' in rel:
+                kind = SCRIPT
+            elif 'preload' in rel or 'prefetch' in rel:
+                kind = PRELOAD_KINDS.get(attrs.get('as', '').lower(), ASSET)
+        elif tag == 'script':
+            kind = SCRIPT
+        elif tag in ('img', 'source', 'video', 'audio', 'track', 'embed', 'object', 'input'):
+            kind = ASSET
+
+        for name in URL_ATTRIBUTES:
+            if attrs.get(name):
+                self.add(kind, attrs[name])
+
+        if tag in ('a', 'area') and '#' in attrs.get('href', ''):
+            self.add_anchor(attrs['href'])
+
+        for name in SRCSET_ATTRIBUTES:
+            for candidate in attrs.get(name, '').split(','):
+                parts = candidate.split()
+                if parts:
+                    self.add(ASSET, parts[0])
+
+        if 'style' in attrs:
+            stream = css_stream()
+            for ref_kind, ref in stream.feed(attrs['style']) + stream.close():
+                self.add(ref_kind, ref)
+
+        if tag == 'style':
+            self.inline = css_stream(import_kind=STYLESHEET)
+        elif tag == 'script' and 'src' not in attrs:
+            self.inline = js_stream()
+
+    def handle_startendtag(self, tag, attrs):
+        # <script/> ou <style/> auto-fermants n'ont pas de contenu
+        self.handle_starttag(tag, attrs)
+        self.inline = None
+
+    def handle_data(self, data):
+        if self.inline is not None:
+            for kind, ref in self.inline.feed(data):
+                self.add(kind, ref)
+
+    def handle_endtag(self, tag):
+        if tag in ('style', 'script'):
+            self.flush_inline()
+
+    def flush_inline(self):
+        if self.inline is not None:
+            for kind, ref in self.inline.close():
+                self.add(kind, ref)
+            self.inline = None
+
+
+def iter_chunks(file_path, digest=None, size=CHUNK_SIZE):
+    """Lit un fichier par morceaux décodés en UTF-8 (et met à jour digest)"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(file_path, 'rb') as f:
+        while True:
+            data = f.read(size)
+            if digest is not None:
+                digest.update(data)
+            if not data:
+                break
+            yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_references(path, chunks, names=None):
+    """Générateur des références (type, cible) d'un fichier HTML, CSS ou JS
+
+    chunks est un itérable de morceaux de texte : le fichier n'est jamais
+    chargé en entier en mémoire. Si names est un ensemble, il reçoit les
+    balises, classes et ids de la page, ou les mots des chaînes d'un script.
+    """
+    if path.endswith('.html'):
+        parser = ReferenceParser(path)
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from parser.found
+            parser.found = []
+        parser.close()
+        parser.flush_inline()
+        yield from parser.found
+        if names is not None:
+            names.update(parser.names)
+        return
+
+    if path.endswith('.css'):
+        stream, base = css_stream(), path
+    elif path.endswith('.js'):
+        # Les chaînes d'un script sont résolues par le navigateur par rapport
+        # à la page qui le charge, donc à la racine du site
+        stream, base = js_stream(), ''
+    else:
+        return
+
+    def resolve(found):
+        for kind, ref in found:
+            if kind == NAME:
+                if names is not None:
+                    names.update(NAME_PATTERN.findall(ref))
+                continue
+            target = normalize_reference(base, ref)
+            if target:
+                yield kind, target
+
+    for chunk in chunks:
+        yield from resolve(stream.feed(chunk))
+    yield from resolve(stream.close())
+
+
+def extract_references(path, content):
+    """Extrait les références (type, cible) d'un contenu déjà en mémoire"""
+    # Dédoublonner en gardant l'ordre d'apparition
+    return list(dict.fromkeys(iter_references(path, [content])))
+
+
+class AssetGraph:
+    """Graphe orienté fichier -> références, construit en une seule passe"""
+
+    def __init__(self, root):
+        self.root = root
+        self.sizes = {}       # chemin relatif -> taille en octets
+        self.hashes = {}      # chemin relatif -> empreinte SHA-256 du contenu
+        self.edges = {}       # chemin relatif -> [(type, cible), ...]
+        self.names = {}       # chemin relatif -> balises, classes, ids, mots JS
+        self.incoming = {}    # cible -> {source, ...}
+        self.parsed = 0       # fichiers relus lors de la construction
+
+    def add_file(self, path, size, digest, refs, names=frozenset()):
+        """Ajoute un fichier et ses références au graphe"""
+        self.sizes[path] = size
+        self.hashes[path] = digest
+        self.edges[path] = refs
+        self.names[path] = names
+        for kind, target in refs:
+            self.incoming.setdefault(target, set()).add(path)
+
+    def remove_file(self, path):
+        """Retire un fichier et ses arêtes sortantes (les arêtes entrantes restent)"""
+        for kind, target in self.edges.pop(path, ()):
+            sources = self.incoming.get(target)
+            if sources is not None:
+                sources.discard(path)
+                if not sources:
+                    del self.incoming[target]
+        self.sizes.pop(path, None)
+        self.hashes.pop(path, None)
+        self.names.pop(path, None)
+
+    def update_file(self, path, size, digest, refs, names=frozenset()):
+        """Remplace les arêtes d'un fichier modifié, sans toucher au reste du graphe"""
+        self.remove_file(path)
+        self.add_file(path, size, digest, refs, names)
+
+    def files(self, directory=None, extension=None):
+        """Liste triée des fichiers, filtrée par dossier et/ou extension"""
+        result = []
+        for path in self.sizes:
+            if directory is not None and posixpath.dirname(path) != directory:
+                continue
+            if extension is not None and not path.endswith(extension):
+                continue
+            result.append(path)
+        return sorted(result)
+
+    def pages(self):
+        """Pages HTML à la racine du site"""
+        return self.files(directory='', extension='.html')
+
+    def exists(self, path):
+        return path in self.sizes
+
+    def size(self, path):
+        return self.sizes.get(path, 0)
+
+    def references(self, source, kind=None):
+        """Cibles référencées par un fichier, dans l'ordre d'apparition"""
+        return [target for k, target in self.edges.get(source, []) if kind is None or k == kind]
+
+    def page_names(self, page):
+        """Noms visibles depuis une page : les siens et ceux de ses scripts"""
+        names = set(self.names.get(page, ()))
+        for script in self.references(page, SCRIPT):
+            names.update(self.names.get(script, ()))
+        return names
+
+    def referrers(self, target):
+        """Fichiers qui référencent une cible"""
+        return sorted(self.incoming.get(target, ()))
+
+
+def walk_site(root):
+    """Parcourt le site et renvoie (chemin relatif, chemin disque, stat) triés"""
+    stack = ['']
+    while stack:
+        prefix = stack.pop()
+        with os.scandir(os.path.join(root, prefix)) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        subdirs = []
+        for entry in entries:
+            path = prefix + entry.name
+            if entry.is_dir():
+                subdirs.append(path + '/')
+            elif entry.is_file():
+                yield path, entry.path, entry.stat()
+        stack.extend(reversed(subdirs))
+
+
+def scan_file(path, file_path, previous=None):
+    """Lit un fichier une fois : renvoie son empreinte, ses références et ses noms
+
+    Si le contenu est identique à l'entrée précédente de l'index (simple
+    `touch`, copie...), les résultats déjà extraits sont réutilisés.
+    """
+    if previous is not None or not path.endswith(SCANNED_EXTENSIONS):
+        digest = hash_file(file_path)
+        if not path.endswith(SCANNED_EXTENSIONS):
+            return digest, [], frozenset()
+        if digest == previous[2]:
+            return digest, previous[3], previous[4]
+
+    # Empreinte, références et noms calculés pendant la même lecture
+    digest = hashlib.sha256()
+    names = set()
+    refs = list(dict.fromkeys(iter_references(path, iter_chunks(file_path, digest), names)))
+    return digest.hexdigest(), refs, frozenset(names)
+
+
+def hash_file(file_path):
+    """Empreinte SHA-256 d'un fichier, lu par morceaux"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for data in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _scan_job(job):
+    return scan_file(*job)
+
+
+def parallel_map(func, items, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Applique func à chaque élément, dans un pool de processus si utile
+
+    Les résultats sont renvoyés dans l'ordre des éléments, quel que soit le
+    nombre de workers : la fusion reste déterministe. workers=None utilise
+    tous les cœurs au-delà de PARALLEL_THRESHOLD éléments, workers=1 force
+    le mode séquentiel.
+    """
+    items = list(items)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(items) >= PARALLEL_THRESHOLD else 1
+    workers = min(workers, len(items))
+
+    if workers <= 1:
+        return [func(item) for item in items]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=max(1, chunksize)))
+
+
+def cache_path_for(root, prefix='graph'):
+    """Fichier d'index associé à un dossier de site (un préfixe par outil)"""
+    key = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f'{prefix}-{key}.pickle')
+
+
+def load_cache(cache_path):
+    """Charge l'index persistant (vide s'il est absent ou obsolète)"""
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_path, entries):
+    """Écrit l'index de façon atomique (fichier temporaire puis rename)"""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'version': CACHE_VERSION, 'files': entries}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+
+def build_asset_graph(root=SITE_ROOT, use_cache=True, workers=None,
+                      chunksize=DEFAULT_CHUNKSIZE):
+    """Parcourt le site une seule fois et construit le graphe des assets
+
+    Avec le cache, un fichier dont le mtime et la taille n'ont pas changé
+    n'est pas relu : ses références viennent de l'index persistant.
+    Les fichiers à relire sont répartis entre `workers` processus.
+    """
+    graph = AssetGraph(root)
+    cache_path = cache_path_for(root)
+    cached = load_cache(cache_path) if use_cache else {}
+    entries = {}
+
+    # Séparer les fichiers à jour dans l'index de ceux qu'il faut relire
+    stale = []
+    for path, file_path, stat in walk_site(root):
+        entry = cached.get(path)
+        if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            stale.append((path, file_path, stat, entry))
+            entry = None
+        entries[path] = entry
+
+    jobs = [(path, file_path, entry) for path, file_path, stat, entry in stale]
+    if workers is None and sum(stat.st_size for _, _, stat, _ in stale) >= PARALLEL_BYTES_THRESHOLD:
+        # Peu de fichiers mais beaucoup d'octets : un fichier par envoi au pool
+        workers, chunksize = os.cpu_count() or 1, 1
+    results = parallel_map(_scan_job, jobs, workers=workers, chunksize=chunksize)
+    for (path, file_path, stat, entry), (digest, refs, names) in zip(stale, results):
+        entries[path] = (stat.st_mtime_ns, stat.st_size, digest, refs, names)
+    graph.parsed = len(stale)
+
+    # Fusion dans l'ordre du parcours : le graphe ne dépend pas des workers
+    for path, entry in entries.items():
+        graph.add_file(path, entry[1], entry[2], entry[3], entry[4])
+
+    # Ne réécrire l'index que si quelque chose a changé
+    if use_cache and (graph.parsed or entries.keys() != cached.keys()):
+        save_cache(cache_path, entries)
+
+    return graph
+
+
+# Graphes déjà construits pendant ce processus, partagés entre les analyses
+_graphs = {}
+
+
+def get_asset_graph(root=SITE_ROOT, use_cache=True, workers=None,
+                    chunksize=DEFAULT_CHUNKSIZE):
+    """Renvoie le graphe du site, construit au premier appel seulement"""
+    if root not in _graphs:
+        _graphs[root] = build_asset_graph(root, use_cache=use_cache,
+                                          workers=workers, chunksize=chunksize)
+    return _graphs[root]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit le graphe des assets du site")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : automatique, 1 = séquentiel)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="nombre de fichiers envoyés à un worker à la fois")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignorer l'index persistant et tout relire")
+    args = parser.parse_args()
+
+    graph = get_asset_graph(use_cache=not args.no_cache, workers=args.workers,
+                            chunksize=args.chunksize)
+
+    edge_count = sum(len(refs) for refs in graph.edges.values())
+    print(f"📁 Fichiers indexés : {len(graph.sizes)}")
+    print(f"🔄 Fichiers relus : {graph.parsed}")
+    print(f"🔗 Références : {edge_count}")
+
+    for kind in (STYLESHEET, SCRIPT, PAGE, ASSET, JS_ASSET, ANCHOR):
+        count = sum(1 for refs in graph.edges.values() for k, _ in refs if k == kind)
+        print(f"   - {kind} : {count}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script pour mesurer le gain du scan parallèle par rapport au scan séquentiel
+Génère des sites synthétiques de plus en plus grands à partir des vraies pages
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from asset_graph import DEFAULT_CHUNKSIZE, SITE_ROOT, build_asset_graph
+
+def build_synthetic_site(target_dir, page_count, source_root=SITE_ROOT, directories=('css', 'js')):
+    """Crée un site de page_count pages en dupliquant les pages du site réel"""
+    
+    templates = sorted(name for name in os.listdir(source_root) if name.endswith('.html'))
+    
+    for subdir in directories:
+        shutil.copytree(os.path.join(source_root, subdir), os.path.join(target_dir, subdir))
+    
+    for i in range(page_count):
+        template = templates[i % len(templates)]
+        name = f'{os.path.splitext(template)[0]}-{i}.html'
+        shutil.copyfile(os.path.join(source_root, template), os.path.join(target_dir, name))
+
+def time_build(root, workers, chunksize, repeat):
+    """Meilleur temps de construction du graphe, sans index persistant"""
+    
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build_asset_graph(root, use_cache=False, workers=workers, chunksize=chunksize)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def benchmark_scan(page_counts, workers, chunksize, repeat):
+    """Compare le scan séquentiel et le scan parallèle pour chaque taille"""
+    
+    print(f"⚙️  Workers : {workers} | chunksize : {chunksize} | répétitions : {repeat}")
+    print(f"\n{'Pages':>8} {'Séquentiel':>12} {'Parallèle':>12} {'Gain':>8}")
+    
+    for page_count in page_counts:
+        with tempfile.TemporaryDirectory() as site_dir:
+            build_synthetic_site(site_dir, page_count)
+            
+            serial = time_build(site_dir, 1, chunksize, repeat)
+            parallel = time_build(site_dir, workers, chunksize, repeat)
+        
+        print(f"{page_count:>8} {serial:>11.3f}s {parallel:>11.3f}s {serial / parallel:>7.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du scan parallèle des pages")
+    parser.add_argument('--pages', type=int, nargs='+', default=[100, 500, 1000, 2000],
+                        help="tailles de site à mesurer (nombre de pages)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    benchmark_scan(args.pages, args.workers, args.chunksize, args.repeat)
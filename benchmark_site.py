@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Script pour suivre le budget de performance du site et de ses outils
+Mesure chaque page (octets, octets bloquants, requêtes, CSS/JS inutilisés), compare à une
+baseline JSON et échoue au-delà d'un seuil ; chronomètre aussi les outils Python sur des
+sites synthétiques 10x, 100x et 1000x plus grands pour détecter les pertes de passage à l'échelle
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from analyze_dead_js import analyze_dead_js, find_dead_code, html_names, tokenize
+from analyze_unused_assets import analyze_unused_assets
+from analyze_unused_css import analyze_unused_css
+from analyze_unused_fonts import analyze_unused_fonts
+from analyze_unused_html import analyze_unused_html
+from analyze_unused_js import analyze_unused_js
+from analyze_unused_selectors import SAFELIST, analyze_unused_selectors, prune_nodes
+from asset_graph import MAIN_PAGES, SITE_ROOT, STYLESHEET, build_asset_graph, get_asset_graph
+from benchmark_scan import build_synthetic_site
+from clean_pages import clean_pages, expand_pages
+from compress_assets import page_files
+from css_parser import parse_css, serialize_css
+from optimize_scripts import imported_stylesheets, library_globals, page_scripts, page_stylesheets
+from update_css_references import update_html_css_references
+from update_js_references import update_html_js_references
+
+BASELINE_PATH = os.path.join('benchmarks', 'baseline.json')
+
+# Métriques par page : clé JSON et libellé
+METRICS = [
+    ('total_bytes', 'Total'),
+    ('blocking_bytes', 'Bloquant'),
+    ('requests', 'Requêtes'),
+    ('largest_asset_bytes', 'Plus gros'),
+    ('unused_css_bytes', 'CSS inutile'),
+    ('unused_js_bytes', 'JS inutile'),
+]
+BYTE_METRICS = {'total_bytes', 'blocking_bytes', 'largest_asset_bytes', 'unused_css_bytes', 'unused_js_bytes'}
+
+# Hausse tolérée par rapport à la baseline (surchargeable par métrique dans le JSON)
+DEFAULT_THRESHOLD = 0.05
+DEFAULT_TIME_THRESHOLD = 0.25
+# En dessous, un temps est du bruit de mesure : pas de comparaison
+MIN_TIMING = 0.05
+# Exposant de croissance (temps ~ pages^k) au-delà duquel un outil passe mal à l'échelle
+SUPERLINEAR_EXPONENT = 1.3
+
+DEFAULT_SCALES = [10, 100, 1000]
+SYNTHETIC_PATTERNS = ['*.html']
+
+# Outils chronométrés sur les sites synthétiques ; ceux qui écrivent passent en dernier
+TOOLCHAIN = [
+    ('asset_graph', lambda root, graph: build_asset_graph(root, use_cache=False)),
+    ('analyze_unused_assets', lambda root, graph: analyze_unused_assets(graph)),
+    ('analyze_unused_css', lambda root, graph: analyze_unused_css(graph)),
+    ('analyze_unused_js', lambda root, graph: analyze_unused_js(graph)),
+    ('analyze_unused_html', lambda root, graph: analyze_unused_html(graph)),
+    ('analyze_unused_selectors', lambda root, graph: analyze_unused_selectors(graph)),
+    ('analyze_unused_fonts', lambda root, graph: analyze_unused_fonts(graph)),
+    ('analyze_dead_js', lambda root, graph: analyze_dead_js(graph)),
+    ('update_css_references', lambda root, graph: update_html_css_references(root, SYNTHETIC_PATTERNS, True)),
+    ('update_js_references', lambda root, graph: update_html_js_references(root, SYNTHETIC_PATTERNS, True)),
+    ('clean_pages', lambda root, graph: clean_pages(root, SYNTHETIC_PATTERNS)),
+]
+
+
+def script_source(root, path, cache):
+    """Source et lexèmes d'un script local lisible (None pour une bibliothèque connue)"""
+    if path not in cache:
+        cache[path] = None
+        file_path = os.path.join(root, path)
+        if library_globals(path) is None and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                code = f.read()
+            cache[path] = (code, tokenize(code))
+    return cache[path]
+
+
+def unused_css_bytes(graph, page, safelist, parsed):
+    """Octets des feuilles de la page qu'aucun élément de la page n'utilise"""
+    names = graph.page_names(page)
+    unused = 0
+    for css in set(graph.references(page, STYLESHEET)):
+        if not graph.exists(css):
+            continue
+        if css not in parsed:
+            with open(os.path.join(graph.root, css), 'r', encoding='utf-8', errors='replace') as f:
+                parsed[css] = parse_css(f.read())
+        kept, _ = prune_nodes(parsed[css], names, safelist)
+        unused += max(0, graph.size(css) - len((serialize_css(kept) + '\n').encode('utf-8')))
+    return unused
+
+
+def unused_js_bytes(graph, page, scripts, safelist, sources):
+    """Octets des scripts chargés en double et des fragments morts (analyze_dead_js) de la page"""
+    names = html_names(graph, [page])
+    seen = set()
+    unused = 0
+    for script in scripts:
+        if not script.path or not graph.exists(script.path):
+            continue
+        if script.path in seen:
+            unused += graph.size(script.path)
+            continue
+        seen.add(script.path)
+        source = script_source(graph.root, script.path, sources)
+        if source is not None:
+            units, _, _ = find_dead_code(source[0], names, safelist, [page], source[1])
+            unused += sum(unit.size for unit in units)
+    return unused
+
+
+def page_metrics(graph, page, safelist, caches):
+    """Métriques de budget d'une page"""
+    with open(os.path.join(graph.root, page), 'r', encoding='utf-8') as f:
+        content = f.read()
+    files = page_files(graph, page)
+    scripts, _ = page_scripts(graph.root, page, content, caches['scripts'])
+    stylesheets = page_stylesheets(page, content)
+    css = stylesheets + imported_stylesheets(graph, page, stylesheets)
+
+    blocking = set(css) | {s.path for s in scripts if s.mode == 'blocking' and s.path}
+    third_party = sum(1 for s in scripts if s.src and not s.path)
+    largest = max(files[1:] or files, key=graph.size)
+
+    return {
+        'total_bytes': sum(graph.size(path) for path in files),
+        'blocking_bytes': sum(graph.size(path) for path in blocking if graph.exists(path)),
+        'requests': len(files) + third_party,
+        'largest_asset': largest,
+        'largest_asset_bytes': graph.size(largest),
+        'unused_css_bytes': unused_css_bytes(graph, page, safelist, caches['css']),
+        'unused_js_bytes': unused_js_bytes(graph, page, scripts, safelist, caches['sources']),
+    }
+
+
+def measure_pages(root, patterns, safelist=SAFELIST):
+    graph = get_asset_graph(root)
+    safelist_pattern = re.compile('|'.join(safelist) or r'(?!)')
+    caches = {'scripts': {}, 'css': {}, 'sources': {}}
+    return {page: page_metrics(graph, page, safelist_pattern, caches)
+            for page in expand_pages(root, patterns)}
+
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, baseline):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def is_regression(old, new, threshold):
+    """Hausse au-delà du seuil relatif (toute hausse si la baseline vaut 0)"""
+    return new > old * (1 + threshold) if old else new > 0
+
+
+def format_value(metric, value):
+    return f"{value/1024:.1f} KB" if metric in BYTE_METRICS else str(value)
+
+
+def compare_pages(metrics, baseline, threshold):
+    """Affiche les métriques et renvoie la liste des régressions"""
+    thresholds = baseline.get('thresholds', {})
+    previous = baseline.get('pages', {})
+    regressions = []
+
+    width = max([len(page) for page in metrics] + [4])
+    print(f"📏 Budget par page :")
+    print(f"   {'Page':<{width}} " + ' '.join(f"{label:>12}" for _, label in METRICS))
+    for page, values in metrics.items():
+        print(f"   {page:<{width}} " + ' '.join(f"{format_value(metric, values[metric]):>12}"
+                                               for metric, _ in METRICS))
+        if page not in previous:
+            print(f"      🆕 absente de la baseline")
+            continue
+        for metric, label in METRICS:
+            old, new = previous[page].get(metric), values[metric]
+            if old is None:
+                continue
+            limit = thresholds.get(metric, threshold)
+            if is_regression(old, new, limit):
+                regressions.append((page, metric))
+                print(f"      ❌ {label} : {format_value(metric, old)} -> {format_value(metric, new)} "
+                      f"(seuil +{limit:.0%})")
+            elif new < old:
+                print(f"      ✅ {label} : {format_value(metric, old)} -> {format_value(metric, new)}")
+        if values['largest_asset'] != previous[page].get('largest_asset', values['largest_asset']):
+            print(f"      ℹ️  plus gros fichier : {previous[page]['largest_asset']} -> {values['largest_asset']}")
+
+    for page in sorted(set(previous) - set(metrics)):
+        print(f"   ⚠️  {page} : dans la baseline mais plus mesurée")
+    return regressions
+
+
+def build_scaled_site(target_dir, scale, source_root=SITE_ROOT):
+    """Copie du site réel avec scale fois plus de pages (copies numérotées en plus des originales)"""
+    templates = [name for name in os.listdir(source_root) if name.endswith('.html')]
+    shutil.copytree(source_root, target_dir, dirs_exist_ok=True)
+    build_synthetic_site(target_dir, (scale - 1) * len(templates), source_root, directories=())
+    return len(templates) * scale
+
+
+def time_toolchain(root, repeat):
+    """Meilleur temps de chaque outil (sortie jetée) ; le graphe est partagé par les analyses"""
+    timings = {}
+    graph = build_asset_graph(root, use_cache=False)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        for name, run in TOOLCHAIN:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(devnull):
+                    run(root, graph)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = round(best, 4)
+    return timings
+
+
+def benchmark_toolchain(scales, repeat):
+    """Temps des outils pour chaque taille de site synthétique"""
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as site_dir:
+            page_count = build_scaled_site(site_dir, scale)
+            print(f"⏱️  Site x{scale} ({page_count} pages)...")
+            results[str(scale)] = time_toolchain(site_dir, repeat)
+    return results
+
+
+def compare_toolchain(results, baseline, threshold):
+    """Affiche les temps, la croissance entre tailles et renvoie les régressions"""
+    previous = baseline.get('toolchain', {})
+    scales = sorted(results, key=int)
+    regressions = []
+
+    print(f"\n⏱️  Temps des outils :")
+    print(f"   {'Outil':<26} " + ' '.join(f"{'x' + scale:>10}" for scale in scales))
+    for name, _ in TOOLCHAIN:
+        print(f"   {name:<26} " + ' '.join(f"{results[scale][name]:>9.3f}s" for scale in scales))
+
+        for small, large in zip(scales, scales[1:]):
+            before, after = results[small][name], results[large][name]
+            if before >= MIN_TIMING and after >= MIN_TIMING:
+                exponent = math.log(after / before) / math.log(int(large) / int(small))
+                if exponent > SUPERLINEAR_EXPONENT:
+                    print(f"      ⚠️  x{small} -> x{large} : temps ~ pages^{exponent:.2f}")
+
+        for scale in scales:
+            old = previous.get(scale, {}).get(name)
+            new = results[scale][name]
+            if old is not None and max(old, new) >= MIN_TIMING and is_regression(old, new, threshold):
+                regressions.append((f'x{scale}', name))
+                print(f"      ❌ x{scale} : {old:.3f}s -> {new:.3f}s (seuil +{threshold:.0%})")
+    return regressions
+
+
+def benchmark_site(root=SITE_ROOT, patterns=MAIN_PAGES, baseline_path=BASELINE_PATH,
+                   threshold=DEFAULT_THRESHOLD, update=False, toolchain=False,
+                   scales=DEFAULT_SCALES, time_threshold=DEFAULT_TIME_THRESHOLD, repeat=1):
+    """Mesure les pages (et les outils), compare à la baseline ; renvoie True sans régression"""
+
+    baseline = load_baseline(baseline_path)
+    if baseline:
+        print(f"📂 Baseline : {baseline_path}\n")
+    else:
+        print(f"📂 Pas de baseline dans {baseline_path}\n")
+
+    metrics = measure_pages(root, patterns)
+    regressions = compare_pages(metrics, baseline, threshold)
+
+    timings = None
+    if toolchain:
+        print()
+        timings = benchmark_toolchain(scales, repeat)
+        regressions += compare_toolchain(timings, baseline, time_threshold)
+
+    if update:
+        baseline['pages'] = metrics
+        if timings is not None:
+            baseline.setdefault('toolchain', {}).update(timings)
+        save_baseline(baseline_path, baseline)
+        print(f"\n💾 Baseline mise à jour : {baseline_path}")
+        return True
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà du budget")
+        return False
+    print(f"\n✅ Aucune régression")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Budget de performance des pages et benchmark des outils")
+    parser.add_argument('pages', nargs='*', default=MAIN_PAGES,
+                        help="pages ou globs relatifs au site (défaut : pages principales)")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help="fichier JSON de référence")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="hausse tolérée par métrique de page (0.05 = +5%%)")
+    parser.add_argument('--update', action='store_true',
+                        help="enregistrer les mesures comme nouvelle baseline")
+    parser.add_argument('--toolchain', action='store_true',
+                        help="chronométrer aussi les outils sur des sites synthétiques")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="tailles des sites synthétiques (multiples du nombre de pages réel)")
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help="hausse tolérée des temps d'exécution (0.25 = +25%%)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="mesures par outil (le meilleur temps est gardé)")
+    args = parser.parse_args()
+
+    ok = benchmark_site(args.root, args.pages, args.baseline, args.threshold, args.update,
+                        args.toolchain, args.scales, args.time_threshold, args.repeat)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Script pour regrouper le CSS et le JS propres au site en bundles par page
+Chaque bundle est nommé par l'empreinte de son contenu (cache immuable) et
+toutes les pages HTML sont réécrites pour y faire référence
+"""
+
+import argparse
+import hashlib
+import os
+import posixpath
+import re
+
+from asset_graph import SITE_ROOT, normalize_reference
+from clean_pages import CSS_TYPES, JS_TYPES, TOKEN_PATTERN, expand_pages
+from inline_critical_css import parse_attrs, rebase_urls
+
+# Fichiers regroupés ; les bibliothèques (webflow, gsap, jquery, swiper...) restent à part
+BUNDLE_CSS = [
+    r'^slater-',
+    r'-custom\.css$',
+    r'-extracted\.css$',
+    r'^inline\.',
+]
+BUNDLE_JS = [
+    r'^animations-',
+    r'-custom\.js$',
+    r'-extracted\.js$',
+    r'^fix-work-section\.js$',
+    r'^animation-reset\.js$',
+    r'^inline\.',
+]
+BUNDLE_PATTERN = re.compile(r'^bundle\.[0-9a-f]+\.(?:css|js)$')
+
+
+class Member:
+    """Feuille de style ou script externe trouvé dans une page"""
+
+    __slots__ = ('kind', 'start', 'end', 'tag', 'attrs', 'path')
+
+    def __init__(self, kind, start, end, tag, attrs, path):
+        self.kind = kind      # 'css' ou 'js'
+        self.start = start
+        self.end = end
+        self.tag = tag        # balise d'origine (ouvrante pour un script)
+        self.attrs = attrs    # attributs hors href/src
+        self.path = path      # chemin relatif au site, None si externe
+
+
+def resource_attrs(tag):
+    """Attributs d'une ressource, sans ceux qui ne changent pas son chargement"""
+    attrs = parse_attrs(tag)
+    if attrs.get('type', '').lower() in CSS_TYPES + JS_TYPES:
+        attrs.pop('type', None)
+    return attrs
+
+
+def tokenize_resources(page, content):
+    """Feuilles de style et scripts de la page, dans l'ordre du document"""
+    resources = []
+    for match in TOKEN_PATTERN.finditer(content):
+        tag = (match.group('tag') or '').lower()
+        if match.group('link') is not None:
+            attrs = resource_attrs(match.group(0))
+            if attrs.get('rel', '').lower() != 'stylesheet':
+                continue
+            href = attrs.pop('href', '')
+            resources.append(Member('css', match.start(), match.end(), match.group(0),
+                                    attrs, normalize_reference(page, href)))
+        elif tag:
+            opening = f'<{tag}{match.group("attrs")}>'
+            attrs = resource_attrs(opening)
+            src = attrs.pop('src', None)
+            kind = 'css' if tag == 'style' else 'js'
+            path = normalize_reference(page, src) if src else None
+            resources.append(Member(kind, match.start(), match.end(), opening, attrs, path))
+    return resources
+
+
+def is_bundleable(root, member, patterns):
+    if member.path is None or not os.path.exists(os.path.join(root, member.path)):
+        return False
+    name = posixpath.basename(member.path)
+    return any(re.search(pattern, name) for pattern in patterns)
+
+
+def is_missing(root, member):
+    """Fichier local absent : sa balise ne charge rien et n'a pas d'effet sur l'ordre"""
+    return member.path is not None and not os.path.exists(os.path.join(root, member.path))
+
+
+def find_runs(root, resources, kind, patterns, content):
+    """Suites contiguës de fichiers regroupables, aux attributs identiques
+
+    Les références vers des fichiers absents ne coupent pas une suite ; elles
+    restent en place dans la page. Tout autre contenu entre deux membres
+    (balise, texte, <head> -> <body>) coupe la suite : le bundle est chargé à
+    la place du premier et un script ne doit pas tourner avant le DOM qu'il
+    voyait.
+    """
+    missing = [member for member in resources if is_missing(root, member)]
+
+    def adjacent(previous, member):
+        between = content[previous.end:member.start]
+        for other in reversed(missing):
+            if previous.end <= other.start and other.end <= member.start:
+                start, end = other.start - previous.end, other.end - previous.end
+                between = between[:start] + between[end:]
+        return not between.strip()
+
+    runs = []
+    current = []
+    for member in resources:
+        if member.kind != kind or is_missing(root, member):
+            continue
+        if is_bundleable(root, member, patterns) and (
+                not current or (member.attrs == current[0].attrs and adjacent(current[-1], member))):
+            current.append(member)
+            continue
+        if len(current) > 1:
+            runs.append(current)
+        current = [member] if is_bundleable(root, member, patterns) else []
+    if len(current) > 1:
+        runs.append(current)
+    return runs
+
+
+def line_span(content, start, end):
+    """Étend [start, end) à la ligne entière si la balise y est seule"""
+    line_start = content.rfind('\n', 0, start) + 1
+    line_end = content.find('\n', end)
+    line_end = len(content) if line_end == -1 else line_end
+    if content[line_start:start].strip() or content[end:line_end].strip():
+        return start, end
+    return line_start, min(line_end + 1, len(content))
+
+
+def build_bundle(root, run):
+    """Contenu et chemin du bundle d'une suite de fichiers"""
+    directory = posixpath.dirname(run[0].path)
+    parts = []
+    for member in run:
+        with open(os.path.join(root, member.path), 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read().strip()
+        if member.kind == 'css':
+            # Les url() restent valides depuis le dossier du bundle
+            content = rebase_urls(content, member.path, posixpath.join(directory, 'bundle'))
+            parts.append(f'/* {member.path} */\n{content}')
+        else:
+            # Le ';' évite qu'un fichier sans point-virgule final se colle au suivant
+            parts.append(f'/* {member.path} */\n{content}\n;')
+
+    content = '\n\n'.join(parts) + '\n'
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+    return posixpath.join(directory, f'bundle.{digest}.{run[0].kind}'), content
+
+
+def bundle_tag(page, member, bundle_path):
+    """Balise d'origine du premier membre, pointant vers le bundle"""
+    url = posixpath.relpath(bundle_path, posixpath.dirname(page) or '.')
+    extra = ''.join(f' {name}="{value}"' if value else f' {name}'
+                    for name, value in member.attrs.items() if name != 'rel')
+    if member.kind == 'css':
+        return f'<link href="{url}" rel="stylesheet"{extra}/>'
+    return f'<script src="{url}"{extra}></script>'
+
+
+def write_atomically(file_path, content):
+    """Écrit un fichier temporaire ; le rename est fait par l'appelant"""
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return tmp_path
+
+
+def bundle_assets(root=SITE_ROOT, patterns=('*.html',), prune=False, dry_run=False):
+    """Regroupe le CSS et le JS de chaque page et réécrit les références"""
+
+    pages = expand_pages(root, patterns)
+    bundles = {}
+    rewrites = {}
+    missing = {}
+    before_requests = 0
+    after_requests = 0
+
+    for page in pages:
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        resources = tokenize_resources(page, content)
+        for member in resources:
+            if is_missing(root, member):
+                missing.setdefault(member.path, set()).add(page)
+        runs = (find_runs(root, resources, 'css', BUNDLE_CSS, content)
+                + find_runs(root, resources, 'js', BUNDLE_JS, content))
+        if not runs:
+            continue
+
+        edits = []
+        for run in runs:
+            bundle_path, bundle_content = build_bundle(root, run)
+            bundles[bundle_path] = bundle_content
+            edits.append((run[0].start, run[0].end, bundle_tag(page, run[0], bundle_path)))
+            edits.extend((*line_span(content, member.start, member.end), '') for member in run[1:])
+            before_requests += len(run)
+            after_requests += 1
+
+        for start, end, text in sorted(edits, reverse=True):
+            content = content[:start] + text + content[end:]
+        rewrites[page] = content
+
+        print(f"📦 {page} : " + ', '.join(f"{len(run)} {run[0].kind.upper()} -> 1" for run in runs))
+
+    for path, found_in in sorted(missing.items()):
+        print(f"⚠️  {path} introuvable ({len(found_in)} pages), référence laissée en place")
+
+    if not rewrites:
+        print("✅ Aucune page à regrouper")
+        return
+
+    if dry_run:
+        print(f"\nℹ️  Mode simulation : {len(bundles)} bundles, aucun fichier écrit")
+        return
+
+    # Les bundles ont des noms nouveaux : les écrire d'abord ne casse rien
+    for bundle_path, bundle_content in bundles.items():
+        os.replace(write_atomically(os.path.join(root, bundle_path), bundle_content),
+                   os.path.join(root, bundle_path))
+
+    # Toutes les pages sont préparées avant le premier rename
+    staged = [(write_atomically(os.path.join(root, page), content), os.path.join(root, page))
+              for page, content in rewrites.items()]
+    for tmp_path, file_path in staged:
+        os.replace(tmp_path, file_path)
+
+    print(f"\n📊 Résumé :")
+    print(f"   Pages réécrites : {len(rewrites)}")
+    print(f"   Bundles créés : {len(bundles)}")
+    print(f"   Requêtes CSS/JS : {before_requests} -> {after_requests}")
+
+    for bundle_path in sorted(bundles):
+        size = len(bundles[bundle_path].encode('utf-8'))
+        print(f"   📁 {bundle_path} ({size/1024:.1f} KB)")
+
+    if prune:
+        prune_bundles(root, set(bundles))
+
+
+def prune_bundles(root, keep):
+    """Supprime les anciens bundles qui ne sont plus référencés"""
+    referenced = set(keep)
+    for page in expand_pages(root, ['*.html']):
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            for member in tokenize_resources(page, f.read()):
+                if member.path:
+                    referenced.add(member.path)
+
+    for directory in ('css', 'js'):
+        for name in sorted(os.listdir(os.path.join(root, directory))):
+            path = f'{directory}/{name}'
+            if BUNDLE_PATTERN.match(name) and path not in referenced:
+                os.remove(os.path.join(root, path))
+                print(f"   🗑️  {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regroupe le CSS et le JS des pages en bundles")
+    parser.add_argument('pages', nargs='*', default=['*.html'],
+                        help="pages ou globs relatifs au site")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--prune', action='store_true',
+                        help="supprimer les anciens bundles non référencés")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="afficher les regroupements sans rien écrire")
+    args = parser.parse_args()
+
+    bundle_assets(args.root, args.pages, args.prune, args.dry_run)
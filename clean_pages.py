@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Script pour nettoyer des pages HTML en extrayant le CSS et JS inline
+Remplace clean_about.py / clean_contact.py : fonctionne sur n'importe quelles pages,
+et les blocs identiques entre pages sont partagés dans des fichiers nommés par empreinte
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import posixpath
+import re
+
+from asset_graph import MAIN_PAGES, SITE_ROOT
+
+# Un seul passage sur le document : commentaires, <style>, <script> et <link>
+TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|<(?P<tag>style|script)\b(?P<attrs>[^>]*)>(?P<content>.*?)</(?P=tag)\s*>'
+    r'|<link\b(?P<link>[^>]*)>',
+    re.DOTALL | re.IGNORECASE
+)
+TYPE_PATTERN = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+SRC_PATTERN = re.compile(r'\bsrc\s*=', re.IGNORECASE)
+STYLESHEET_PATTERN = re.compile(r'\brel\s*=\s*["\']?stylesheet', re.IGNORECASE)
+BLANK_LINES_PATTERN = re.compile(r'\n\s*\n\s*\n')
+
+# Types de <script> exécutés comme du JavaScript classique
+JS_TYPES = ('', 'text/javascript', 'application/javascript')
+CSS_TYPES = ('', 'text/css')
+
+
+class Block:
+    """Bloc <style> ou <script> inline extrait d'une page"""
+
+    __slots__ = ('kind', 'start', 'end', 'content', 'digest')
+
+    def __init__(self, kind, start, end, content):
+        self.kind = kind          # 'css' ou 'js'
+        self.start = start
+        self.end = end
+        self.content = content.strip()
+        self.digest = hashlib.sha256(self.content.encode('utf-8')).hexdigest()
+
+
+def tokenize_page(content):
+    """Renvoie les blocs extractibles et les positions des ressources externes
+
+    Une feuille de style ou un script externe entre deux blocs empêche de
+    les regrouper : l'ordre d'application du CSS est conservé. Les scripts,
+    eux, ne sont regroupés que s'ils se suivent (voir group_runs).
+    """
+    blocks = []
+    barriers = []    # (position, 'css' | 'js')
+
+    for match in TOKEN_PATTERN.finditer(content):
+        tag = (match.group('tag') or '').lower()
+        if match.group('link') is not None:
+            if STYLESHEET_PATTERN.search(match.group('link')):
+                barriers.append((match.start(), 'css'))
+            continue
+        if not tag:
+            continue  # commentaire HTML
+
+        attrs = match.group('attrs')
+        type_match = TYPE_PATTERN.search(attrs)
+        content_type = type_match.group(1).lower() if type_match else ''
+
+        if tag == 'style' and content_type in CSS_TYPES and 'media' not in attrs.lower():
+            blocks.append(Block('css', match.start(), match.end(), match.group('content')))
+        elif tag == 'script' and not SRC_PATTERN.search(attrs) and content_type in JS_TYPES:
+            blocks.append(Block('js', match.start(), match.end(), match.group('content')))
+        else:
+            # Script externe, JSON-LD, module... : reste dans la page
+            barriers.append((match.start(), 'js' if tag == 'script' else 'css'))
+
+    return blocks, barriers
+
+
+def group_runs(blocks, barriers, pages_of, content):
+    """Regroupe les blocs consécutifs partagés par le même ensemble de pages
+
+    Un groupe de scripts ne contient que des blocs voisins (seul du blanc
+    entre eux) : le fichier commun est chargé à la place du premier, et un
+    script du <body> ne doit pas tourner plus tôt, avant le DOM qu'il cherche.
+    """
+    runs = []
+    for kind in ('css', 'js'):
+        stops = [position for position, barrier in barriers if barrier == kind]
+        current = []
+        for block in (b for b in blocks if b.kind == kind and b.content):
+            if current:
+                previous = current[-1]
+                interrupted = any(previous.end <= stop < block.start for stop in stops)
+                if kind == 'js' and content[previous.end:block.start].strip():
+                    interrupted = True
+                if interrupted or pages_of[block.digest] != pages_of[previous.digest]:
+                    runs.append(current)
+                    current = []
+            current.append(block)
+        if current:
+            runs.append(current)
+    return runs
+
+
+def asset_for_run(run):
+    """Chemin (nommé par empreinte) et contenu du fichier d'un groupe de blocs"""
+    content = '\n\n'.join(block.content for block in run) + '\n'
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+    if run[0].kind == 'css':
+        return f'css/inline.{digest}.css', content
+    return f'js/inline.{digest}.js', content
+
+
+def reference_tag(page, asset_path):
+    href = posixpath.relpath(asset_path, posixpath.dirname(page) or '.')
+    if asset_path.endswith('.css'):
+        return f'<link rel="stylesheet" href="{href}" />'
+    return f'<script src="{href}"></script>'
+
+
+def expand_pages(root, patterns):
+    """Liste de pages (chemins relatifs) à partir de noms ou de globs"""
+    pages = []
+    for pattern in patterns:
+        matches = glob.glob(os.path.join(root, pattern))
+        for file_path in sorted(matches):
+            page = os.path.relpath(file_path, root).replace(os.sep, '/')
+            if page.endswith('.html') and page not in pages:
+                pages.append(page)
+    return pages
+
+
+def clean_pages(root=SITE_ROOT, patterns=MAIN_PAGES, in_place=False):
+    """Extrait le CSS et JS inline des pages dans des fichiers partagés"""
+
+    pages = expand_pages(root, patterns)
+    if not pages:
+        print("⚠️  Aucune page trouvée")
+        return
+
+    # Premier passage : lire chaque page une fois et indexer ses blocs
+    contents = {}
+    tokens = {}
+    pages_of = {}
+    for page in pages:
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            contents[page] = f.read()
+        tokens[page] = tokenize_page(contents[page])
+        for block in tokens[page][0]:
+            pages_of.setdefault(block.digest, set()).add(page)
+    pages_of = {digest: frozenset(found) for digest, found in pages_of.items()}
+
+    assets = {}
+    inline_bytes = 0
+
+    for page in pages:
+        blocks, barriers = tokens[page]
+        content = contents[page]
+        inline_bytes += sum(len(block.content.encode('utf-8')) for block in blocks)
+
+        # Remplacements (début, fin, texte) : le premier bloc d'un groupe devient
+        # la balise vers le fichier partagé, les autres disparaissent
+        edits = [(block.start, block.end, '') for block in blocks]
+        for run in group_runs(blocks, barriers, pages_of, content):
+            asset_path, asset_content = asset_for_run(run)
+            assets[asset_path] = asset_content
+            edits = [(start, end, reference_tag(page, asset_path) if start == run[0].start else text)
+                     for start, end, text in edits]
+
+        cleaned = content
+        for start, end, text in sorted(edits, reverse=True):
+            cleaned = cleaned[:start] + text + cleaned[end:]
+        cleaned = BLANK_LINES_PATTERN.sub('\n\n', cleaned)
+
+        output_path = os.path.join(root, page if in_place else page.replace('.html', '-clean.html'))
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(cleaned)
+
+        css_count = sum(1 for block in blocks if block.kind == 'css')
+        print(f"📄 {page} : {css_count} blocs de style, {len(blocks) - css_count} scripts inline "
+              f"-> {os.path.basename(output_path)}")
+
+    for asset_path, asset_content in sorted(assets.items()):
+        with open(os.path.join(root, asset_path), 'w', encoding='utf-8') as f:
+            f.write(asset_content)
+
+    asset_bytes = sum(len(content.encode('utf-8')) for content in assets.values())
+    print(f"\n📊 Résumé :")
+    print(f"   Pages nettoyées : {len(pages)}")
+    print(f"   Blocs inline uniques : {len(pages_of)}")
+    print(f"   Fichiers partagés créés : {len(assets)}")
+    print(f"   CSS/JS inline : {inline_bytes/1024:.1f} KB -> fichiers : {asset_bytes/1024:.1f} KB")
+    print(f"\n💾 Doublons évités : {(inline_bytes - asset_bytes)/1024:.1f} KB")
+
+    print("\n📁 Fichiers créés :")
+    for asset_path in sorted(assets):
+        print(f"   - {asset_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrait le CSS et JS inline des pages HTML")
+    parser.add_argument('pages', nargs='*', default=MAIN_PAGES,
+                        help="pages ou globs relatifs au site (ex : '*.html')")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--in-place', action='store_true',
+                        help="réécrire les pages au lieu de créer des fichiers *-clean.html")
+    args = parser.parse_args()
+
+    clean_pages(args.root, args.pages, args.in_place)
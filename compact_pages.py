@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Script pour compacter les pages HTML exportées par Webflow
+Chaque page est découpée en arbre : blancs réduits (sauf <pre>, <textarea> et éléments en
+ligne), attributs Webflow qu'aucun CSS ou JS chargé par la page ne cite retirés, commentaires
+et conteneurs vides supprimés ; les pages sont traitées en parallèle
+"""
+
+import argparse
+import os
+import re
+
+from asset_graph import ANCHOR, SCRIPT, SITE_ROOT, STYLESHEET, get_asset_graph, parallel_map
+from bundle_assets import write_atomically
+from clean_pages import expand_pages
+from css_parser import AtRule, parse_css, selector_names
+from inline_critical_css import parse_attrs
+from optimize_scripts import imported_stylesheets
+from rewrite_pages import set_attribute
+
+DEFAULT_PAGES = ['*.html']
+
+# Une balise, un commentaire ou un élément à contenu brut par correspondance ; le reste est du texte
+TOKEN_PATTERN = re.compile(
+    r'(?P<comment><!--.*?-->)'
+    r'|(?P<markup><![^>]*>|<\?[^>]*>)'
+    r'|(?P<raw_start><(?P<raw_tag>script|style|textarea|title)\b(?:"[^"]*"|\'[^\']*\'|[^\'">])*>)'
+    r'(?P<raw_content>.*?)(?P<raw_end></(?P=raw_tag)\s*>)'
+    r'|(?P<start><(?P<tag>[a-zA-Z][\w:-]*)(?:"[^"]*"|\'[^\']*\'|[^\'">])*>)'
+    r'|(?P<end></(?P<end_tag>[a-zA-Z][\w:-]*)\s*>)',
+    re.DOTALL | re.IGNORECASE
+)
+# Blancs HTML : l'espace insécable n'en fait pas partie
+WHITESPACE = ' \t\n\r\f'
+WHITESPACE_PATTERN = re.compile(r'[ \t\n\r\f]+')
+NAME_TOKEN_PATTERN = re.compile(r'[\w-]+')
+COMBINATOR_PATTERN = re.compile(r'\s*[\s>+~]\s*')
+PSEUDO_ELEMENT_PATTERN = re.compile(r'::|:(?:before|after|first-line|first-letter)\b', re.IGNORECASE)
+DISPLAY_INLINE_PATTERN = re.compile(r'(?:^|[;\s])display\s*:\s*inline', re.IGNORECASE)
+WHITE_SPACE_PATTERN = re.compile(r'(?:^|[;\s])white-space\s*:\s*(?:pre|break-spaces)', re.IGNORECASE)
+
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                 'source', 'track', 'wbr'}
+RAW_ELEMENTS = {'script', 'style', 'textarea', 'title'}
+# Blancs significatifs : contenu laissé tel quel
+PRESERVE_ELEMENTS = {'pre', 'textarea', 'script', 'style'}
+# Éléments de bloc : un blanc qui les touche n'est jamais rendu ; tout le reste
+# (en ligne, SVG, éléments inconnus) garde un blanc
+BLOCK_ELEMENTS = {'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'details', 'dialog', 'div',
+                  'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+                  'h4', 'h5', 'h6', 'head', 'header', 'hgroup', 'hr', 'html', 'li', 'main', 'nav',
+                  'ol', 'p', 'section', 'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead',
+                  'tr', 'ul', 'pre', 'caption', 'legend', 'base', 'link', 'meta', 'title', 'noscript'}
+
+# Conteneurs Webflow d'un embed : inutiles une fois vides
+EMPTY_WRAPPER_CLASSES = {'w-embed', 'w-script'}
+WRAPPER_ELEMENTS = ('div', 'span')
+# Attributs par défaut d'un <script> / <style> / <link>
+REDUNDANT_TYPES = {'script': ('text/javascript', 'application/javascript'),
+                   'style': ('text/css',), 'link': ('text/css',)}
+
+
+class Element:
+    """Élément de l'arbre : balise ouvrante brute, enfants, balise fermante brute"""
+
+    __slots__ = ('tag', 'start', 'attrs', 'children', 'end')
+
+    def __init__(self, tag, start, attrs):
+        self.tag = tag
+        self.start = start
+        self.attrs = attrs
+        self.children = []    # Element, Markup ou texte (str)
+        self.end = ''         # vide : élément vide ou fermé implicitement
+
+
+class Markup:
+    """Commentaire, doctype ou balise fermante orpheline, recopié tel quel"""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+def parse_page(content):
+    """Arbre de la page ; la sérialisation sans modification redonne le texte exact"""
+    root = Element('', '', {})
+    stack = [root]
+    position = 0
+    for match in TOKEN_PATTERN.finditer(content):
+        if match.start() > position:
+            stack[-1].children.append(content[position:match.start()])
+        position = match.end()
+        parent = stack[-1]
+
+        if match.group('comment') or match.group('markup'):
+            parent.children.append(Markup(match.group(0)))
+        elif match.group('raw_start'):
+            element = Element(match.group('raw_tag').lower(), match.group('raw_start'),
+                              parse_attrs(match.group('raw_start')))
+            if match.group('raw_content'):
+                element.children.append(match.group('raw_content'))
+            element.end = match.group('raw_end')
+            parent.children.append(element)
+        elif match.group('start'):
+            tag = match.group('tag').lower()
+            element = Element(tag, match.group('start'), parse_attrs(match.group('start')))
+            parent.children.append(element)
+            if tag not in VOID_ELEMENTS and not match.group('start').endswith('/>'):
+                stack.append(element)
+        else:
+            tag = match.group('end_tag').lower()
+            depth = next((i for i in range(len(stack) - 1, 0, -1) if stack[i].tag == tag), None)
+            if depth is None:
+                parent.children.append(Markup(match.group(0)))
+                continue
+            stack[depth].end = match.group(0)
+            del stack[depth:]
+    if position < len(content):
+        stack[-1].children.append(content[position:])
+    return root
+
+
+def serialize(element):
+    parts = []
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            parts.append(node)
+        elif isinstance(node, Markup):
+            parts.append(node.text)
+        else:
+            parts.append(node.start)
+            stack.append(node.end)
+            stack.extend(reversed(node.children))
+    return ''.join(parts)
+
+
+def stylesheet_summary(text):
+    """Noms cités par les sélecteurs, éléments affichés en ligne, éléments à blancs significatifs"""
+    tokens, inline, preserve = set(), {}, {}
+    stack = parse_css(text)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, AtRule):
+            stack.extend(node.children or [])
+            continue
+        tokens.update(NAME_TOKEN_PATTERN.findall(node.selector))
+        display_inline = DISPLAY_INLINE_PATTERN.search(node.body)
+        white_space = WHITE_SPACE_PATTERN.search(node.body)
+        if not (display_inline or white_space):
+            continue
+        for selector in node.selectors():
+            if PSEUDO_ELEMENT_PATTERN.search(selector):
+                continue
+            for name, required in subject_names(selector):
+                if display_inline:
+                    inline.setdefault(name, set()).add(required)
+                if white_space:
+                    preserve.setdefault(name, set()).add(required)
+    return tokens, inline, preserve
+
+
+def compound_names(compound):
+    classes, ids, tags = selector_names(compound)
+    return {'.' + name for name in classes} | {'#' + name for name in ids} | tags
+
+
+def subject_names(selector):
+    """Noms de l'élément visé par le sélecteur ('.classe', '#id' ou balise), chacun avec
+    les noms qu'un ancêtre doit porter : seule une balise nue en dépend
+    ('figure.w-richtext-figure-type-image > div' ne vise pas tous les div)
+    """
+    compounds = COMBINATOR_PATTERN.split(selector.strip())
+    names = compound_names(compounds[-1])
+    if any(not name[0].isalpha() for name in names) or len(compounds) < 2:
+        return [(name, frozenset()) for name in names]
+    return [(name, frozenset(compound_names(compounds[-2]))) for name in names]
+
+
+class PageContext:
+    """Ce que le CSS et le JS chargés par une page citent ou imposent"""
+
+    __slots__ = ('css_tokens', 'js_tokens', 'inline', 'preserve', 'anchors')
+
+    def __init__(self, anchors=()):
+        self.css_tokens = set()
+        self.js_tokens = set()
+        self.inline = {}              # nom -> noms requis chez un ancêtre (display: inline*)
+        self.preserve = {}            # idem pour white-space: pre*
+        self.anchors = set(anchors)   # ids visés par un lien 'page.html#id'
+
+    def add_stylesheet(self, summary):
+        tokens, inline, preserve = summary
+        self.css_tokens |= tokens
+        for rules, found in ((self.inline, inline), (self.preserve, preserve)):
+            for name, required in found.items():
+                rules.setdefault(name, set()).update(required)
+
+    def add_script(self, tokens):
+        self.js_tokens |= tokens
+
+    def referenced(self, name):
+        return name in self.css_tokens or name in self.js_tokens
+
+
+def classes_of(element):
+    return set(element.attrs.get('class', '').split())
+
+
+def selector_keys(element):
+    """Noms par lesquels une règle peut viser l'élément"""
+    keys = {'.' + name for name in classes_of(element)} | {element.tag}
+    if element.attrs.get('id'):
+        keys.add('#' + element.attrs['id'])
+    return keys
+
+
+def matches(rules, element, ancestors):
+    """Une règle vise-t-elle l'élément ? ancestors : noms de chaque ancêtre"""
+    for key in selector_keys(element):
+        for required in rules.get(key, ()):
+            if not required or any(required <= names for names in ancestors):
+                return True
+    return False
+
+
+def is_block(node, context, ancestors):
+    if isinstance(node, Markup):
+        # Doctype, commentaire conditionnel ; une fermante orpheline garde ses blancs
+        return node.text.startswith('<!')
+    if isinstance(node, str):
+        return False
+    return (node.tag in BLOCK_ELEMENTS and not matches(context.inline, node, ancestors)
+            and not DISPLAY_INLINE_PATTERN.search(node.attrs.get('style', '')))
+
+
+def preserves_whitespace(element, context, ancestors):
+    return (element.tag in PRESERVE_ELEMENTS
+            or matches(context.preserve, element, ancestors)
+            or bool(WHITE_SPACE_PATTERN.search(element.attrs.get('style', ''))))
+
+
+def removable_attributes(element, context):
+    """Attributs que rien ne cite : Webflow, vides, ou type par défaut"""
+    removable = []
+    for name, value in element.attrs.items():
+        if name == 'data-w-id':
+            # Interactions Webflow : l'identifiant figure dans les données IX2 du JS
+            drop = value not in context.js_tokens
+        elif name.startswith(('data-wf', 'data-w-')):
+            drop = not context.referenced(name)
+        elif name == 'id' and value.startswith('w-node-'):
+            # Placement dans la grille : règle #w-node-... de la feuille Webflow
+            drop = not context.referenced(value) and value not in context.anchors
+        elif name in ('class', 'style'):
+            drop = not value.strip()
+        elif name == 'type':
+            drop = value.lower() in REDUNDANT_TYPES.get(element.tag, ())
+        else:
+            drop = False
+        if drop:
+            removable.append(name)
+    return removable
+
+
+def is_empty_wrapper(element, context):
+    """div/span sans contenu dont aucun attribut n'est cité (ou simple conteneur d'embed)"""
+    if element.tag not in WRAPPER_ELEMENTS or element.children:
+        return False
+    if any(name != 'class' for name in element.attrs):
+        return False
+    return all(name in EMPTY_WRAPPER_CLASSES or not context.referenced(name)
+               for name in classes_of(element))
+
+
+def compact_whitespace(element, context, ancestors):
+    """Réduit les blancs des textes enfants ; ceux qui touchent un bloc disparaissent"""
+    children = element.children
+    inner = ancestors + [selector_keys(element)]
+    # Rien n'est rendu dans <head> : ses blancs disparaissent tous
+    parent_block = element.tag in ('', 'head') or is_block(element, context, ancestors)
+    compacted = []
+    for index, child in enumerate(children):
+        if not isinstance(child, str):
+            compacted.append(child)
+            continue
+        previous = children[index - 1] if index else None
+        following = children[index + 1] if index + 1 < len(children) else None
+        text = WHITESPACE_PATTERN.sub(lambda m: '\n' if '\n' in m.group(0) else ' ', child)
+        if element.tag == 'head' or (is_block(previous, context, inner) if previous is not None
+                                     else parent_block):
+            text = text.lstrip(WHITESPACE)
+        if element.tag == 'head' or (is_block(following, context, inner) if following is not None
+                                     else parent_block):
+            text = text.rstrip(WHITESPACE)
+        if text:
+            compacted.append(text)
+    element.children = compacted
+
+
+def compact(element, context, stats, ancestors, preserve=False):
+    """Compacte un sous-arbre ; renvoie False si l'élément doit disparaître"""
+    removable = removable_attributes(element, context)
+    for name in removable:
+        element.start = set_attribute(element.start, name, None)
+        del element.attrs[name]
+    stats['attributes'] += len(removable)
+    if element.tag == 'title':
+        # Le navigateur réduit et rogne les blancs du titre
+        element.children = [WHITESPACE_PATTERN.sub(' ', ''.join(element.children)).strip(WHITESPACE)]
+    if element.tag in RAW_ELEMENTS:
+        return True
+
+    preserve = preserve or preserves_whitespace(element, context, ancestors)
+    inner = ancestors + [selector_keys(element)]
+    children = []
+    for child in element.children:
+        if isinstance(child, Markup) and child.text.startswith('<!--') and not child.text.startswith('<!--['):
+            stats['comments'] += 1
+            continue
+        if isinstance(child, Element) and not compact(child, context, stats, inner, preserve):
+            stats['wrappers'] += 1
+            continue
+        if isinstance(child, str) and children and isinstance(children[-1], str):
+            children[-1] += child
+            continue
+        children.append(child)
+    element.children = children
+
+    if not preserve:
+        compact_whitespace(element, context, ancestors)
+    return not is_empty_wrapper(element, context)
+
+
+def inline_assets(element):
+    """Contenus des <style> et <script> inline de la page"""
+    styles, scripts = [], []
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, Element):
+            continue
+        if node.tag == 'style':
+            styles.extend(node.children)
+        elif node.tag == 'script':
+            scripts.extend(node.children)
+        else:
+            stack.extend(node.children)
+    return styles, scripts
+
+
+def compact_page(job):
+    """Compacte une page ; renvoie (contenu ou None, octets avant, octets après, compteurs, erreur)"""
+    root, page, context = job
+    try:
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError as e:
+        return None, 0, 0, {}, str(e)
+
+    tree = parse_page(content)
+    styles, scripts = inline_assets(tree)
+    for text in styles:
+        context.add_stylesheet(stylesheet_summary(text))
+    for text in scripts:
+        context.add_script(set(NAME_TOKEN_PATTERN.findall(text)))
+
+    stats = {'attributes': 0, 'wrappers': 0, 'comments': 0}
+    compact(tree, context, stats, [])
+    compacted = serialize(tree)
+    before = len(content.encode('utf-8'))
+    after = len(compacted.encode('utf-8'))
+    return (compacted if compacted != content else None), before, after, stats, None
+
+
+def page_contexts(root, graph, pages):
+    """Contexte de chaque page : feuilles (et @import) et scripts qu'elle charge"""
+    anchors = {}
+    for source in graph.files():
+        for target in graph.references(source, ANCHOR):
+            path, _, fragment = target.partition('#')
+            anchors.setdefault(path, set()).add(fragment)
+
+    summaries = {}
+
+    def read(path):
+        with open(os.path.join(root, path), 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+    contexts = []
+    for page in pages:
+        context = PageContext(anchors.get(page, ()))
+        stylesheets = [path for path in graph.references(page, STYLESHEET) if graph.exists(path)]
+        for path in stylesheets + imported_stylesheets(graph, page, stylesheets):
+            if path not in summaries:
+                summaries[path] = stylesheet_summary(read(path))
+            context.add_stylesheet(summaries[path])
+        for path in graph.references(page, SCRIPT):
+            if not graph.exists(path):
+                continue
+            if path not in summaries:
+                summaries[path] = set(NAME_TOKEN_PATTERN.findall(read(path)))
+            context.add_script(summaries[path])
+        contexts.append(context)
+    return contexts
+
+
+def compact_pages(root=SITE_ROOT, patterns=DEFAULT_PAGES, dry_run=False, workers=None):
+    """Compacte les pages en parallèle et affiche le gain de chacune"""
+
+    pages = expand_pages(root, patterns)
+    if not pages:
+        print("⚠️  Aucune page trouvée")
+        return {}
+
+    graph = get_asset_graph(root, workers=workers)
+    contexts = page_contexts(root, graph, pages)
+    results = parallel_map(compact_page, [(root, page, context) for page, context in zip(pages, contexts)],
+                           workers=workers or os.cpu_count() or 1, chunksize=1)
+
+    print("🗜️  Compactage HTML :")
+    rewrites = {}
+    total_before = 0
+    total_after = 0
+    totals = {'attributes': 0, 'wrappers': 0, 'comments': 0}
+    for page, (content, before, after, stats, error) in zip(pages, results):
+        if error:
+            print(f"   ⚠️  {page} : {error}")
+            continue
+        total_before += before
+        total_after += after
+        for name, count in stats.items():
+            totals[name] += count
+        if content is None:
+            print(f"   ℹ️  {page} déjà compacte ({before/1024:.1f} KB)")
+            continue
+        rewrites[page] = content
+        ratio = (1 - after / before) * 100 if before else 0
+        print(f"   📄 {page} : {before/1024:.1f} KB -> {after/1024:.1f} KB (-{ratio:.0f}%), "
+              f"{stats['attributes']} attributs, {stats['wrappers']} conteneurs vides, "
+              f"{stats['comments']} commentaires")
+
+    if not dry_run:
+        for page, content in rewrites.items():
+            file_path = os.path.join(root, page)
+            os.replace(write_atomically(file_path, content), file_path)
+
+    print(f"\n📊 Résumé :")
+    print(f"   Pages compactées : {len(rewrites)} sur {len(pages)}")
+    print(f"   Attributs retirés : {totals['attributes']}")
+    print(f"   Conteneurs vides supprimés : {totals['wrappers']}")
+    print(f"   Commentaires supprimés : {totals['comments']}")
+    print(f"   Taille avant : {total_before/1024:.1f} KB")
+    print(f"   Taille après : {total_after/1024:.1f} KB")
+    print(f"\n💾 Économie : {(total_before - total_after)/1024:.1f} KB")
+    if dry_run:
+        print("\nℹ️  Mode simulation : aucune page réécrite")
+    return rewrites
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compacte les pages HTML exportées par Webflow")
+    parser.add_argument('pages', nargs='*', default=DEFAULT_PAGES,
+                        help="pages ou globs relatifs au site (défaut : toutes les pages)")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--dry-run', action='store_true',
+                        help="afficher les gains sans réécrire les pages")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : tous les cœurs)")
+    args = parser.parse_args()
+
+    compact_pages(args.root, args.pages, args.dry_run, args.workers)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Script pour précompresser les assets texte du site (.gz, et .br si disponible)
+Les fichiers inchangés depuis le dernier passage ne sont pas recompressés, et un
+tableau donne le poids transféré par page à partir du graphe des assets
+"""
+
+import argparse
+import gzip
+import os
+import posixpath
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from asset_graph import (ASSET, MAIN_PAGES, SCRIPT, SITE_ROOT, STYLESHEET, cache_path_for,
+                         get_asset_graph, hash_file, load_cache, parallel_map, save_cache,
+                         walk_site)
+
+# Dossiers précompressés, en plus des pages HTML à la racine
+COMPRESSED_DIRECTORIES = ('css', 'js', 'fonts')
+# Formats qui gagnent à être compressés (woff2, images et vidéos le sont déjà)
+COMPRESSIBLE_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg', '.otf', '.ttf', '.txt', '.xml')
+
+# Budget de transfert par page (HTML + CSS + JS + polices + images)
+DEFAULT_BUDGET_KB = 1000
+
+
+def encoders(use_brotli=True):
+    """Extensions produites et fonction de compression de chacune"""
+    found = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if use_brotli and brotli is not None:
+        found['.br'] = lambda data: brotli.compress(data, quality=11)
+    return found
+
+
+def is_target(path):
+    """Pages HTML de la racine et fichiers texte de css/, js/, fonts/"""
+    directory = path.split('/', 1)[0] if '/' in path else ''
+    if directory not in COMPRESSED_DIRECTORIES and not (directory == '' and path.endswith('.html')):
+        return False
+    return path.endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+def find_targets(root):
+    """Fichiers à précompresser, chemins relatifs triés"""
+    return [path for path, _, _ in walk_site(root) if is_target(path)]
+
+
+def compress_file(job):
+    """Écrit les versions compressées d'un fichier si son contenu a changé
+
+    Renvoie (empreinte, {extension: taille ou None}, recompressé). Une version
+    qui n'est pas plus petite que l'original n'est pas écrite (taille None).
+    """
+    root, path, previous, use_brotli = job
+    file_path = os.path.join(root, path)
+    digest = hash_file(file_path)
+
+    if previous and previous[0] == digest and all(
+            os.path.exists(file_path + extension)
+            for extension, size in previous[1].items() if size is not None):
+        if set(previous[1]) == set(encoders(use_brotli)):
+            return digest, previous[1], False
+
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    sizes = {}
+    for extension, encode in encoders(use_brotli).items():
+        compressed = encode(data)
+        output_path = file_path + extension
+        if len(compressed) >= len(data):
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            sizes[extension] = None
+            continue
+        tmp_path = output_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, output_path)
+        sizes[extension] = len(compressed)
+    return digest, sizes, True
+
+
+def page_files(graph, page):
+    """Fichiers chargés par une page : elle-même, CSS, JS et leurs assets"""
+    files = [page]
+    queue = [page]
+    while queue:
+        source = queue.pop(0)
+        for kind, target in graph.edges.get(source, []):
+            if kind in (STYLESHEET, SCRIPT, ASSET) and graph.exists(target) and target not in files:
+                files.append(target)
+                queue.append(target)
+    return files
+
+
+def print_budget_table(graph, entries, pages, budget_kb, use_brotli):
+    """Tableau du poids transféré par page, avec la meilleure version disponible"""
+    print(f"\n📏 Budget de transfert par page ({budget_kb} KB) :")
+    header = f"   {'Page':<32} {'Req.':>5} {'Brut':>10} {'gzip':>10}"
+    if use_brotli:
+        header += f" {'brotli':>10}"
+    print(header)
+
+    over = 0
+    for page in pages:
+        if not graph.exists(page):
+            print(f"   ⚠️  {page} introuvable")
+            continue
+        files = page_files(graph, page)
+        raw = gz = br = 0
+        for path in files:
+            size = graph.size(path)
+            sizes = entries.get(path, (None, {}))[1]
+            raw += size
+            gz += sizes.get('.gz') or size
+            br += sizes.get('.br') or sizes.get('.gz') or size
+
+        transfer = br if use_brotli else gz
+        status = '✅' if transfer <= budget_kb * 1024 else '❌'
+        over += status == '❌'
+        line = f"   {page:<32} {len(files):>5} {raw/1024:>7.1f} KB {gz/1024:>7.1f} KB"
+        if use_brotli:
+            line += f" {br/1024:>7.1f} KB"
+        print(f"{line} {status}")
+
+    if over:
+        print(f"\n❌ {over} page(s) au-dessus du budget")
+    else:
+        print(f"\n✅ Toutes les pages respectent le budget")
+
+
+def compress_assets(root=SITE_ROOT, use_brotli=True, workers=None, use_cache=True,
+                    pages=MAIN_PAGES, budget_kb=DEFAULT_BUDGET_KB):
+    """Précompresse les assets texte en parallèle et affiche le budget par page"""
+
+    use_brotli = use_brotli and brotli is not None
+    if brotli is None:
+        print("ℹ️  Module brotli absent : seuls les fichiers .gz sont produits")
+
+    cache_path = cache_path_for(root, 'compress')
+    cached = load_cache(cache_path) if use_cache else {}
+
+    targets = find_targets(root)
+    jobs = [(root, path, cached.get(path), use_brotli) for path in targets]
+    results = parallel_map(compress_file, jobs, workers=workers or os.cpu_count() or 1, chunksize=4)
+
+    entries = {}
+    recompressed = 0
+    total_raw = total_gz = total_br = 0
+    for path, (digest, sizes, changed) in zip(targets, results):
+        entries[path] = (digest, sizes)
+        recompressed += changed
+        size = os.path.getsize(os.path.join(root, path))
+        total_raw += size
+        total_gz += sizes.get('.gz') or size
+        total_br += sizes.get('.br') or sizes.get('.gz') or size
+
+    if use_cache and entries != cached:
+        save_cache(cache_path, entries)
+
+    print(f"🗜️  Précompression : {len(targets)} fichiers, {recompressed} recompressés, "
+          f"{len(targets) - recompressed} inchangés")
+    for directory in ('',) + COMPRESSED_DIRECTORIES:
+        paths = [path for path in targets if posixpath.dirname(path).split('/')[0] == directory]
+        if not paths:
+            continue
+        raw = sum(os.path.getsize(os.path.join(root, path)) for path in paths)
+        gz = sum(entries[path][1].get('.gz') or os.path.getsize(os.path.join(root, path)) for path in paths)
+        label = f"{directory}/" if directory else 'pages HTML'
+        print(f"   📁 {label} : {raw/1024:.1f} KB -> gzip {gz/1024:.1f} KB")
+
+    print(f"\n📊 Résumé :")
+    print(f"   Taille brute : {total_raw/1024:.1f} KB")
+    print(f"   gzip -9 : {total_gz/1024:.1f} KB")
+    if use_brotli:
+        print(f"   brotli 11 : {total_br/1024:.1f} KB")
+
+    graph = get_asset_graph(root)
+    print_budget_table(graph, entries, pages, budget_kb, use_brotli)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Précompresse les assets texte du site")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--no-brotli', action='store_true',
+                        help="ne produire que les fichiers .gz")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="tout recompresser, même les fichiers inchangés")
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET_KB,
+                        help="budget de transfert par page, en KB")
+    parser.add_argument('--all-pages', action='store_true',
+                        help="afficher toutes les pages et pas seulement les principales")
+    args = parser.parse_args()
+
+    pages = get_asset_graph(args.root).pages() if args.all_pages else MAIN_PAGES
+    compress_assets(args.root, not args.no_brotli, args.workers, not args.no_cache,
+                    pages, args.budget)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Parcours en largeur du site à partir de racines (index.html, robots.txt...)
+Calcule l'accessibilité de chaque page et asset, sa profondeur depuis les racines,
+et classe automatiquement les fichiers orphelins
+"""
+
+import argparse
+import os
+import posixpath
+import re
+import urllib.parse
+from collections import deque
+
+from asset_graph import ANCHOR, SITE_ROOT, get_asset_graph, normalize_reference
+
+DEFAULT_ROOTS = ['index.html', 'robots.txt']
+
+ROBOTS_PATTERN = re.compile(r'^\s*(?:sitemap|allow)\s*:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+SITEMAP_PATTERN = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>', re.IGNORECASE)
+
+# Catégories d'orphelins reconnues au nom du fichier, dans l'ordre de priorité
+ORPHAN_PATTERNS = [
+    ('generated', re.compile(r'-(?:clean|critical|prerendered)\.html$')),
+    ('backup', re.compile(r'(?:-original|-backup|-old|-copy)\.html$|\.(?:bak|backup)', re.IGNORECASE)),
+    ('test', re.compile(r'(?:^|[-_/])tests?[-_.]', re.IGNORECASE)),
+    ('variant', re.compile(r'[@?]')),
+]
+# Orphelins qui lient encore vers le site : pages de contenu dont le lien entrant a disparu
+DETACHED = 'detached'
+ISOLATED = 'isolated'
+
+ORPHAN_LABELS = {
+    'generated': '🛠️  Générés par les outils',
+    'backup': '💾 Sauvegardes',
+    'test': '🧪 Tests',
+    'variant': '🔍 Variantes (filtres)',
+    DETACHED: '🎨 Sans lien entrant',
+    ISOLATED: '❓ Isolés',
+}
+
+
+class CrawlResult:
+    """Résultat du parcours : profondeur et prédécesseur de chaque fichier atteint"""
+
+    __slots__ = ('roots', 'missing_roots', 'depth', 'parent')
+
+    def __init__(self, roots):
+        self.roots = roots
+        self.missing_roots = []
+        self.depth = {}       # chemin -> nombre de liens depuis la racine la plus proche
+        self.parent = {}      # chemin -> fichier par lequel il a été atteint (None : racine)
+
+    def reachable(self, path):
+        return path in self.depth
+
+    def path_to(self, path):
+        """Chaîne de liens de la racine jusqu'au fichier"""
+        chain = []
+        while path is not None:
+            chain.append(path)
+            path = self.parent.get(path)
+        return list(reversed(chain))
+
+
+def root_links(graph, path):
+    """Cibles citées par un robots.txt (Sitemap, Allow) ou un sitemap.xml"""
+    file_path = os.path.join(graph.root, path)
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    pattern = SITEMAP_PATTERN if path.endswith('.xml') else ROBOTS_PATTERN
+
+    targets = []
+    for url in pattern.findall(content):
+        # Les URL absolues du domaine sont ramenées à leur chemin local
+        local = urllib.parse.urlsplit(url).path or '/'
+        if local.endswith('/'):
+            local += 'index.html'
+        target = normalize_reference(path, local)
+        if target:
+            targets.append(target)
+    return targets
+
+
+def successors(graph, path):
+    if path.endswith(('.txt', '.xml')):
+        return root_links(graph, path)
+    return [target for kind, target in graph.edges.get(path, ()) if kind != ANCHOR]
+
+
+def crawl_site(graph, roots=DEFAULT_ROOTS):
+    """Parcours en largeur depuis les racines, linéaire en fichiers + références"""
+    result = CrawlResult(list(roots))
+    queue = deque()
+
+    for root in roots:
+        if not graph.exists(root):
+            result.missing_roots.append(root)
+        elif root not in result.depth:
+            result.depth[root] = 0
+            result.parent[root] = None
+            queue.append(root)
+
+    while queue:
+        source = queue.popleft()
+        depth = result.depth[source] + 1
+        for target in successors(graph, source):
+            if target not in result.depth and graph.exists(target):
+                result.depth[target] = depth
+                result.parent[target] = source
+                queue.append(target)
+
+    return result
+
+
+def classify_orphan(graph, result, path):
+    """Catégorie d'un fichier non atteint : nom reconnu, page détachée ou isolée"""
+    name = posixpath.basename(path)
+    for category, pattern in ORPHAN_PATTERNS:
+        if pattern.search(name):
+            return category
+    if any(result.reachable(target) for target in successors(graph, path)):
+        return DETACHED
+    return ISOLATED
+
+
+def orphans_by_category(graph, result, paths):
+    categories = {}
+    for path in paths:
+        if not result.reachable(path):
+            categories.setdefault(classify_orphan(graph, result, path), []).append(path)
+    return categories
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parcourt le site depuis ses racines")
+    parser.add_argument('roots', nargs='*', default=DEFAULT_ROOTS,
+                        help="fichiers de départ relatifs au site")
+    parser.add_argument('--root', default=SITE_ROOT)
+    args = parser.parse_args()
+
+    graph = get_asset_graph(args.root)
+    result = crawl_site(graph, args.roots)
+
+    for root in result.missing_roots:
+        print(f"⚠️  Racine introuvable : {root}")
+
+    files = sorted(graph.sizes)
+    levels = {}
+    for path, depth in result.depth.items():
+        levels.setdefault(depth, []).append(path)
+
+    print(f"🕸️  Parcours depuis {', '.join(args.roots)} :")
+    for depth in sorted(levels):
+        pages = sum(1 for path in levels[depth] if path.endswith('.html'))
+        print(f"   Profondeur {depth} : {len(levels[depth])} fichiers dont {pages} pages")
+
+    orphans = orphans_by_category(graph, result, files)
+    orphan_count = sum(len(paths) for paths in orphans.values())
+    orphan_size = sum(graph.size(path) for paths in orphans.values() for path in paths)
+
+    print(f"\n📊 Résumé :")
+    print(f"   Fichiers : {len(files)}")
+    print(f"   Atteignables : {len(result.depth)}")
+    print(f"   Orphelins : {orphan_count} ({orphan_size/1024:.1f} KB)")
+
+    for category, paths in sorted(orphans.items()):
+        print(f"\n{ORPHAN_LABELS[category]} ({len(paths)}) :")
+        for path in sorted(paths):
+            print(f"   - {path} ({graph.size(path)/1024:.1f} KB)")
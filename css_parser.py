@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Petit parseur CSS partagé par les outils d'analyse et de build
+Découpe une feuille de style en règles et at-rules, et la resérialise
+"""
+
+import re
+
+# At-rules dont le bloc contient d'autres règles
+NESTED_AT_RULES = ('media', 'supports', 'document', 'layer', 'container')
+
+COMMENT_OR_STRING = re.compile(r'/\*.*?(?:\*/|$)|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.DOTALL)
+STRUCTURE_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|\\.|[{};()\[\]]')
+AT_KEYWORD = re.compile(r'@(-?[\w-]+)')
+
+# Composants d'un sélecteur
+PSEUDO_PATTERN = re.compile(r'::?[\w-]+(?:\([^()]*\))?')
+ATTRIBUTE_PATTERN = re.compile(r'\[[^\]]*\]')
+CLASS_PATTERN = re.compile(r'\.((?:[\w-]|\\.)+)')
+ID_PATTERN = re.compile(r'#((?:[\w-]|\\.)+)')
+TAG_PATTERN = re.compile(r'(?:^|[\s>+~(])([a-zA-Z][\w-]*)')
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+
+class Rule:
+    """Règle de style : sélecteurs { déclarations }"""
+
+    __slots__ = ('selector', 'body')
+
+    def __init__(self, selector, body):
+        self.selector = selector
+        self.body = body
+
+    def selectors(self):
+        return split_selectors(self.selector)
+
+
+class AtRule:
+    """At-rule : @media/@supports avec des règles enfants, ou bloc/instruction brut"""
+
+    __slots__ = ('name', 'prelude', 'children', 'body')
+
+    def __init__(self, name, prelude, children=None, body=None):
+        self.name = name          # 'media', 'font-face', 'import'...
+        self.prelude = prelude    # texte complet avant le bloc ('@media (max-width: 767px)')
+        self.children = children  # règles enfants pour NESTED_AT_RULES
+        self.body = body          # contenu brut du bloc (None pour @import, @charset...)
+
+
+def strip_comments(text):
+    """Supprime les commentaires sans toucher au contenu des chaînes"""
+    return COMMENT_OR_STRING.sub(lambda m: '' if m.group().startswith('/*') else m.group(), text)
+
+
+def _next_stop(text, pos):
+    """Position du prochain '{', '}' ou ';' hors chaînes et parenthèses"""
+    depth = 0
+    for match in STRUCTURE_TOKEN.finditer(text, pos):
+        token = match.group()
+        if token in '([':
+            depth += 1
+        elif token in ')]':
+            depth = max(0, depth - 1)
+        elif token in '{};' and depth == 0:
+            return match.start()
+    return len(text)
+
+
+def _matching_brace(text, pos):
+    """Position de l'accolade fermante associée à celle en text[pos]"""
+    depth = 0
+    for match in STRUCTURE_TOKEN.finditer(text, pos):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return len(text)
+
+
+def _parse_block(text, pos):
+    nodes = []
+    while pos < len(text):
+        stop = _next_stop(text, pos)
+        prelude = text[pos:stop].strip()
+
+        if stop >= len(text):
+            break
+
+        char = text[stop]
+        if char == '}':
+            return nodes, stop + 1
+
+        if char == ';':
+            if prelude.startswith('@'):
+                name = AT_KEYWORD.match(prelude).group(1).lower()
+                nodes.append(AtRule(name, prelude))
+            pos = stop + 1
+            continue
+
+        if prelude.startswith('@'):
+            name = AT_KEYWORD.match(prelude).group(1).lower()
+            if name in NESTED_AT_RULES:
+                children, pos = _parse_block(text, stop + 1)
+                nodes.append(AtRule(name, prelude, children=children))
+                continue
+            end = _matching_brace(text, stop)
+            nodes.append(AtRule(name, prelude, body=text[stop + 1:end].strip()))
+        else:
+            end = _matching_brace(text, stop)
+            nodes.append(Rule(prelude, text[stop + 1:end].strip()))
+        pos = end + 1
+
+    return nodes, len(text)
+
+
+def parse_css(text):
+    """Découpe une feuille de style en liste de Rule / AtRule"""
+    nodes, _ = _parse_block(strip_comments(text), 0)
+    return nodes
+
+
+def serialize_css(nodes, indent=''):
+    """Resérialise une liste de Rule / AtRule"""
+    lines = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            lines.append(f'{indent}{node.selector} {{ {node.body} }}')
+        elif node.children is not None:
+            lines.append(f'{indent}{node.prelude} {{')
+            lines.append(serialize_css(node.children, indent + '  '))
+            lines.append(f'{indent}}}')
+        elif node.body is not None:
+            lines.append(f'{indent}{node.prelude} {{ {node.body} }}')
+        else:
+            lines.append(f'{indent}{node.prelude};')
+    return '\n'.join(line for line in lines if line)
+
+
+def split_selectors(selector):
+    """Sépare une liste de sélecteurs sur les virgules de premier niveau"""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(selector):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(selector[start:i].strip())
+            start = i + 1
+    parts.append(selector[start:].strip())
+    return [part for part in parts if part]
+
+
+def selector_names(selector):
+    """Classes, ids et balises qu'un élément doit porter pour que le sélecteur s'applique
+
+    Les pseudo-classes (:not(), :hover...) et les sélecteurs d'attribut sont
+    ignorés : le résultat reste conservateur.
+    """
+    previous = None
+    while previous != selector:
+        previous = selector
+        selector = PSEUDO_PATTERN.sub('', selector)
+    selector = ATTRIBUTE_PATTERN.sub('', selector)
+
+    classes = {ESCAPE_PATTERN.sub(r'\1', name) for name in CLASS_PATTERN.findall(selector)}
+    ids = {ESCAPE_PATTERN.sub(r'\1', name) for name in ID_PATTERN.findall(selector)}
+    tags = {tag.lower() for tag in TAG_PATTERN.findall(CLASS_PATTERN.sub('', ID_PATTERN.sub('', selector)))}
+    return classes, ids, tags
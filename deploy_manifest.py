@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Script pour préparer un déploiement incrémental du site
+Calcule le manifeste adressé par contenu des fichiers atteignables depuis les pages principales
+(chemin -> empreinte, taille, classe de cache), le compare au manifeste du dernier déploiement
+et produit le plan minimal : envois, copies, suppressions et en-têtes Cache-Control
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+
+from asset_graph import MAIN_PAGES, SITE_ROOT, get_asset_graph
+from bundle_assets import write_atomically
+from crawl_site import ORPHAN_LABELS, crawl_site, orphans_by_category
+from prerender_pages import MANIFEST_NAME, output_name
+
+MANIFEST_PATH = os.path.join('deploy', 'manifest.json')
+MANIFEST_VERSION = 1
+DEFAULT_ROOTS = MAIN_PAGES + ['robots.txt']
+
+# Variantes précompressées (compress_assets) servies à la place de l'original
+ENCODED_SUFFIXES = ('.gz', '.br')
+
+# Classes de cache et en-tête Cache-Control associé
+CACHE_CLASSES = {
+    'immutable': 'public, max-age=31536000, immutable',
+    'media': 'public, max-age=604800',
+    'asset': 'public, max-age=3600',
+    'document': 'public, max-age=300, must-revalidate',
+}
+# Nom empreinté (bundle.<hash>.css, webflow.schunk.<hash>.js, <nom>.<hash>.min.css) :
+# le contenu ne change jamais
+FINGERPRINT_PATTERN = re.compile(r'\.[0-9a-f]{8,}(?:\.min)?\.[A-Za-z0-9]+$')
+DOCUMENT_EXTENSIONS = ('.html', '.txt', '.xml', '.json', '.webmanifest')
+MEDIA_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico',
+                    '.mp4', '.webm', '.mov', '.woff', '.woff2', '.otf', '.ttf')
+
+
+def original_path(path):
+    for suffix in ENCODED_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def cache_class(path):
+    """Classe de cache d'un fichier (une variante .gz/.br suit son original)"""
+    path = original_path(path).lower()
+    if FINGERPRINT_PATTERN.search(posixpath.basename(path)):
+        return 'immutable'
+    if path.endswith(DOCUMENT_EXTENSIONS):
+        return 'document'
+    if path.endswith(MEDIA_EXTENSIONS):
+        return 'media'
+    return 'asset'
+
+
+def server_outputs(root):
+    """Fichiers lus directement par server.js : pages précalculées (prerender_pages) et leur manifeste"""
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    outputs = [MANIFEST_NAME]
+    for page, entry in sorted(manifest.items()):
+        output = entry.get('output') or output_name(page)
+        if os.path.exists(os.path.join(root, output)):
+            outputs.append(output)
+    return outputs
+
+
+def deployable_files(graph, roots):
+    """Fichiers atteignables depuis les racines, avec leurs variantes précompressées"""
+    result = crawl_site(graph, roots)
+    files = set()
+    for path in result.depth:
+        files.add(path)
+        files.update(path + suffix for suffix in ENCODED_SUFFIXES if graph.exists(path + suffix))
+    return sorted(files), result
+
+
+def build_manifest(graph, files):
+    """Empreintes SHA-256 du graphe : lues par morceaux, en parallèle et gardées en cache"""
+    return {path: {'hash': graph.hashes[path], 'size': graph.size(path), 'cache': cache_class(path)}
+            for path in files}
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(path, files):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    content = json.dumps({'version': MANIFEST_VERSION, 'cache_classes': CACHE_CLASSES, 'files': files},
+                         indent=2, sort_keys=True)
+    os.replace(write_atomically(path, content + '\n'), path)
+
+
+def plan_deploy(previous, current):
+    """Plan minimal : contenu déjà présent ailleurs copié, HTML envoyé après ses assets
+
+    Les étapes sont dans l'ordre d'exécution : assets envoyés, copies, puis
+    documents, pour qu'une page publiée ne cite jamais un asset encore en
+    cours de copie. Les suppressions viennent en dernier : une page encore
+    en cache ne référence jamais un fichier déjà retiré.
+    """
+    by_hash = {}
+    for path, entry in previous.items():
+        by_hash.setdefault(entry['hash'], path)
+
+    upload, copy, headers = [], [], []
+    unchanged = 0
+    for path, entry in current.items():
+        old = previous.get(path)
+        if old is not None and old['hash'] == entry['hash']:
+            if old.get('cache') != entry['cache']:
+                headers.append({'path': path, 'cache_control': CACHE_CLASSES[entry['cache']]})
+            else:
+                unchanged += 1
+            continue
+        action = {'path': path, 'size': entry['size'], 'cache_control': CACHE_CLASSES[entry['cache']]}
+        if entry['hash'] in by_hash:
+            copy.append({**action, 'from': by_hash[entry['hash']]})
+        else:
+            upload.append(action)
+
+    upload.sort(key=lambda action: action['path'])
+    documents = [action for action in upload if cache_class(action['path']) == 'document']
+    assets = [action for action in upload if cache_class(action['path']) != 'document']
+    delete = sorted(path for path in previous if path not in current)
+    return {'upload': assets, 'copy': copy, 'upload_documents': documents, 'headers': headers,
+            'delete': delete, 'unchanged': unchanged}
+
+
+def deploy_manifest(root=SITE_ROOT, roots=DEFAULT_ROOTS, manifest_path=MANIFEST_PATH,
+                    plan_path=None, save=False, workers=None, include=()):
+    """Calcule le manifeste, le plan d'envoi par rapport au dernier déploiement et l'affiche"""
+
+    graph = get_asset_graph(root, workers=workers)
+    # Les pages précalculées ne sont liées par aucune page : on part aussi d'elles
+    extra = [path for path in server_outputs(root) + list(include) if path not in roots]
+    for path in extra:
+        print(f"➕ Racine ajoutée : {path}")
+    files, result = deployable_files(graph, list(roots) + extra)
+    for missing in result.missing_roots:
+        print(f"⚠️  Racine introuvable : {missing}")
+
+    current = build_manifest(graph, files)
+    previous = load_manifest(manifest_path)
+    plan = plan_deploy(previous, current)
+
+    deploy_size = sum(entry['size'] for entry in current.values())
+    site_size = sum(graph.sizes.values())
+    print(f"📦 Ensemble déployable : {len(current)} fichiers, {deploy_size/1024:.1f} KB "
+          f"(site : {len(graph.sizes)} fichiers, {site_size/1024:.1f} KB)")
+
+    excluded = [path for path in graph.sizes if path not in current and original_path(path) not in current]
+    if excluded:
+        print(f"\n🚫 Exclus (non atteignables) : {len(excluded)} fichiers, "
+              f"{sum(graph.size(path) for path in excluded)/1024:.1f} KB")
+        for category, paths in sorted(orphans_by_category(graph, result, excluded).items()):
+            size = sum(graph.size(path) for path in paths)
+            print(f"   {ORPHAN_LABELS[category]} : {len(paths)} ({size/1024:.1f} KB)")
+
+    classes = {}
+    for entry in current.values():
+        count, size = classes.get(entry['cache'], (0, 0))
+        classes[entry['cache']] = (count + 1, size + entry['size'])
+    print(f"\n🗂️  Classes de cache :")
+    for name, header in CACHE_CLASSES.items():
+        if name in classes:
+            count, size = classes[name]
+            print(f"   {name:<10} {count:>5} fichiers {size/1024:>10.1f} KB  {header}")
+
+    if not previous:
+        print(f"\n📂 Pas de manifeste précédent dans {manifest_path} : tout est à envoyer")
+    uploads = plan['upload'] + plan['upload_documents']
+    upload_size = sum(action['size'] for action in uploads)
+    print(f"\n🚀 Plan de déploiement :")
+    print(f"   ⬆️  À envoyer : {len(uploads)} ({upload_size/1024:.1f} KB), "
+          f"dont {len(plan['upload_documents'])} documents après les copies")
+    print(f"   📋 À copier côté serveur : {len(plan['copy'])}")
+    print(f"   🏷️  En-têtes à mettre à jour : {len(plan['headers'])}")
+    print(f"   🗑️  À supprimer : {len(plan['delete'])}")
+    print(f"   ✅ Inchangés : {plan['unchanged']}")
+    for action in plan['upload'][:20]:
+        print(f"      ⬆️  {action['path']} ({action['size']/1024:.1f} KB)")
+    if len(plan['upload']) > 20:
+        print(f"      ... et {len(plan['upload']) - 20} autres")
+    for action in plan['copy']:
+        print(f"      📋 {action['from']} -> {action['path']}")
+    for action in plan['upload_documents'][:20]:
+        print(f"      ⬆️  {action['path']} ({action['size']/1024:.1f} KB)")
+    if len(plan['upload_documents']) > 20:
+        print(f"      ... et {len(plan['upload_documents']) - 20} autres")
+    for path in plan['delete']:
+        print(f"      🗑️  {path}")
+
+    if plan_path:
+        os.makedirs(os.path.dirname(plan_path) or '.', exist_ok=True)
+        os.replace(write_atomically(plan_path, json.dumps(plan, indent=2) + '\n'), plan_path)
+        print(f"\n📝 Plan écrit dans {plan_path}")
+    if save:
+        save_manifest(manifest_path, current)
+        print(f"\n💾 Manifeste enregistré : {manifest_path}")
+    return plan
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manifeste de déploiement et plan d'envoi incrémental")
+    parser.add_argument('roots', nargs='*', default=DEFAULT_ROOTS,
+                        help="fichiers de départ relatifs au site (défaut : pages principales et robots.txt)")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--manifest', default=MANIFEST_PATH,
+                        help="manifeste du dernier déploiement")
+    parser.add_argument('--plan', default=None,
+                        help="fichier JSON où écrire le plan")
+    parser.add_argument('--save', action='store_true',
+                        help="enregistrer le nouveau manifeste (après un déploiement réussi)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processus pour le hachage (défaut : automatique)")
+    parser.add_argument('--include', nargs='*', default=[],
+                        help="fichiers à déployer en plus (lus par le serveur sans être liés)")
+    args = parser.parse_args()
+
+    deploy_manifest(args.root, args.roots, args.manifest, args.plan, args.save, args.workers,
+                    args.include)
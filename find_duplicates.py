@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Script pour détecter le contenu dupliqué du site
+Doublons exacts par empreinte, quasi-doublons par shingling + MinHash/LSH,
+au niveau des fichiers, des blocs <style>/<script> inline et des règles CSS
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import zlib
+
+from asset_graph import SITE_ROOT, get_asset_graph, parallel_map
+from clean_pages import tokenize_page
+from css_parser import parse_css, serialize_css
+
+# Shingles de 5 jetons, signatures de 128 compartiments répartis en 32 bandes de 4 :
+# deux contenus tombent dans un même seau dès ~45 % de similarité (1/32)^(1/4)
+SHINGLE_SIZE = 5
+NUM_HASHES = 128
+BANDS = 32
+MERSENNE_PRIME = (1 << 61) - 1
+# Fonction de hachage h(x) = (a*x + b) mod p, identique dans tous les processus
+HASH_A = 0x1f3d5b79a2c4e687
+HASH_B = 0x2b7e151628aed2a6
+
+DEFAULT_THRESHOLD = 0.8
+# Les petits blocs (init d'une ligne...) sont comparés par empreinte seulement
+MIN_BLOCK_SIZE = 256
+DEFAULT_TOP = 10
+
+# 'index.html', mais aussi ses copies 'index.html.backup', 'index.html.old'...
+KIND_PATTERN = re.compile(r'\.(html|css|js)(?:\.[\w-]+)?$')
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+class Unit:
+    """Fichier ou bloc comparé : empreinte exacte et signature MinHash"""
+
+    __slots__ = ('label', 'path', 'kind', 'size', 'digest', 'signature')
+
+    def __init__(self, label, path, kind, size, digest, signature=None):
+        self.label = label          # 'index.html' ou 'index.html <style #2>'
+        self.path = path
+        self.kind = kind            # 'html', 'css', 'js'
+        self.size = size
+        self.digest = digest
+        self.signature = signature  # None si trop petit pour le MinHash
+
+
+def normalize(text):
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Ensemble des empreintes des suites de `size` jetons consécutifs"""
+    tokens = TOKEN_PATTERN.findall(text)
+    if len(tokens) <= size:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))}
+    return {zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+            for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text):
+    """Signature MinHash à une seule permutation (one permutation hashing)
+
+    Chaque shingle n'est haché qu'une fois : il tombe dans l'un des NUM_HASHES
+    compartiments, qui garde la plus petite valeur reçue. La part de
+    compartiments égaux entre deux signatures estime la similarité de Jaccard.
+    """
+    bins = [None] * NUM_HASHES
+    for x in shingles(text):
+        h = (HASH_A * x + HASH_B) % MERSENNE_PRIME
+        slot, value = h % NUM_HASHES, h // NUM_HASHES
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+
+    # Densification : un compartiment vide reprend le premier compartiment plein
+    # à sa droite (circulairement), décalé selon la distance parcourue
+    signature = list(bins)
+    nearest, distance = None, 0
+    for i in reversed(range(2 * NUM_HASHES)):
+        slot = i % NUM_HASHES
+        if bins[slot] is not None:
+            nearest, distance = bins[slot], 0
+        elif nearest is not None:
+            distance += 1
+            signature[slot] = nearest + distance * MERSENNE_PRIME
+    return tuple(signature)
+
+
+def make_unit(label, path, kind, text, min_size=0):
+    text = normalize(text)
+    data = text.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    signature = minhash(text) if len(data) >= min_size else None
+    return Unit(label, path, kind, len(data), digest, signature)
+
+
+def analyze_file(job):
+    """Lit un fichier une fois : unité fichier, blocs inline et règles CSS"""
+    path, file_path, min_block = job
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    kind = KIND_PATTERN.search(path).group(1)
+
+    file_unit = make_unit(path, path, kind, content)
+    blocks = []
+    rules = []
+
+    if kind == 'html':
+        counts = {}
+        for block in tokenize_page(content)[0]:
+            counts[block.kind] = counts.get(block.kind, 0) + 1
+            tag = 'style' if block.kind == 'css' else 'script'
+            label = f'{path} <{tag} #{counts[block.kind]}>'
+            blocks.append(make_unit(label, path, block.kind, block.content, min_block))
+    elif kind == 'css':
+        # Règles de premier niveau : les @media sont comparées d'un seul tenant
+        for node in parse_css(content):
+            text = serialize_css([node])
+            if text:
+                data = text.encode('utf-8')
+                rules.append((hashlib.sha256(data).hexdigest(), len(data), text))
+
+    return file_unit, blocks, rules
+
+
+def exact_groups(units):
+    """Unités de même empreinte, regroupées (groupes d'au moins deux)"""
+    by_digest = {}
+    for unit in units:
+        if unit.size:
+            by_digest.setdefault(unit.digest, []).append(unit)
+    return [group for group in by_digest.values() if len(group) > 1]
+
+
+def lsh_candidates(units, bands=BANDS):
+    """Paires candidates : signatures égales sur au moins une bande
+
+    Chaque unité est rangée dans `bands` seaux ; seules les unités d'un même
+    seau sont comparées, ce qui évite les n² comparaisons.
+    """
+    rows = NUM_HASHES // bands
+    buckets = {}
+    for index, unit in enumerate(units):
+        for band in range(bands):
+            key = (band, unit.signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(index)
+
+    pairs = set()
+    for indexes in buckets.values():
+        for i, first in enumerate(indexes):
+            for second in indexes[i + 1:]:
+                pairs.add((first, second))
+    return pairs
+
+
+def similarity(first, second):
+    return sum(1 for a, b in zip(first.signature, second.signature) if a == b) / NUM_HASHES
+
+
+def near_duplicates(units, threshold=DEFAULT_THRESHOLD):
+    """Paires de quasi-doublons (similarité estimée >= threshold), doublons exacts exclus"""
+    # Un seul représentant par empreinte : les copies exactes sont déjà signalées
+    representatives = list({unit.digest: unit for unit in units
+                            if unit.signature is not None}.values())
+
+    pairs = []
+    for i, j in lsh_candidates(representatives):
+        first, second = representatives[i], representatives[j]
+        if first.kind != second.kind:
+            continue
+        score = similarity(first, second)
+        if score >= threshold:
+            pairs.append((score, first, second))
+    return sorted(pairs, key=lambda pair: (-pair[0], pair[1].label, pair[2].label))
+
+
+def clusters(pairs):
+    """Regroupe les paires de quasi-doublons en familles (union-find)"""
+    parent = {}
+
+    def find(label):
+        parent.setdefault(label, label)
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    for score, first, second in pairs:
+        parent[find(first.label)] = find(second.label)
+
+    families = {}
+    for score, first, second in pairs:
+        family = families.setdefault(find(first.label), [set(), []])
+        family[0].update((first.label, second.label))
+        family[1].append(score)
+    return sorted(((sorted(labels), min(scores), max(scores))
+                   for labels, scores in families.values()),
+                  key=lambda family: (-len(family[0]), family[0]))
+
+
+def short_list(items, limit=4):
+    items = sorted(items)
+    if len(items) <= limit:
+        return ', '.join(items)
+    return f"{', '.join(items[:limit])}... (+{len(items) - limit})"
+
+
+def shared_rules(rules_by_file):
+    """Règles CSS identiques présentes dans plusieurs feuilles, par groupe de feuilles"""
+    files_by_rule = {}
+    sizes = {}
+    for path, rules in rules_by_file.items():
+        for digest, size, text in rules:
+            files_by_rule.setdefault(digest, set()).add(path)
+            sizes[digest] = size
+
+    groups = {}
+    for digest, files in files_by_rule.items():
+        if len(files) > 1:
+            key = tuple(sorted(files))
+            count, size = groups.get(key, (0, 0))
+            groups[key] = (count + 1, size + sizes[digest])
+
+    # Économie : le groupe de règles n'est plus servi qu'une fois
+    return sorted(((size * (len(files) - 1), files, count, size)
+                   for files, (count, size) in groups.items()), reverse=True)
+
+
+def find_duplicates(root=SITE_ROOT, threshold=DEFAULT_THRESHOLD, min_block=MIN_BLOCK_SIZE,
+                    top=DEFAULT_TOP, workers=None):
+    """Analyse le site et affiche doublons, quasi-doublons et blocs factorisables"""
+
+    graph = get_asset_graph(root)
+    paths = [path for path in sorted(graph.sizes) if KIND_PATTERN.search(path)]
+    jobs = [(path, os.path.join(root, path), min_block) for path in paths]
+    results = parallel_map(analyze_file, jobs, workers=workers or os.cpu_count() or 1, chunksize=4)
+
+    files = [file_unit for file_unit, _, _ in results]
+    blocks = [block for _, file_blocks, _ in results for block in file_blocks]
+    rules_by_file = {unit.path: rules for unit, _, rules in results if rules}
+
+    print(f"🔍 Analyse de {len(files)} fichiers et {len(blocks)} blocs inline")
+
+    # Doublons exacts (contenu identique aux espaces près)
+    file_groups = exact_groups(files)
+    file_savings = sum(group[0].size * (len(group) - 1) for group in file_groups)
+    print(f"\n📄 Fichiers identiques :")
+    for group in file_groups:
+        print(f"   - {', '.join(unit.label for unit in group)} "
+              f"({group[0].size/1024:.1f} KB, {group[0].size * (len(group) - 1)/1024:.1f} KB récupérables)")
+    if not file_groups:
+        print("   Aucun")
+
+    file_pairs = near_duplicates(files, threshold)
+    print(f"\n📄 Familles de fichiers quasi identiques (similarité >= {threshold:.0%}) :")
+    for labels, low, high in clusters(file_pairs):
+        similarity_range = f'{low:.0%}' if low == high else f'{low:.0%} à {high:.0%}'
+        print(f"   - {len(labels)} fichiers ({similarity_range}) : {short_list(labels, limit=6)}")
+    if not file_pairs:
+        print("   Aucun")
+
+    # Blocs inline : un bloc répété peut devenir un fichier partagé (voir clean_pages.py)
+    block_groups = sorted(exact_groups(blocks), key=lambda group: -group[0].size * (len(group) - 1))
+    block_savings = sum(group[0].size * (len(group) - 1) for group in block_groups)
+    print(f"\n🧩 Blocs inline répétés (à extraire dans un fichier partagé) :")
+    for group in block_groups[:top]:
+        tag = 'style' if group[0].kind == 'css' else 'script'
+        pages = {unit.path for unit in group}
+        print(f"   - <{tag}> de {group[0].size/1024:.1f} KB, {len(group)} fois sur {len(pages)} pages "
+              f"({short_list(pages)}) : {group[0].size * (len(group) - 1)/1024:.1f} KB")
+    if len(block_groups) > top:
+        print(f"   ... et {len(block_groups) - top} autres blocs")
+    if not block_groups:
+        print("   Aucun")
+
+    block_pairs = near_duplicates(blocks, threshold)
+    print(f"\n🧩 Blocs inline quasi identiques :")
+    for score, first, second in block_pairs[:top]:
+        print(f"   - {first.label} ≈ {second.label} ({score:.0%}, {first.size/1024:.1f} KB)")
+    if not block_pairs:
+        print("   Aucun")
+
+    # Règles CSS partagées entre feuilles : candidates pour une feuille commune
+    rule_groups = shared_rules(rules_by_file)
+    rule_savings = sum(savings for savings, *_ in rule_groups)
+    print(f"\n🎨 Règles CSS communes à plusieurs feuilles :")
+    for savings, group_files, count, size in rule_groups[:top]:
+        print(f"   - {count} règle(s) ({size/1024:.1f} KB) dans {short_list(group_files)} : "
+              f"{savings/1024:.1f} KB")
+    if len(rule_groups) > top:
+        print(f"   ... et {len(rule_groups) - top} autres groupes")
+    if not rule_groups:
+        print("   Aucune")
+
+    print(f"\n💾 Économie potentielle en factorisant :")
+    print(f"   Fichiers identiques : {file_savings/1024:.1f} KB")
+    print(f"   Blocs inline : {block_savings/1024:.1f} KB")
+    print(f"   Règles CSS : {rule_savings/1024:.1f} KB")
+    print(f"   Total : {(file_savings + block_savings + rule_savings)/1024:.1f} KB")
+
+    return file_groups, file_pairs, block_groups, block_pairs, rule_groups
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Détecte le contenu dupliqué du site")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="similarité minimale d'un quasi-doublon (0 à 1)")
+    parser.add_argument('--min-block', type=int, default=MIN_BLOCK_SIZE,
+                        help="taille en octets en dessous de laquelle un bloc n'est comparé qu'à l'identique")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP,
+                        help="nombre de groupes affichés par section")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : tous les cœurs)")
+    args = parser.parse_args()
+
+    find_duplicates(args.root, args.threshold, args.min_block, args.top, args.workers)
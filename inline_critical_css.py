@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Script pour inliner le CSS critique (au-dessus de la ligne de flottaison)
+Le reste des feuilles de style est chargé de façon asynchrone via preload
+"""
+
+import argparse
+import os
+import posixpath
+import re
+from html.parser import HTMLParser
+
+from analyze_unused_selectors import SAFELIST, prune_nodes
+from asset_graph import MAIN_PAGES, SITE_ROOT, CSS_URL_PATTERN, normalize_reference
+from css_parser import Rule, parse_css, serialize_css
+
+# Zone critique : tout le début du body jusqu'à la fin de cet élément
+CRITICAL_ID = 'hero'
+# Sinon, les N premiers éléments du body
+CRITICAL_NODES = 200
+
+HEAD_END_PATTERN = re.compile(r'</head\s*>', re.IGNORECASE)
+LINK_TAG_PATTERN = re.compile(r'<link\b[^>]*>', re.IGNORECASE)
+NOSCRIPT_PATTERN = re.compile(r'<noscript>.*?</noscript>', re.DOTALL | re.IGNORECASE)
+CRITICAL_STYLE_PATTERN = re.compile(r'\s*<style data-critical="">.*?</style>', re.DOTALL)
+TAG_NAME_PATTERN = re.compile(r'^<\s*[\w-]+')
+ATTR_PATTERN = re.compile(r'([^\s=/>]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+
+
+class AboveTheFoldParser(HTMLParser):
+    """Collecte les balises, classes et ids de la zone critique d'une page"""
+
+    def __init__(self, critical_id=CRITICAL_ID, max_nodes=CRITICAL_NODES):
+        super().__init__(convert_charrefs=True)
+        self.critical_id = critical_id
+        self.max_nodes = max_nodes
+        self.names = set()
+        self.nodes = 0
+        self.in_body = False
+        self.region_tag = None   # balise de l'élément critique en cours
+        self.region_depth = 0
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = {name: value or '' for name, value in attrs}
+
+        # html et body portent souvent des classes utiles au premier rendu
+        self.names.add(tag)
+        self.names.update('.' + name for name in attrs.get('class', '').split())
+        if attrs.get('id'):
+            self.names.add('#' + attrs['id'])
+
+        if tag == 'body':
+            self.in_body = True
+            return
+        if not self.in_body:
+            return
+
+        if self.region_tag is None and attrs.get('id') == self.critical_id:
+            self.region_tag = tag
+        if tag == self.region_tag:
+            self.region_depth += 1
+
+        self.nodes += 1
+        if self.region_tag is None and self.nodes >= self.max_nodes:
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if self.done or tag != self.region_tag:
+            return
+        self.region_depth -= 1
+        if self.region_depth == 0:
+            self.done = True
+
+
+def critical_names(content, critical_id=CRITICAL_ID, max_nodes=CRITICAL_NODES):
+    parser = AboveTheFoldParser(critical_id, max_nodes)
+    parser.feed(content)
+    return parser.names
+
+
+def parse_attrs(tag):
+    """Attributs d'une balise ouvrante ('<link ...>') sous forme de dictionnaire"""
+    attrs = {}
+    inner = TAG_NAME_PATTERN.sub('', tag[:-1].rstrip('/'), count=1)
+    for name, value in ATTR_PATTERN.findall(inner):
+        attrs[name.lower()] = value.strip('"\'')
+    return attrs
+
+
+def rebase_urls(css, css_path, page):
+    """Réécrit les url() relatives à la feuille de style pour la page"""
+    page_dir = posixpath.dirname(page) or '.'
+
+    def rebase(match):
+        target = normalize_reference(css_path, match.group(1))
+        if target is None:
+            return match.group(0)
+        return f'url({posixpath.relpath(target, page_dir)})'
+
+    return CSS_URL_PATTERN.sub(rebase, css)
+
+
+def critical_css_for(root, page, stylesheets, names):
+    """CSS critique d'une page : règles de ses feuilles utiles à la zone critique"""
+    safelist = re.compile('|'.join(SAFELIST))
+    parts = []
+
+    for css_path in stylesheets:
+        file_path = os.path.join(root, css_path)
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            nodes = parse_css(f.read())
+
+        # Les @keyframes et @import ne servent pas au premier rendu
+        nodes = [node for node in nodes
+                 if isinstance(node, Rule) or node.children is not None or node.name == 'font-face']
+        kept, _ = prune_nodes(nodes, names, safelist)
+        if kept:
+            parts.append(rebase_urls(serialize_css(kept), css_path, page))
+
+    return '\n'.join(parts)
+
+
+def async_link(href):
+    """Feuille de style chargée sans bloquer le rendu"""
+    return (f'<link rel="preload" href="{href}" as="style" '
+            f'onload="this.onload=null;this.rel=\'stylesheet\'"/>'
+            f'<noscript><link rel="stylesheet" href="{href}"/></noscript>')
+
+
+def inline_critical_css(root=SITE_ROOT, pages=MAIN_PAGES, in_place=False,
+                        critical_id=CRITICAL_ID, max_nodes=CRITICAL_NODES):
+    """Inline le CSS critique de chaque page et rend les feuilles asynchrones"""
+
+    for page in pages:
+        page_path = os.path.join(root, page)
+        if not os.path.exists(page_path):
+            print(f"⚠️  Fichier non trouvé : {page_path}")
+            continue
+
+        with open(page_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        head_end = HEAD_END_PATTERN.search(content)
+        if not head_end:
+            print(f"⚠️  </head> non trouvé dans {page}")
+            continue
+
+        # Retirer un CSS critique déjà inliné (script idempotent)
+        head = CRITICAL_STYLE_PATTERN.sub('', content[:head_end.start()])
+        body = content[head_end.start():]
+
+        # Feuilles de style locales du <head> (hors <noscript>) : bloquantes,
+        # ou déjà chargées en preload lors d'un passage précédent
+        noscript = [span.span() for span in NOSCRIPT_PATTERN.finditer(head)]
+        stylesheets = []
+        blocking = []
+        for match in LINK_TAG_PATTERN.finditer(head):
+            if any(start <= match.start() < end for start, end in noscript):
+                continue
+            attrs = parse_attrs(match.group(0))
+            rel = attrs.get('rel', '').lower()
+            is_preload = rel == 'preload' and attrs.get('as') == 'style'
+            if (rel != 'stylesheet' and not is_preload) or attrs.get('media') == 'print':
+                continue
+            css_path = normalize_reference(page, attrs.get('href', ''))
+            if css_path:
+                stylesheets.append(css_path)
+                if not is_preload:
+                    blocking.append((match, attrs['href'], css_path))
+
+        if not stylesheets:
+            print(f"ℹ️  {page} : aucune feuille de style locale")
+            continue
+
+        names = critical_names(content, critical_id, max_nodes)
+        critical_css = critical_css_for(root, page, stylesheets, names)
+
+        # Remplacer les <link> bloquants, en partant de la fin pour garder les positions
+        new_head = head
+        for match, href, _ in reversed(blocking):
+            new_head = new_head[:match.start()] + async_link(href) + new_head[match.end():]
+
+        first = min(match.start() for match in LINK_TAG_PATTERN.finditer(new_head))
+        style_tag = f'<style data-critical="">\n{critical_css}\n</style>\n  '
+        new_head = new_head[:first] + style_tag + new_head[first:]
+
+        output_path = page_path if in_place else page_path.replace('.html', '-critical.html')
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(new_head + body)
+
+        blocking_size = sum(os.path.getsize(os.path.join(root, css))
+                            for css in stylesheets if os.path.exists(os.path.join(root, css)))
+        print(f"✅ {page} : {len(stylesheets)} feuilles asynchrones "
+              f"({blocking_size/1024:.1f} KB), CSS critique inliné "
+              f"({len(critical_css.encode('utf-8'))/1024:.1f} KB) -> {os.path.basename(output_path)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inline le CSS critique des pages principales")
+    parser.add_argument('pages', nargs='*', default=MAIN_PAGES)
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--in-place', action='store_true',
+                        help="réécrire les pages au lieu de créer des fichiers *-critical.html")
+    parser.add_argument('--critical-id', default=CRITICAL_ID,
+                        help="id de l'élément qui termine la zone critique")
+    parser.add_argument('--nodes', type=int, default=CRITICAL_NODES,
+                        help="nombre d'éléments critiques si l'id est absent")
+    args = parser.parse_args()
+
+    inline_critical_css(args.root, args.pages, args.in_place, args.critical_id, args.nodes)
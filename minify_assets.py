@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Script pour minifier le CSS et le JS propres au site
+CSS : commentaires et espaces retirés, raccourcis simplifiés, règles dupliquées fusionnées
+JS : commentaires et espaces inutiles retirés, sans renommage ni réécriture du code
+"""
+
+import argparse
+import glob
+import os
+import re
+
+from asset_graph import SITE_ROOT, parallel_map
+from bundle_assets import BUNDLE_CSS, BUNDLE_JS, BUNDLE_PATTERN
+from css_parser import AtRule, Rule, parse_css, split_selectors
+
+# Fichiers minifiés par défaut : ceux que bundle_assets.py regroupe, et les bundles
+DEFAULT_TARGETS = ['css/*.css', 'js/*.js']
+
+# Morceaux de CSS à ne jamais modifier
+PROTECTED_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|\burl\([^)]*\)', re.IGNORECASE)
+SPACE_PATTERN = re.compile(r'\s+')
+COMBINATOR_PATTERN = re.compile(r'\s*([>+~,])\s*')
+PAREN_SPACE_PATTERN = re.compile(r'\(\s+|\s+\)')
+VALUE_SEPARATOR_PATTERN = re.compile(r'\s*([,/])\s*')
+IMPORTANT_PATTERN = re.compile(r'\s*!\s*important', re.IGNORECASE)
+LEADING_ZERO_PATTERN = re.compile(r'(?<![\w.])0+\.(\d)')
+ZERO_UNIT_PATTERN = re.compile(r'(?<![\w.#-])0(?:px|em|rem|ex|ch|vw|vh|vmin|vmax|cm|mm|in|pt|pc)(?![\w%])')
+HEX_COLOR_PATTERN = re.compile(r'#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3(?![0-9a-fA-F])')
+MATH_FUNCTION_PATTERN = re.compile(r'\b(?:calc|min|max|clamp)\(', re.IGNORECASE)
+MEDIA_COLON_PATTERN = re.compile(r'\s*:\s*')
+# Un sélecteur préfixé invalide dans un navigateur invaliderait toute la liste
+VENDOR_SELECTOR_PATTERN = re.compile(r':-[\w-]+')
+
+# Propriétés à 1-4 valeurs (haut, droite, bas, gauche)
+BOX_SHORTHANDS = ('margin', 'padding', 'inset', 'border-width', 'border-style',
+                  'border-color', 'scroll-margin', 'scroll-padding')
+FONT_WEIGHTS = {'normal': '400', 'bold': '700'}
+# 0px n'y équivaut pas à 0 : dans flex, un 0 sans unité est lu comme flex-grow / flex-shrink
+ZERO_UNIT_KEPT = {'flex', 'flex-basis', '-webkit-flex', '-webkit-flex-basis', '-ms-flex',
+                  '-ms-flex-preferred-size'}
+
+JS_WHITESPACE = ' \t\n\r\f\v\u00a0\ufeff\u2028\u2029'
+JS_NEWLINES = '\n\r\u2028\u2029'
+# Après ces mots-clés, un '/' commence une regex et non une division
+JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new',
+                     'void', 'delete', 'throw', 'yield', 'await', 'of'}
+
+
+def outside_protected(text, func):
+    """Applique func au texte hors chaînes et url()"""
+    parts = []
+    pos = 0
+    for match in PROTECTED_PATTERN.finditer(text):
+        parts.append(func(text[pos:match.start()]))
+        parts.append(match.group())
+        pos = match.end()
+    parts.append(func(text[pos:]))
+    return ''.join(parts)
+
+
+def minify_selector(selector):
+    def compact(text):
+        text = SPACE_PATTERN.sub(' ', text)
+        text = COMBINATOR_PATTERN.sub(r'\1', text)
+        return PAREN_SPACE_PATTERN.sub(lambda m: m.group().strip(), text)
+
+    selectors = []
+    for part in split_selectors(selector):
+        part = outside_protected(part, compact).strip()
+        if part not in selectors:
+            selectors.append(part)
+    return ','.join(selectors)
+
+
+def minify_prelude(prelude):
+    """'@media screen and (max-width: 767px)' -> '@media screen and (max-width:767px)'"""
+    def compact(text):
+        text = SPACE_PATTERN.sub(' ', text)
+        text = MEDIA_COLON_PATTERN.sub(':', text)
+        text = re.sub(r'\s*,\s*', ',', text)
+        # L'espace avant '(' est significatif ('and (' != 'and(')
+        return PAREN_SPACE_PATTERN.sub(lambda m: m.group().strip(), text)
+
+    return outside_protected(prelude, compact).strip()
+
+
+def collapse_box(values):
+    """['0', '1px', '0', '1px'] -> ['0', '1px']"""
+    values = list(values)
+    if len(values) == 4 and values[3] == values[1]:
+        values.pop()
+    if len(values) == 3 and values[2] == values[0]:
+        values.pop()
+    if len(values) == 2 and values[1] == values[0]:
+        values.pop()
+    return values
+
+
+def minify_value(prop, value):
+    def compact(text):
+        text = SPACE_PATTERN.sub(' ', text)
+        text = VALUE_SEPARATOR_PATTERN.sub(r'\1', text)
+        text = PAREN_SPACE_PATTERN.sub(lambda m: m.group().strip(), text)
+        text = IMPORTANT_PATTERN.sub('!important', text)
+        text = LEADING_ZERO_PATTERN.sub(r'.\1', text)
+        text = HEX_COLOR_PATTERN.sub(lambda m: '#' + ''.join(m.groups()).lower(), text)
+        # Dans calc()/min()/max(), un 0 sans unité n'est pas une longueur
+        if prop not in ZERO_UNIT_KEPT and not MATH_FUNCTION_PATTERN.search(value):
+            text = ZERO_UNIT_PATTERN.sub('0', text)
+        return text
+
+    value = outside_protected(value, compact).strip()
+
+    important = value.endswith('!important')
+    core = value[:-len('!important')] if important else value
+    if prop in BOX_SHORTHANDS and not any(char in core for char in '(,"\''):
+        core = ' '.join(collapse_box(core.split()))
+    elif prop == 'font-weight':
+        core = FONT_WEIGHTS.get(core.lower(), core)
+    return core + ('!important' if important else '')
+
+
+def split_declarations(body):
+    """Sépare un bloc de déclarations sur les ';' hors chaînes et parenthèses"""
+    declarations = []
+    depth = 0
+    start = 0
+    quote = None
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth = max(0, depth - 1)
+        elif char == ';' and depth == 0:
+            declarations.append(body[start:i])
+            start = i + 1
+        i += 1
+    declarations.append(body[start:])
+    return [declaration.strip() for declaration in declarations if declaration.strip()]
+
+
+def minify_declarations(body):
+    """Déclarations minifiées ; les doublons exacts ne gardent que le dernier"""
+    declarations = []
+    for declaration in split_declarations(body):
+        prop, colon, value = declaration.partition(':')
+        if not colon:
+            continue
+        prop = prop.strip()
+        if prop.startswith('--'):
+            # Variable CSS : la valeur est conservée telle quelle
+            declarations.append(f'{prop}:{value.strip()}')
+        else:
+            prop = prop.lower()
+            declarations.append(f'{prop}:{minify_value(prop, value)}')
+
+    # Les doublons différents (display:-webkit-box;display:flex) sont des replis voulus
+    unique = []
+    for declaration in reversed(declarations):
+        if declaration not in unique:
+            unique.append(declaration)
+    return ';'.join(reversed(unique))
+
+
+def merge_rules(nodes):
+    """Fusionne les règles dupliquées d'une même liste
+
+    - une règle identique plus loin dans la liste rend la première inutile
+    - deux règles consécutives au même sélecteur ne font plus qu'une
+    - deux règles consécutives au même contenu partagent leurs sélecteurs
+    - deux @media consécutifs identiques sont regroupés
+    """
+    last_index = {}
+    for index, node in enumerate(nodes):
+        if isinstance(node, Rule):
+            last_index[(node.selector, node.body)] = index
+    nodes = [node for index, node in enumerate(nodes)
+             if not isinstance(node, Rule) or last_index[(node.selector, node.body)] == index]
+
+    merged = []
+    for node in nodes:
+        previous = merged[-1] if merged else None
+        if isinstance(node, Rule) and isinstance(previous, Rule):
+            if node.selector == previous.selector:
+                merged[-1] = Rule(node.selector, minify_declarations(f'{previous.body};{node.body}'))
+                continue
+            if (node.body == previous.body
+                    and not VENDOR_SELECTOR_PATTERN.search(node.selector + previous.selector)):
+                merged[-1] = Rule(minify_selector(f'{previous.selector},{node.selector}'), node.body)
+                continue
+        elif (isinstance(node, AtRule) and isinstance(previous, AtRule)
+              and node.children is not None and previous.children is not None
+              and node.prelude == previous.prelude):
+            merged[-1] = AtRule(node.name, node.prelude,
+                                children=merge_rules(previous.children + node.children))
+            continue
+        merged.append(node)
+    return merged
+
+
+def minify_nodes(nodes):
+    minified = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            body = minify_declarations(node.body)
+            if body:
+                minified.append(Rule(minify_selector(node.selector), body))
+        elif node.children is not None:
+            children = minify_nodes(node.children)
+            if children:
+                minified.append(AtRule(node.name, minify_prelude(node.prelude), children=children))
+        elif node.body is not None:
+            if '{' in node.body:
+                # @keyframes : étapes 'from', '50%'... traitées comme des règles
+                body = serialize_minified(minify_nodes(parse_css(node.body)))
+            else:
+                body = minify_declarations(node.body)
+            minified.append(AtRule(node.name, minify_prelude(node.prelude), body=body))
+        else:
+            minified.append(AtRule(node.name, minify_prelude(node.prelude)))
+    return merge_rules(minified)
+
+
+def serialize_minified(nodes):
+    parts = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            parts.append(f'{node.selector}{{{node.body}}}')
+        elif node.children is not None:
+            parts.append(f'{node.prelude}{{{serialize_minified(node.children)}}}')
+        elif node.body is not None:
+            parts.append(f'{node.prelude}{{{node.body}}}')
+        else:
+            parts.append(f'{node.prelude};')
+    return ''.join(parts)
+
+
+def minify_css(text):
+    return serialize_minified(minify_nodes(parse_css(text)))
+
+
+def is_word_char(char):
+    return char.isalnum() or char in '_$\\' or ord(char) > 127
+
+
+def _skip_string(source, i):
+    quote = source[i]
+    j = i + 1
+    while j < len(source):
+        if source[j] == '\\':
+            j += 2
+            continue
+        if source[j] == quote:
+            return j + 1
+        j += 1
+    return len(source)
+
+
+def _skip_template(source, i):
+    """Fin d'un template literal, ${...} imbriqués compris"""
+    j = i + 1
+    while j < len(source):
+        char = source[j]
+        if char == '\\':
+            j += 2
+            continue
+        if char == '`':
+            return j + 1
+        if source.startswith('${', j):
+            depth = 1
+            j += 2
+            while j < len(source) and depth:
+                char = source[j]
+                if char in '"\'':
+                    j = _skip_string(source, j)
+                    continue
+                if char == '`':
+                    j = _skip_template(source, j)
+                    continue
+                if char == '{':
+                    depth += 1
+                elif char == '}':
+                    depth -= 1
+                j += 1
+            continue
+        j += 1
+    return len(source)
+
+
+def _skip_regex(source, i):
+    """Fin d'une regex littérale, ou None si ce n'en est pas une"""
+    j = i + 1
+    in_class = False
+    while j < len(source):
+        char = source[j]
+        if char == '\\':
+            j += 2
+            continue
+        if char in JS_NEWLINES:
+            return None
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            j += 1
+            while j < len(source) and is_word_char(source[j]):
+                j += 1
+            return j
+        j += 1
+    return None
+
+
+def _regex_allowed(last):
+    if not last:
+        return True
+    if is_word_char(last[-1]):
+        return last in JS_REGEX_KEYWORDS
+    return last[-1] in '(,=:[!&|?{};+-*%<>~^}'
+
+
+def _separator(last, token, newline):
+    """Espace à garder entre deux tokens séparés par des blancs"""
+    prev, nxt = last[-1], token[0]
+    # Le retour à la ligne est gardé pour l'insertion automatique de ';'
+    if newline and prev not in '{;,(' and nxt not in ')]};,':
+        return '\n'
+    if is_word_char(prev) and (is_word_char(nxt) or (nxt == '.' and last.isdigit())):
+        return ' '
+    if prev in '+-' and nxt in '+-':
+        return ' '
+    if prev == '/' and nxt in '/*':
+        return ' '
+    return ''
+
+
+def minify_js(source):
+    """Retire commentaires et blancs inutiles ; chaînes, templates et regex sont intacts"""
+    out = []
+    last = ''
+    space = newline = False
+    i = 0
+    n = len(source)
+
+    while i < n:
+        char = source[i]
+        if char in JS_WHITESPACE:
+            space = True
+            newline = newline or char in JS_NEWLINES
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = i + 2
+            while end < n and source[end] not in JS_NEWLINES:
+                end += 1
+            space = True
+            i = end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            space = True
+            newline = newline or any(c in JS_NEWLINES for c in source[i:end])
+            i = end
+            continue
+
+        end = None
+        if char in '"\'':
+            end = _skip_string(source, i)
+        elif char == '`':
+            end = _skip_template(source, i)
+        elif char == '/' and _regex_allowed(last):
+            end = _skip_regex(source, i)
+        elif is_word_char(char):
+            end = i + 1
+            while end < n and (is_word_char(source[end]) or (source[end] == '.' and source[i].isdigit())):
+                end += 1
+        if end is None:
+            end = i + 1
+
+        token = source[i:end]
+        if last and space:
+            out.append(_separator(last, token, newline))
+        out.append(token)
+        last = token
+        space = newline = False
+        i = end
+
+    return ''.join(out)
+
+
+def output_path_for(path, in_place):
+    if in_place:
+        return path
+    base, extension = os.path.splitext(path)
+    return f'{base}.min{extension}'
+
+
+def minify_file(job):
+    """Minifie un fichier ; renvoie (chemin de sortie, octets avant, octets après, erreur)"""
+    root, path, in_place = job
+    with open(os.path.join(root, path), 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    before = len(content.encode('utf-8'))
+
+    if content.lstrip().startswith('<'):
+        return None, before, before, "contenu HTML, ignoré"
+
+    minified = minify_css(content) if path.endswith('.css') else minify_js(content)
+    output_path = output_path_for(path, in_place)
+    tmp_path = os.path.join(root, output_path) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(minified + '\n')
+    os.replace(tmp_path, os.path.join(root, output_path))
+    return output_path, before, len(minified.encode('utf-8')) + 1, None
+
+
+def find_targets(root, patterns=None):
+    """Fichiers à minifier ; sans motif, le CSS/JS propre au site et les bundles"""
+    targets = []
+    for pattern in patterns or DEFAULT_TARGETS:
+        for file_path in sorted(glob.glob(os.path.join(root, pattern))):
+            path = os.path.relpath(file_path, root).replace(os.sep, '/')
+            name = os.path.basename(path)
+            if '.min.' in name or not name.endswith(('.css', '.js')) or path in targets:
+                continue
+            if not patterns:
+                own = BUNDLE_CSS if name.endswith('.css') else BUNDLE_JS
+                if not BUNDLE_PATTERN.match(name) and not any(re.search(p, name) for p in own):
+                    continue
+            targets.append(path)
+    return targets
+
+
+def minify_assets(root=SITE_ROOT, patterns=None, in_place=False, workers=None):
+    """Minifie les fichiers en parallèle et affiche le gain de chacun"""
+
+    targets = find_targets(root, patterns)
+    if not targets:
+        print("⚠️  Aucun fichier à minifier")
+        return
+
+    # Peu de fichiers mais coûteux : un pool dès deux fichiers
+    workers = workers or os.cpu_count() or 1
+    results = parallel_map(minify_file, [(root, path, in_place) for path in targets],
+                           workers=workers, chunksize=1)
+
+    print("🗜️  Minification CSS/JS :")
+    total_before = 0
+    total_after = 0
+    for path, (output_path, before, after, error) in zip(targets, results):
+        if error:
+            print(f"   ⚠️  {path} : {error}")
+            continue
+        total_before += before
+        total_after += after
+        ratio = (1 - after / before) * 100 if before else 0
+        print(f"   📄 {path} : {before/1024:.1f} KB -> {after/1024:.1f} KB (-{ratio:.0f}%)"
+              + ('' if in_place else f" -> {os.path.basename(output_path)}"))
+
+    print(f"\n📊 Résumé :")
+    print(f"   Fichiers minifiés : {sum(1 for result in results if not result[3])}")
+    print(f"   Taille avant : {total_before/1024:.1f} KB")
+    print(f"   Taille après : {total_after/1024:.1f} KB")
+    print(f"\n💾 Économie : {(total_before - total_after)/1024:.1f} KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Minifie le CSS et le JS propres au site")
+    parser.add_argument('files', nargs='*',
+                        help="fichiers ou globs relatifs au site (défaut : CSS/JS du site et bundles)")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--in-place', action='store_true',
+                        help="remplacer les fichiers au lieu de créer des fichiers *.min.css / *.min.js")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : tous les cœurs)")
+    args = parser.parse_args()
+
+    minify_assets(args.root, args.files, args.in_place, args.workers)
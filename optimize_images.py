@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Script pour générer les variantes responsives des images et réécrire srcset/sizes
+Les images traitées sont celles des balises <img> trouvées par le graphe des assets ;
+les GIF animés sont convertis en WebP animé
+"""
+
+import argparse
+import os
+import posixpath
+import re
+import shutil
+import subprocess
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+from asset_graph import (ASSET, SITE_ROOT, cache_path_for, get_asset_graph, hash_file,
+                         load_cache, normalize_reference, parallel_map, save_cache)
+from bundle_assets import write_atomically
+from inline_critical_css import parse_attrs
+
+# Largeurs générées, comme les variantes -p-500 / -p-800 de Webflow
+VARIANT_WIDTHS = (500, 800, 1080, 1600, 2000)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif')
+# PNG et JPEG sont déclinés en WebP, AVIF et WebP restent dans leur format
+OUTPUT_FORMATS = {'.png': '.webp', '.jpg': '.webp', '.jpeg': '.webp', '.gif': '.webp',
+                  '.webp': '.webp', '.avif': '.avif'}
+QUALITY = {'.webp': 80, '.avif': 60}
+
+# Erreurs d'un encodeur : fichier illisible, format non supporté, ffmpeg en échec
+ENCODE_ERRORS = (OSError, KeyError, ValueError, subprocess.CalledProcessError)
+
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+VARIANT_PATTERN = re.compile(r'-p-\d+$')
+
+
+def find_backend():
+    """Encodeur disponible : Pillow, sinon ffmpeg, sinon None (rapport seul)"""
+    if Image is not None:
+        return 'pillow'
+    if shutil.which('ffmpeg') and shutil.which('ffprobe'):
+        return 'ffmpeg'
+    return None
+
+
+def parse_srcset(value):
+    """'a.avif 500w, b.avif 880w' -> [('a.avif', '500w'), ('b.avif', '880w')]"""
+    candidates = []
+    for candidate in value.split(','):
+        parts = candidate.split()
+        if parts:
+            candidates.append((parts[0], parts[1] if len(parts) > 1 else ''))
+    return candidates
+
+
+def set_attribute(tag, name, value):
+    """Remplace (ou ajoute) un attribut dans une balise ouvrante"""
+    pattern = re.compile(rf'\s{name}\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)', re.IGNORECASE)
+    if pattern.search(tag):
+        return pattern.sub(lambda m: f' {name}="{value}"', tag, count=1)
+    end = len(tag) - 2 if tag.endswith('/>') else len(tag) - 1
+    return f'{tag[:end]} {name}="{value}"{tag[end:]}'
+
+
+def variant_path(path, width, extension):
+    base = posixpath.splitext(path)[0]
+    return f'{base}-p-{width}{extension}'
+
+
+def image_width(file_path, backend):
+    if backend == 'pillow':
+        with Image.open(file_path) as image:
+            return image.size[0]
+    output = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                             '-show_entries', 'stream=width', '-of', 'csv=p=0', file_path],
+                            capture_output=True, text=True, check=True).stdout
+    return int(output.split()[0])
+
+
+def is_animated(file_path, backend):
+    if backend == 'pillow':
+        with Image.open(file_path) as image:
+            return getattr(image, 'is_animated', False)
+    return file_path.lower().endswith('.gif')
+
+
+def encode(source, target, width, backend, animated=False):
+    """Écrit target à la largeur donnée (None : taille d'origine)"""
+    extension = posixpath.splitext(target)[1]
+    tmp_path = target + '.tmp' + extension
+    if backend == 'pillow':
+        with Image.open(source) as image:
+            if animated:
+                image.save(tmp_path, save_all=True, loop=0, quality=QUALITY[extension], method=6)
+            else:
+                if width:
+                    height = round(image.size[1] * width / image.size[0])
+                    image = image.resize((width, height), Image.LANCZOS)
+                options = {'method': 6} if extension == '.webp' else {}
+                image.save(tmp_path, quality=QUALITY[extension], **options)
+    else:
+        command = ['ffmpeg', '-y', '-loglevel', 'error', '-i', source]
+        if width:
+            command += ['-vf', f'scale={width}:-2']
+        if animated:
+            command += ['-c:v', 'libwebp', '-loop', '0', '-an']
+        command += ['-q:v', str(QUALITY[extension]), tmp_path]
+        subprocess.run(command, check=True)
+    os.replace(tmp_path, target)
+
+
+def process_image(job):
+    """Génère les variantes manquantes d'une image
+
+    Renvoie (empreinte, largeur, {largeur: variante}, version convertie,
+    largeurs prévues mais non générées, erreur).
+    """
+    root, path, declared_width, previous, backend, dry_run = job
+    file_path = os.path.join(root, path)
+    digest = hash_file(file_path)
+    extension = OUTPUT_FORMATS[posixpath.splitext(path)[1].lower()]
+
+    if previous and previous[0] == digest and all(
+            os.path.exists(os.path.join(root, variant)) for variant in previous[2].values()):
+        if previous[3] is None or os.path.exists(os.path.join(root, previous[3])):
+            return digest, previous[1], previous[2], previous[3], [], None
+
+    try:
+        width = image_width(file_path, backend) if backend else declared_width
+        if backend is not None and is_animated(file_path, backend):
+            # Un GIF animé n'est pas décliné en largeurs, seulement converti
+            if backend == 'pillow' and not features.check('webp'):
+                return digest, width, {}, None, [], "WebP non supporté par Pillow"
+            converted = posixpath.splitext(path)[0] + '.webp'
+            if not dry_run:
+                encode(file_path, os.path.join(root, converted), None, backend, animated=True)
+            return digest, width, {}, converted, [], None
+    except ENCODE_ERRORS as error:
+        return digest, declared_width, {}, None, [], str(error)
+
+    variants = {}
+    planned = []
+    converted = None
+    for target_width in VARIANT_WIDTHS:
+        if not width or target_width >= width:
+            continue
+        target = variant_path(path, target_width, extension)
+        if os.path.exists(os.path.join(root, target)):
+            # Variante déjà présente (faite à la main ou lors d'un passage précédent)
+            variants[target_width] = target
+            continue
+        if backend is None or dry_run:
+            planned.append(target_width)
+            continue
+        try:
+            encode(file_path, os.path.join(root, target), target_width, backend)
+            variants[target_width] = target
+        except ENCODE_ERRORS as error:
+            return digest, width, variants, None, planned, str(error)
+
+    if extension != posixpath.splitext(path)[1].lower() and width:
+        # PNG/JPEG : la version pleine taille existe aussi en WebP
+        converted = posixpath.splitext(path)[0] + extension
+        if backend is None or dry_run:
+            planned.append(width)
+            converted = None
+        elif not os.path.exists(os.path.join(root, converted)):
+            try:
+                encode(file_path, os.path.join(root, converted), None, backend)
+            except ENCODE_ERRORS as error:
+                return digest, width, variants, None, planned, str(error)
+
+    return digest, width, variants, converted, planned, None
+
+
+def find_images(root, graph):
+    """Balises <img> locales par page, et largeur déclarée de chaque image"""
+    tags = {}
+    declared = {}
+    for page in graph.pages():
+        images = [target for target in graph.references(page, ASSET)
+                  if target.lower().endswith(IMAGE_EXTENSIONS) and graph.exists(target)]
+        if not images:
+            continue
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+        for match in IMG_TAG_PATTERN.finditer(content):
+            attrs = parse_attrs(match.group(0))
+            src = normalize_reference(page, attrs.get('src', ''))
+            if src not in images or VARIANT_PATTERN.search(posixpath.splitext(src)[0]):
+                continue
+            tags.setdefault(page, []).append((match, src, attrs))
+            for url, descriptor in parse_srcset(attrs.get('srcset', '')):
+                if normalize_reference(page, url) == src and descriptor.endswith('w'):
+                    declared[src] = int(descriptor[:-1])
+            declared.setdefault(src, None)
+    return tags, declared
+
+
+def rewrite_tag(page, tag, src, attrs, result):
+    """Balise <img> avec le srcset complet de ses variantes"""
+    _, width, variants, converted, _, _ = result
+    page_dir = posixpath.dirname(page) or '.'
+    if converted and src.lower().endswith('.gif'):
+        # WebP animé : une seule version, src suffit
+        return set_attribute(tag, 'src', posixpath.relpath(converted, page_dir))
+
+    full = converted or src
+    candidates = [(variant, f'{w}w') for w, variant in sorted(variants.items())]
+    if width:
+        candidates.append((full, f'{width}w'))
+    if len(candidates) < 2 and not converted:
+        return tag
+
+    srcset = ', '.join(f'{posixpath.relpath(path, page_dir)} {descriptor}'
+                       for path, descriptor in candidates)
+    tag = set_attribute(tag, 'srcset', srcset)
+    if not attrs.get('sizes'):
+        tag = set_attribute(tag, 'sizes', f'(max-width: {width}px) 100vw, {width}px')
+    return tag
+
+
+def optimize_images(root=SITE_ROOT, workers=None, use_cache=True, dry_run=False):
+    """Génère les variantes des images utilisées et met à jour les pages"""
+
+    backend = find_backend()
+    if backend is None:
+        print("ℹ️  Ni Pillow ni ffmpeg : rapport seul, aucune image encodée")
+        dry_run = True
+    else:
+        print(f"🖼️  Encodeur : {backend}")
+
+    graph = get_asset_graph(root)
+    tags, declared = find_images(root, graph)
+    if not declared:
+        print("✅ Aucune image locale dans des balises <img>")
+        return
+
+    cache_path = cache_path_for(root, 'images')
+    cached = load_cache(cache_path) if use_cache else {}
+    sources = sorted(declared)
+    jobs = [(root, path, declared[path], cached.get(path), backend, dry_run) for path in sources]
+    results = dict(zip(sources, parallel_map(process_image, jobs,
+                                             workers=workers or os.cpu_count() or 1, chunksize=1)))
+
+    print(f"\n🔍 Images utilisées dans des <img> : {len(sources)}")
+    entries = {}
+    for path in sources:
+        digest, width, variants, converted, planned, error = results[path]
+        size = graph.size(path)
+        if error:
+            print(f"   ⚠️  {path} : {error}")
+            continue
+        if not dry_run:
+            entries[path] = (digest, width, variants, converted)
+        line = f"   📄 {path} ({size/1024:.1f} KB, {width or '?'}px) : {len(variants)} variantes"
+        if converted:
+            line += f", -> {posixpath.basename(converted)}"
+        if planned:
+            line += f", à générer : {', '.join(f'{w}px' for w in planned)}"
+        print(line)
+
+    # Images lourdes jamais affichées dans une <img> (ex : GIF animés)
+    unused = [path for path in graph.files('images') if path.lower().endswith(IMAGE_EXTENSIONS)
+              and path not in declared and not graph.referrers(path)
+              and not VARIANT_PATTERN.search(posixpath.splitext(path)[0])]
+    for path in unused:
+        print(f"   ℹ️  {path} ({graph.size(path)/1024:.1f} KB) : non référencée, ignorée")
+
+    if dry_run:
+        print("\nℹ️  Mode simulation : aucune page réécrite")
+        return
+
+    rewritten = 0
+    for page, page_tags in sorted(tags.items()):
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+        new_content = content
+        for match, src, attrs in reversed(page_tags):
+            if src not in entries:
+                continue
+            tag = rewrite_tag(page, match.group(0), src, attrs, results[src])
+            new_content = new_content[:match.start()] + tag + new_content[match.end():]
+        if new_content != content:
+            os.replace(write_atomically(os.path.join(root, page), new_content),
+                       os.path.join(root, page))
+            rewritten += 1
+            print(f"   ✏️  {page} : srcset mis à jour")
+
+    if use_cache and entries:
+        save_cache(cache_path, {**cached, **entries})
+
+    print(f"\n📊 Résumé :")
+    print(f"   Images traitées : {len(entries)}")
+    print(f"   Pages réécrites : {rewritten}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère les variantes responsives des images")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="réencoder même les images inchangées")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="afficher les variantes à générer sans rien écrire")
+    args = parser.parse_args()
+
+    optimize_images(args.root, args.workers, not args.no_cache, args.dry_run)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Script pour optimiser le chargement des scripts des pages
+Déduit l'ordre de dépendance entre les scripts (globales définies / utilisées), passe en
+`defer` ceux dont aucun code synchrone n'a besoin pendant l'analyse de la page, ajoute les
+<link rel=preload> des polices critiques et les modulepreload, et estime les octets bloquants
+"""
+
+import argparse
+import os
+import posixpath
+import re
+
+from analyze_unused_fonts import collect_css, find_font_faces, find_font_usage, match_weight
+from analyze_unused_selectors import SAFELIST
+from asset_graph import ASSET, MAIN_PAGES, SITE_ROOT, get_asset_graph, normalize_reference
+from clean_pages import JS_TYPES, expand_pages
+from inline_critical_css import parse_attrs
+from rewrite_pages import TOKEN_PATTERN, rewrite_pages
+
+# Bibliothèques connues : globales fournies et requises (leur code minifié n'est pas analysé)
+KNOWN_LIBRARIES = [
+    (re.compile(r'(?:^|/)jquery[-.]'), {'jQuery', '$'}, set()),
+    (re.compile(r'(?:^|/)webflow\.schunk\.'), {'webpackChunk'}, set()),
+    (re.compile(r'(?:^|/)webflow\.'), {'Webflow'}, {'jQuery', 'webpackChunk'}),
+    (re.compile(r'(?:^|/)gsap(?:\.min)?\.js'), {'gsap'}, set()),
+    (re.compile(r'(?:^|/)ScrollTrigger(?:\.min)?\.js'), {'ScrollTrigger'}, {'gsap'}),
+    (re.compile(r'(?:^|/)SplitText(?:\.min)?\.js'), {'SplitText'}, {'gsap'}),
+    (re.compile(r'(?:^|/)swiper(?:-bundle)?(?:\.min)?\.js'), {'Swiper'}, set()),
+    (re.compile(r'recaptcha/api\.js'), {'grecaptcha'}, set()),
+    (re.compile(r'googletagmanager\.com/gtag/js'), {'google_tag_manager'}, set()),
+]
+
+# Au plus deux polices préchargées par page : au-delà, elles concurrencent le CSS
+MAX_FONT_PRELOADS = 2
+FONT_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff', '.otf': 'font/otf', '.ttf': 'font/ttf'}
+FONT_PREFERENCE = ('.woff2', '.woff', '.otf', '.ttf')
+
+# Commentaires et chaînes : retirés avant de chercher les identifiants
+JS_NOISE_PATTERN = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'', re.DOTALL)
+IDENTIFIER_PATTERN = re.compile(r'(?<![\w$.])([A-Za-z_$][\w$]*)(?![\w$])(?!\{)')
+DECLARATION_PATTERN = re.compile(
+    r'^(?:var|let|const)\s+([A-Za-z_$][\w$]*)'
+    r'|^(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)'
+    r'|^class\s+([A-Za-z_$][\w$]*)'
+    r'|\bwindow\.([A-Za-z_$][\w$]*)\s*=(?!=)',
+    re.MULTILINE
+)
+# Code exécuté seulement après l'analyse du document : les scripts différés ont déjà tourné
+LISTENER_PATTERN = re.compile(r'\s*(?:document|window)\.addEventListener\(\s*(?=[\'"`](?:DOMContentLoaded|load)[\'"`])')
+IMPORT_PATTERN = re.compile(r'\b(?:import|export)\s+(?:[\w$*{},\s]+\s+from\s+)?[\'"]([^\'"]+)[\'"]')
+DOCUMENT_WRITE_PATTERN = re.compile(r'\bdocument\.write(?:ln)?\s*\(')
+
+
+class ScriptTag:
+    """Script d'une page, dans l'ordre du document"""
+
+    __slots__ = ('src', 'path', 'mode', 'provides', 'requires', 'top_level')
+
+    def __init__(self, src, path, mode, provides, requires, top_level=True):
+        self.src = src              # URL d'origine (None pour un script inline)
+        self.path = path            # chemin local relatif au site (None si externe ou inline)
+        self.mode = mode            # 'blocking', 'defer', 'async' ou 'module'
+        self.provides = provides    # globales définies
+        self.requires = requires    # globales utilisées (None : inconnues, tout ce qui précède)
+        self.top_level = top_level  # le code s'exécute dès son chargement
+
+    def label(self):
+        return self.path or self.src or 'script inline'
+
+
+def strip_noise(code):
+    return JS_NOISE_PATTERN.sub(' ', code)
+
+
+def strip_comments(code):
+    """Retire les commentaires en gardant les chaînes (noms d'événements)"""
+    return JS_NOISE_PATTERN.sub(lambda m: m.group() if m.group()[0] in '"\'' else ' ', code)
+
+
+def blank_strings(code):
+    """Vide l'intérieur des chaînes sans changer les positions"""
+    return JS_NOISE_PATTERN.sub(lambda m: m.group()[0] + ' ' * (len(m.group()) - 2) + m.group()[-1], code)
+
+
+def matching_paren(code, start):
+    depth = 0
+    for index in range(start, len(code)):
+        if code[index] == '(':
+            depth += 1
+        elif code[index] == ')':
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(code)
+
+
+def runs_after_parsing(code):
+    """Le script ne fait qu'enregistrer des écouteurs DOMContentLoaded / load"""
+    code = strip_comments(code)
+    # Parenthèses comptées hors chaînes : mêmes positions que code
+    masked = blank_strings(code)
+    position = 0
+    found = False
+    while True:
+        match = LISTENER_PATTERN.match(code, position)
+        if not match:
+            break
+        position = matching_paren(masked, match.end() - 1) + 1
+        while position < len(code) and code[position] in ' \t\r\n;':
+            position += 1
+        found = True
+    return found and not code[position:].strip()
+
+
+def analyze_code(code):
+    """Globales définies et utilisées par un script lisible"""
+    stripped = strip_noise(code)
+    provides = {next(group for group in match.groups() if group)
+                for match in DECLARATION_PATTERN.finditer(stripped)}
+    requires = set(IDENTIFIER_PATTERN.findall(stripped)) - provides
+    return provides, requires
+
+
+def library_globals(src):
+    for pattern, provides, requires in KNOWN_LIBRARIES:
+        if pattern.search(src):
+            return set(provides), set(requires)
+    return None
+
+
+def script_info(root, path, cache):
+    """(globales fournies, requises, document.write ?, exécuté au chargement ?) d'un fichier local"""
+    if path not in cache:
+        known = library_globals(path)
+        file_path = os.path.join(root, path)
+        if known is not None or not os.path.exists(file_path):
+            provides, requires = known or (set(), set())
+            cache[path] = (provides, requires, False, True)
+        else:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                code = f.read()
+            provides, requires = analyze_code(code)
+            cache[path] = (provides, requires, bool(DOCUMENT_WRITE_PATTERN.search(code)),
+                           not runs_after_parsing(code))
+    return cache[path]
+
+
+def script_mode(attrs):
+    if attrs.get('type', '').lower() == 'module':
+        return 'module'
+    if 'async' in attrs:
+        return 'async'
+    if 'defer' in attrs and 'src' in attrs:
+        return 'defer'
+    return 'blocking'
+
+
+def page_scripts(root, page, content, cache):
+    """Scripts JavaScript de la page et liste des scripts qui doivent rester synchrones"""
+    scripts = []
+    pinned = set()
+    for match in TOKEN_PATTERN.finditer(content):
+        if (match.group('tag') or '').lower() != 'script':
+            continue
+        attrs = parse_attrs(f'<script{match.group("attrs")}>')
+        content_type = attrs.get('type', '').lower()
+        if content_type not in JS_TYPES and content_type != 'module':
+            continue  # JSON-LD, templates...
+        mode = script_mode(attrs)
+
+        src = attrs.get('src')
+        if src is None:
+            code = match.group('content')
+            provides, requires = analyze_code(code)
+            script = ScriptTag(None, None, mode, provides, requires, not runs_after_parsing(code))
+            if mode == 'blocking' and script.top_level:
+                pinned.add(len(scripts))
+        else:
+            path = normalize_reference(page, src)
+            if path is not None:
+                provides, requires, writes, top_level = script_info(root, path, cache)
+                script = ScriptTag(src, path, mode, provides, requires, top_level)
+                if writes:
+                    pinned.add(len(scripts))
+            else:
+                # Script tiers : contenu inconnu, il reste tel quel
+                provides, requires = library_globals(src) or (set(), None)
+                script = ScriptTag(src, None, mode, provides, requires)
+                if mode == 'blocking':
+                    pinned.add(len(scripts))
+        scripts.append(script)
+    return scripts, pinned
+
+
+def dependencies(scripts, index):
+    """Scripts de la page dont dépend le script d'indice index"""
+    script = scripts[index]
+    if script.requires is None:
+        return [i for i in range(index) if scripts[i].mode == 'blocking']
+    return [i for i, other in enumerate(scripts)
+            if i != index and other.provides & script.requires and other.path != script.path]
+
+
+def plan_scripts(scripts, pinned):
+    """Scripts à passer en defer, et violations d'ordre (script utilisé avant d'être chargé)
+
+    Un script qui reste synchrone (inline exécuté tout de suite, tiers,
+    document.write) a besoin que ses dépendances aient déjà tourné : elles
+    restent synchrones aussi, de proche en proche.
+    """
+    blocking = set(pinned)
+    stack = list(pinned)
+    while stack:
+        for dependency in dependencies(scripts, stack.pop()):
+            if dependency not in blocking and scripts[dependency].mode == 'blocking':
+                blocking.add(dependency)
+                stack.append(dependency)
+
+    deferred = [i for i, script in enumerate(scripts)
+                if script.mode == 'blocking' and script.path and i not in blocking]
+
+    violations = []
+    for index, script in enumerate(scripts):
+        # Un script qui attend DOMContentLoaded voit tous les scripts synchrones et différés
+        if script.path is None or script.requires is None or not script.top_level:
+            continue
+        # Globale fournie uniquement par des scripts chargés après celui-ci
+        later = []
+        for name in script.requires:
+            providers = [i for i, other in enumerate(scripts) if name in other.provides and i != index]
+            if providers and min(providers) > index and scripts[min(providers)].path:
+                later.append(min(providers))
+        # Dépendance mutuelle : l'ordre ne peut pas être corrigé automatiquement
+        if later and not any(index in dependencies(scripts, i) for i in later):
+            violations.append((index, max(later)))
+    return deferred, violations
+
+
+def module_preloads(root, scripts):
+    """Scripts modules locaux et leurs imports statiques, récursivement"""
+    found = []
+    stack = [script.path for script in scripts if script.mode == 'module' and script.path]
+    while stack:
+        path = stack.pop()
+        if path in found or not os.path.exists(os.path.join(root, path)):
+            continue
+        found.append(path)
+        with open(os.path.join(root, path), 'r', encoding='utf-8', errors='replace') as f:
+            for spec in IMPORT_PATTERN.findall(f.read()):
+                if spec.startswith(('./', '../', '/')):
+                    target = normalize_reference(path, spec)
+                    if target:
+                        stack.append(target)
+    return found
+
+
+def critical_fonts(graph, page, safelist):
+    """Fichiers des polices utilisées en graisse normale par la page (texte courant)"""
+    sources = collect_css(graph, [page])
+    faces = find_font_faces(sources)
+    families, weights, styles = find_font_usage(sources, graph.page_names(page), safelist)
+
+    fonts = []
+    for family in sorted(families & {face.family for face in faces}):
+        candidates = [face for face in faces if face.family == family]
+        face = match_weight(400, [f for f in candidates if f.style == 'normal'] or candidates)
+        files = sorted(face.sources, key=lambda path: FONT_PREFERENCE.index(posixpath.splitext(path)[1])
+                       if posixpath.splitext(path)[1] in FONT_PREFERENCE else len(FONT_PREFERENCE))
+        if files and graph.exists(files[0]) and files[0] not in fonts:
+            fonts.append(files[0])
+    return fonts[:MAX_FONT_PRELOADS]
+
+
+def imported_stylesheets(graph, page, stylesheets):
+    """Feuilles chargées par @import : découvertes tard, à précharger"""
+    found = []
+    stack = list(stylesheets)
+    while stack:
+        for target in graph.references(stack.pop(), ASSET):
+            if target.endswith('.css') and target not in found and graph.exists(target):
+                found.append(target)
+                stack.append(target)
+    return found
+
+
+def page_stylesheets(page, content):
+    stylesheets = []
+    for match in TOKEN_PATTERN.finditer(content):
+        if match.group('link') is None:
+            continue
+        attrs = parse_attrs(match.group(0))
+        if 'stylesheet' in attrs.get('rel', '').lower().split() and attrs.get('media', 'all') in ('all', 'screen'):
+            path = normalize_reference(page, attrs.get('href', ''))
+            if path:
+                stylesheets.append(path)
+    return stylesheets
+
+
+def blocking_bytes(graph, paths):
+    return sum(graph.size(path) for path in set(paths))
+
+
+def optimize_scripts(root=SITE_ROOT, patterns=MAIN_PAGES, dry_run=False, preload_fonts=True):
+    """Analyse les scripts des pages, réécrit leur chargement et compare les octets bloquants"""
+
+    graph = get_asset_graph(root)
+    safelist = re.compile('|'.join(SAFELIST))
+    pages = expand_pages(root, patterns)
+    cache = {}
+    edits = []
+    rows = []
+
+    for page in pages:
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+        scripts, pinned = page_scripts(root, page, content, cache)
+        deferred, violations = plan_scripts(scripts, pinned)
+        only = [page]
+
+        print(f"\n📄 {page} : {len(scripts)} scripts, {len(deferred)} à différer")
+        for index in sorted(pinned):
+            script = scripts[index]
+            if script.mode == 'blocking' and script.path is None and script.src is None:
+                needed = [scripts[i].label() for i in dependencies(scripts, index) if scripts[i].path]
+                if needed:
+                    print(f"   📌 script inline exécuté pendant l'analyse : garde {', '.join(needed)} synchrones")
+
+        seen = set()
+        for script in scripts:
+            if script.path and script.path in seen:
+                print(f"   ⚠️  {script.path} chargé plusieurs fois")
+            seen.add(script.path)
+
+        # Plusieurs scripts déplacés derrière la même ancre : enchaînés pour garder leur ordre
+        anchors = {}
+        for index, dependency in violations:
+            script, needed = scripts[index], scripts[dependency]
+            print(f"   ↕️  {script.path} utilise {', '.join(sorted(script.requires & needed.provides))} "
+                  f"de {needed.path}, chargé après : déplacé")
+            edits.append({'op': 'move', 'href': script.path,
+                          'after': anchors.get(needed.path, needed.path), 'pages': only})
+            anchors[needed.path] = script.path
+
+        for index in deferred:
+            edits.append({'op': 'set', 'href': scripts[index].path,
+                          'attrs': {'defer': True}, 'pages': only})
+
+        for path in module_preloads(root, scripts):
+            edits.append({'op': 'insert', 'href': path, 'tag': 'modulepreload', 'pages': only})
+
+        stylesheets = page_stylesheets(page, content)
+        for path in imported_stylesheets(graph, page, stylesheets):
+            edits.append({'op': 'insert', 'href': path, 'tag': 'preload',
+                          'attrs': {'as': 'style'}, 'pages': only})
+        if preload_fonts:
+            for path in critical_fonts(graph, page, safelist):
+                extension = posixpath.splitext(path)[1]
+                edits.append({'op': 'insert', 'href': path, 'tag': 'preload', 'pages': only,
+                              'attrs': {'as': 'font', 'type': FONT_TYPES.get(extension, 'font/' + extension[1:]),
+                                        'crossorigin': True}})
+
+        # Octets bloquants : CSS (+ @import) et scripts synchrones locaux
+        css = stylesheets + imported_stylesheets(graph, page, stylesheets)
+        before = [s.path for s in scripts if s.mode == 'blocking' and s.path]
+        after = [s.path for i, s in enumerate(scripts) if s.mode == 'blocking' and s.path and i not in deferred]
+        third_party = sum(1 for s in scripts if s.mode == 'blocking' and s.src and not s.path)
+        rows.append((page, blocking_bytes(graph, css), blocking_bytes(graph, before),
+                     blocking_bytes(graph, after), third_party))
+
+    print()
+    rewrite_pages(root, pages, edits, dry_run)
+
+    print(f"\n📊 Octets bloquant l'analyse des pages (CSS + scripts synchrones locaux) :")
+    width = max(len(page) for page, *_ in rows) if rows else 0
+    for page, css, before, after, third_party in rows:
+        extra = f" + {third_party} script(s) tiers" if third_party else ''
+        print(f"   {page:<{width}}  {(css + before)/1024:7.1f} KB -> {(css + after)/1024:7.1f} KB "
+              f"(scripts {before/1024:.1f} -> {after/1024:.1f} KB){extra}")
+    total_before = sum(css + before for _, css, before, _, _ in rows)
+    total_after = sum(css + after for _, css, _, after, _ in rows)
+    print(f"\n💾 Total : {total_before/1024:.1f} KB -> {total_after/1024:.1f} KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimise le chargement des scripts des pages")
+    parser.add_argument('pages', nargs='*', default=MAIN_PAGES,
+                        help="pages ou globs relatifs au site (défaut : pages principales)")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--dry-run', action='store_true',
+                        help="afficher le diff sans rien écrire")
+    parser.add_argument('--no-font-preload', action='store_true',
+                        help="ne pas précharger les polices critiques")
+    args = parser.parse_args()
+
+    optimize_scripts(args.root, args.pages, args.dry_run, not args.no_font_preload)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Script pour alléger les vidéos des pages et différer leur chargement
+Les balises <video>/<source> sont réécrites en preload="none" avec une affiche et chargées
+par un IntersectionObserver (js/lazy-videos.js) ; avec ffmpeg, l'affiche et des variantes
+à débit réduit sont générées, sinon les tailles sont seulement rapportées
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+import shutil
+import subprocess
+
+from asset_graph import (EXTERNAL_PATTERN, SITE_ROOT, cache_path_for, get_asset_graph, hash_file,
+                         load_cache, normalize_reference, parallel_map, save_cache)
+from bundle_assets import write_atomically
+from inline_critical_css import parse_attrs
+from rewrite_pages import rewrite_pages, set_attribute
+
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mov', '.m4v')
+# Variantes H.264 plus légères et requête média qui les sélectionne (points de rupture Webflow)
+VARIANTS = {640: '(max-width: 767px)', 1280: '(max-width: 1439px)'}
+VARIANT_CRF = 28
+POSTER_SUFFIX = '-poster.jpg'
+# Image de l'affiche : une seconde après le début (ou le milieu d'une vidéo plus courte)
+POSTER_TIME = 1.0
+
+LOADER_PATH = 'js/lazy-videos.js'
+LAZY_ATTRIBUTE = 'data-lazy-video'
+
+ENCODE_ERRORS = (OSError, KeyError, ValueError, subprocess.CalledProcessError)
+
+VIDEO_TAG_PATTERN = re.compile(r'<video\b[^>]*>.*?</video\s*>', re.IGNORECASE | re.DOTALL)
+SOURCE_TAG_PATTERN = re.compile(r'<source\b[^>]*>', re.IGNORECASE)
+VARIANT_PATTERN = re.compile(r'-p-\d+$')
+SRC_ATTRIBUTE_PATTERN = re.compile(r'(\s)src(\s*=)', re.IGNORECASE)
+
+LOADER_JS = """/* Chargement différé des vidéos (généré par optimize_videos.py) */
+(function () {
+  var videos = document.querySelectorAll('video[data-lazy-video]');
+
+  function load(video) {
+    video.querySelectorAll('source[data-src]').forEach(function (source) {
+      source.src = source.getAttribute('data-src');
+      source.removeAttribute('data-src');
+    });
+    if (video.hasAttribute('data-src')) {
+      video.src = video.getAttribute('data-src');
+      video.removeAttribute('data-src');
+    }
+    video.removeAttribute('data-lazy-video');
+    video.load();
+    if (video.autoplay) {
+      var playing = video.play();
+      if (playing && playing.catch) {
+        playing.catch(function () {});
+      }
+    }
+  }
+
+  if (!('IntersectionObserver' in window)) {
+    videos.forEach(load);
+    return;
+  }
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (entry.isIntersecting) {
+        observer.unobserve(entry.target);
+        load(entry.target);
+      }
+    });
+  }, { rootMargin: '200px 0px' });
+  videos.forEach(function (video) {
+    observer.observe(video);
+  });
+})();
+"""
+
+
+def find_backend():
+    """Encodeur disponible : ffmpeg, sinon None (rapport seul)"""
+    if shutil.which('ffmpeg') and shutil.which('ffprobe'):
+        return 'ffmpeg'
+    return None
+
+
+def source_url(attrs):
+    return attrs.get('src') or attrs.get('data-src') or ''
+
+
+def defer_src(tag):
+    """src -> data-src, à la même place dans la balise"""
+    return SRC_ATTRIBUTE_PATTERN.sub(r'\1data-src\2', tag, count=1)
+
+
+def variant_path(path, width):
+    base = posixpath.splitext(path)[0]
+    return f'{base}-p-{width}.mp4'
+
+
+def poster_path(path):
+    return posixpath.splitext(path)[0] + POSTER_SUFFIX
+
+
+def probe(file_path):
+    """Largeur, hauteur, durée (s) et débit (bit/s) de la vidéo"""
+    output = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                             '-show_entries', 'stream=width,height:format=duration,bit_rate',
+                             '-of', 'json', file_path],
+                            capture_output=True, text=True, check=True).stdout
+    data = json.loads(output)
+    stream = data['streams'][0]
+    return {'width': int(stream['width']), 'height': int(stream['height']),
+            'duration': float(data['format'].get('duration', 0)),
+            'bit_rate': int(data['format'].get('bit_rate', 0))}
+
+
+def extract_poster(source, target, duration):
+    tmp_path = target + '.tmp.jpg'
+    position = min(POSTER_TIME, duration / 2) if duration else 0
+    subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-ss', f'{position:.2f}', '-i', source,
+                    '-frames:v', '1', '-q:v', '3', tmp_path], check=True)
+    os.replace(tmp_path, target)
+
+
+def encode_variant(source, target, width, muted):
+    """Variante H.264 à la largeur donnée, démarrage rapide (moov en tête)"""
+    tmp_path = target + '.tmp.mp4'
+    command = ['ffmpeg', '-y', '-loglevel', 'error', '-i', source, '-vf', f'scale={width}:-2',
+               '-c:v', 'libx264', '-crf', str(VARIANT_CRF), '-preset', 'slow', '-pix_fmt', 'yuv420p',
+               '-movflags', '+faststart']
+    command += ['-an'] if muted else ['-c:a', 'aac', '-b:a', '96k']
+    subprocess.run(command + [tmp_path], check=True)
+    os.replace(tmp_path, target)
+
+
+def process_video(job):
+    """Génère l'affiche et les variantes manquantes d'une vidéo locale
+
+    Renvoie (empreinte, infos ffprobe, affiche, {largeur: variante},
+    fichiers prévus mais non générés, erreur).
+    """
+    root, path, muted, previous, backend, dry_run = job
+    file_path = os.path.join(root, path)
+    digest = hash_file(file_path)
+
+    if backend is not None and previous and previous[1] and previous[0] == digest and all(
+            os.path.exists(os.path.join(root, output))
+            for output in [previous[2], *previous[3].values()] if output):
+        return digest, previous[1], previous[2], previous[3], [], None
+
+    poster = poster_path(path)
+    if backend is None:
+        planned = [poster] if not os.path.exists(os.path.join(root, poster)) else []
+        return digest, {}, None if planned else poster, {}, planned, None
+
+    try:
+        info = probe(file_path)
+    except ENCODE_ERRORS as error:
+        return digest, {}, None, {}, [], str(error)
+
+    planned = []
+    if not os.path.exists(os.path.join(root, poster)):
+        if dry_run:
+            planned.append(poster)
+            poster = None
+        else:
+            try:
+                extract_poster(file_path, os.path.join(root, poster), info['duration'])
+            except ENCODE_ERRORS as error:
+                return digest, info, None, {}, planned, str(error)
+
+    variants = {}
+    for width in sorted(VARIANTS):
+        if width >= info['width']:
+            continue
+        target = variant_path(path, width)
+        target_path = os.path.join(root, target)
+        if os.path.exists(target_path):
+            variants[width] = target
+            continue
+        if dry_run:
+            planned.append(target)
+            continue
+        try:
+            encode_variant(file_path, target_path, width, muted)
+        except ENCODE_ERRORS as error:
+            return digest, info, poster, variants, planned, str(error)
+        # Une source déjà très compressée peut donner une variante plus lourde : on la jette
+        if os.path.getsize(target_path) >= os.path.getsize(file_path):
+            os.remove(target_path)
+            continue
+        variants[width] = target
+
+    return digest, info, poster, variants, planned, None
+
+
+def find_videos(root, graph):
+    """Balises <video> par page et leurs sources (locales, externes, introuvables)"""
+    tags = {}
+    for page in graph.pages():
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+        for match in VIDEO_TAG_PATTERN.finditer(content):
+            text = match.group(0)
+            opening = text[:text.index('>') + 1]
+            attrs = parse_attrs(opening)
+            urls = [source_url(attrs)] + [source_url(parse_attrs(source))
+                                         for source in SOURCE_TAG_PATTERN.findall(text)]
+            sources = []
+            for url in filter(None, urls):
+                if EXTERNAL_PATTERN.match(url):
+                    sources.append((url, 'external'))
+                    continue
+                path = normalize_reference(page, url)
+                if not path.lower().endswith(VIDEO_EXTENSIONS):
+                    sources.append((path, 'invalid'))
+                elif not graph.exists(path):
+                    sources.append((path, 'missing'))
+                else:
+                    sources.append((path, 'local'))
+            tags.setdefault(page, []).append((match, attrs, sources))
+    return tags
+
+
+def indent_of(content, position):
+    line_start = content.rfind('\n', 0, position) + 1
+    return content[line_start:position] if not content[line_start:position].strip() else ''
+
+
+def rewrite_video(page, text, attrs, sources, results, indent):
+    """Balise <video> différée : preload="none", affiche, variantes et data-src"""
+    if LAZY_ATTRIBUTE in attrs:
+        return text
+    page_dir = posixpath.dirname(page) or '.'
+    local = [path for path, kind in sources if kind == 'local' and path in results]
+
+    opening_end = text.index('>') + 1
+    opening, body = text[:opening_end], text[opening_end:]
+    opening = set_attribute(opening, 'preload', 'none')
+    opening = set_attribute(opening, LAZY_ATTRIBUTE, True)
+    if local and not attrs.get('poster') and results[local[0]][2]:
+        opening = set_attribute(opening, 'poster', posixpath.relpath(results[local[0]][2], page_dir))
+
+    def variant_sources(path, source):
+        """Variantes plus légères (requête média) avant la source d'origine"""
+        variants = results[path][3] if path in results else {}
+        return [f'<source media="{VARIANTS[width]}" src="{posixpath.relpath(variant, page_dir)}" '
+                f'type="video/mp4"/>' for width, variant in sorted(variants.items())] + [source]
+
+    # Vidéo avec src : devient une <source> pour recevoir ses variantes
+    if attrs.get('src') and local and results[local[0]][3]:
+        opening = set_attribute(set_attribute(opening, 'src', None), 'type', None)
+        body = (f'\n{indent} <source src="{attrs["src"]}" type="{attrs.get("type", "video/mp4")}"/>'
+                + body)
+    elif attrs.get('src'):
+        opening = defer_src(opening)
+
+    def defer_source(match):
+        source = match.group(0)
+        url = parse_attrs(source).get('src')
+        if not url:
+            return source
+        if parse_attrs(source).get('media') or EXTERNAL_PATTERN.match(url):
+            return defer_src(source)
+        rendered = variant_sources(normalize_reference(page, url), source)
+        return f'\n{indent} '.join(defer_src(item) for item in rendered)
+
+    return opening + SOURCE_TAG_PATTERN.sub(defer_source, body)
+
+
+def optimize_videos(root=SITE_ROOT, workers=None, use_cache=True, dry_run=False):
+    """Génère affiches et variantes des vidéos locales et diffère le chargement dans les pages"""
+
+    backend = find_backend()
+    if backend is None:
+        print("ℹ️  ffmpeg absent : aucune affiche ni variante générée, tailles seulement")
+    else:
+        print(f"🎬 Encodeur : {backend}")
+
+    graph = get_asset_graph(root)
+    tags = find_videos(root, graph)
+    if not tags:
+        print("✅ Aucune balise <video> dans les pages")
+        return
+
+    muted = {}
+    for page_tags in tags.values():
+        for _, attrs, sources in page_tags:
+            for path, kind in sources:
+                if kind == 'local':
+                    muted[path] = muted.get(path, True) and 'muted' in attrs
+
+    cache_path = cache_path_for(root, 'videos')
+    cached = load_cache(cache_path) if use_cache else {}
+    local = sorted(muted)
+    jobs = [(root, path, muted[path], cached.get(path), backend, dry_run) for path in local]
+    results = dict(zip(local, parallel_map(process_video, jobs,
+                                           workers=workers or os.cpu_count() or 1, chunksize=1)))
+
+    print(f"\n🔍 Vidéos locales : {len(local)}")
+    entries = {}
+    for path in local:
+        digest, info, poster, variants, planned, error = results[path]
+        if error:
+            print(f"   ⚠️  {path} : {error}")
+            continue
+        entries[path] = (digest, info, poster, variants)
+        line = f"   📄 {path} ({graph.size(path)/1024:.1f} KB"
+        if info:
+            line += (f", {info['width']}x{info['height']}, {info['duration']:.1f} s, "
+                     f"{info['bit_rate']/1000:.0f} kb/s")
+        line += ')'
+        for width, variant in sorted(variants.items()):
+            size = os.path.getsize(os.path.join(root, variant))
+            line += f", {width}px : {size/1024:.1f} KB"
+        if poster:
+            line += f", affiche : {posixpath.basename(poster)}"
+        if planned:
+            line += f", à générer : {', '.join(posixpath.basename(target) for target in planned)}"
+        print(line)
+
+    print(f"\n📄 Pages :")
+    for page, page_tags in sorted(tags.items()):
+        kinds = [kind for _, _, sources in page_tags for _, kind in sources]
+        deferred = sum(graph.size(path) for _, attrs, sources in page_tags for path, kind in sources
+                       if kind == 'local' and LAZY_ATTRIBUTE not in attrs)
+        line = f"   {page} : {len(page_tags)} vidéos"
+        if kinds.count('external'):
+            line += f", {kinds.count('external')} sources externes"
+        if deferred:
+            line += f", {deferred/1024:.1f} KB locaux différés"
+        print(line)
+        for _, _, sources in page_tags:
+            for path, kind in sources:
+                if kind == 'missing':
+                    print(f"      ⚠️  source introuvable : {path}")
+                elif kind == 'invalid':
+                    print(f"      ⚠️  source qui n'est pas une vidéo : {path}")
+
+    # Vidéos du site qu'aucune page ni feuille de style ne référence
+    unused = [path for path in graph.files() if path.lower().endswith(VIDEO_EXTENSIONS)
+              and path not in muted and not graph.referrers(path)
+              and not VARIANT_PATTERN.search(posixpath.splitext(path)[0])]
+    for path in unused:
+        print(f"   ℹ️  {path} ({graph.size(path)/1024:.1f} KB) : non référencée")
+
+    if dry_run:
+        print("\nℹ️  Mode simulation : aucune page réécrite")
+        return
+
+    rewritten = []
+    for page, page_tags in sorted(tags.items()):
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+        new_content = content
+        for match, attrs, sources in reversed(page_tags):
+            tag = rewrite_video(page, match.group(0), attrs, sources, entries,
+                                indent_of(content, match.start()))
+            new_content = new_content[:match.start()] + tag + new_content[match.end():]
+        if new_content != content:
+            os.replace(write_atomically(os.path.join(root, page), new_content),
+                       os.path.join(root, page))
+            rewritten.append(page)
+            print(f"   ✏️  {page} : vidéos différées")
+
+    loader = os.path.join(root, LOADER_PATH)
+    try:
+        with open(loader, 'r', encoding='utf-8') as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if current != LOADER_JS:
+        os.makedirs(os.path.dirname(loader), exist_ok=True)
+        os.replace(write_atomically(loader, LOADER_JS), loader)
+        print(f"   📝 {LOADER_PATH} écrit")
+    rewrite_pages(root, sorted(tags), [{'op': 'insert', 'href': LOADER_PATH, 'tag': 'script',
+                                        'attrs': {'defer': True}}], workers=workers)
+
+    # Sans encodeur rien n'a été mesuré : le cache reste celui du dernier encodage
+    if use_cache and entries and backend is not None:
+        save_cache(cache_path, {**cached, **entries})
+
+    print(f"\n📊 Résumé :")
+    print(f"   Vidéos locales traitées : {len(entries)}")
+    print(f"   Pages réécrites : {len(rewritten)}")
+    print(f"   Vidéos non référencées : {len(unused)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Affiches, variantes et chargement différé des vidéos")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="réencoder même les vidéos inchangées")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="afficher le rapport sans rien écrire")
+    args = parser.parse_args()
+
+    optimize_videos(args.root, args.workers, not args.no_cache, args.dry_run)
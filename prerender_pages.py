@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Script pour précalculer les pages enrichies par le CMS (server.js)
+Applique une seule fois les injections de server.js à partir d'un instantané JSON
+ou de l'API du CMS, écrit les pages statiques et un manifeste des sections utilisées
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from asset_graph import SITE_ROOT
+from bundle_assets import write_atomically
+
+CMS_API_URL = 'http://localhost:8000/api'
+MANIFEST_NAME = 'prerender-manifest.json'
+
+# Sections du CMS et route de l'API correspondante
+SECTION_ENDPOINTS = {
+    'projects': '/projects',
+    'hero': '/homepage/hero',
+    'brands': '/homepage/brands',
+    'services': '/homepage/services',
+    'offer': '/homepage/offer',
+    'testimonials': '/homepage/testimonials',
+    'footer': '/homepage/footer',
+}
+
+# Pages précalculées et sections injectées, dans l'ordre de server.js
+PRERENDERED_PAGES = {
+    'index.html': ['projects', 'hero', 'brands', 'services', 'offer', 'testimonials', 'footer'],
+}
+
+
+def js(value):
+    """Valeur telle qu'un template literal JS l'afficherait"""
+    if value is None:
+        return 'undefined'
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def replace_first(pattern, html, build):
+    """Équivalent de html.replace(regex, ...) en JS : première occurrence seulement"""
+    return re.sub(pattern, build, html, count=1)
+
+
+def inject_projects(html, projects):
+    if projects:
+        projects_html = ''.join(f'''
+       <a class="work_card w-inline-block" fade-in="" href="{js(project.get('slug') or project.get('id'))}.html" id="w-node-cd0c8328-2622-8d6b-295f-f4d5926d9154-926d9154" project-category="all">
+        <div class="work_img">
+         <img alt="{js(project.get('title'))}" class="work_card_img" loading="lazy" 
+              src="{js(project.get('imageUrl') or '/images/placeholder-project.jpg')}" />
+        </div>
+        <div class="work_card_text_footer">
+         <div class="work_card_text_title">
+          <h3 class="u-text-style-large u-color-dark">
+           {js(project.get('title'))}
+          </h3>
+         </div>
+         <div class="u-text-style-small u-color-gray-900">
+          {js(project.get('description'))}
+         </div>
+        </div>
+        <div class="card-hover w-embed">
+        </div>
+       </a>''' for project in projects[:6])
+    else:
+        projects_html = '       <!-- Aucun projet dans le CMS -->'
+
+    pattern = r'(<div class="work_main_grid_group">\s*)([\s\S]*?)(\s*</div>)'
+    if not re.search(pattern, html):
+        print("   ⚠️  Section work_main_grid_group introuvable")
+        return html
+    return replace_first(pattern, html, lambda m: m.group(1) + projects_html + m.group(3))
+
+
+def inject_hero(html, hero):
+    if hero.get('title'):
+        html = replace_first(r'<h1 class="u-text-style-display">\s*([^<]+)\s*</h1>', html,
+                             lambda m: f'<h1 class="u-text-style-display">\n        {hero["title"]}\n       </h1>')
+    if hero.get('description'):
+        html = replace_first(
+            r'<div class="u-text-style-regular u-color-gray-900" data-hero-description="">\s*[\s\S]*?</div>', html,
+            lambda m: ('<div class="u-text-style-regular u-color-gray-900" data-hero-description="">\n'
+                       f'         {hero["description"]}\n        </div>'))
+    if hero.get('videoUrl'):
+        html = replace_first(r'<source src="[^"]*" type="video/mp4"/>', html,
+                             lambda m: f'<source src="{hero["videoUrl"]}" type="video/mp4"/>')
+    return html
+
+
+def inject_brands(html, brands):
+    if brands.get('title'):
+        html = replace_first(
+            r'(<div class="brands_hover_group">\s*<div class="u-text-style-1rem">)\s*([^<]+)\s*(</div>)', html,
+            lambda m: f'{m.group(1)}\n          {brands["title"]}\n         {m.group(3)}')
+
+    logos = brands.get('logos') or []
+    if logos:
+        logos_html = ''.join(f'''
+           <div class="brands_main_group-item">
+            <img alt="{js(logo.get('name'))}" class="brands_main_group-img" loading="lazy" src="{js(logo.get('logoUrl'))}"/>
+           </div>''' for logo in logos)
+        # Logos dupliqués pour un défilement continu
+        html = replace_first(r'<div class="marquee_track">\s*[\s\S]*?</div>', html,
+                             lambda m: f'<div class="marquee_track">\n{logos_html + logos_html}\n          </div>')
+    return html
+
+
+def inject_services(html, services):
+    if services.get('title'):
+        pattern = r'(section class="services_main_wrap">[\s\S]*?<h2 class="u-text-style-h2" text-split="">\s*)Services(\s*</h2>)'
+        if re.search(pattern, html):
+            html = replace_first(pattern, html, lambda m: m.group(1) + services['title'] + m.group(2))
+        else:
+            print("   ⚠️  Titre \"Services\" introuvable")
+
+    if services.get('description'):
+        pattern = r'(section class="services_main_wrap">[\s\S]*?<p class="u-text-style-large teste">\s*)[\s\S]*?(\s*</p>)'
+        if re.search(pattern, html):
+            html = replace_first(pattern, html, lambda m: m.group(1) + services['description'] + m.group(2))
+        else:
+            print("   ⚠️  Description des services introuvable")
+
+    items = services.get('services') or []
+    if items:
+        parts = []
+        for service in items:
+            color_class = 'services_bg_colored'
+            if 'services_bg_colored' in (service.get('colorClass') or ''):
+                color_class = service['colorClass']
+            parts.append(f'''
+       <a class="services_link w-inline-block" data-w-id="8ac0aab0-cf9b-9983-13d5-44e1e7191eed" data-wf--services-link--variant="base" fade-in="" href="{js(service.get('link'))}">
+        <div class="services_top_wrp">
+         <div class="services_text-group">
+          <div class="u-text-style-large item-link">
+           {js(service.get('number'))}
+          </div>
+          <div class="u-text-style-h3">
+           {js(service.get('title'))}
+          </div>
+         </div>
+         <div class="services_bullet_wrp">
+          <div class="services_bullet">
+           <div class="services_title">
+            See projects
+           </div>
+           <div class="{color_class}">
+           </div>
+           <div class="services_bg_black">
+           </div>
+          </div>
+         </div>
+        </div>
+        <div class="services_bottom_wrp">
+         <p class="service_description">
+          {js(service.get('description'))}
+         </p>
+        </div>
+        <div class="service_shadow">
+        </div>
+       </a>''')
+        services_html = ''.join(parts)
+
+        pattern = r'<div class="services_group_link">\s*((?:<a class="services_link[\s\S]*?</a>\s*){3})\s*</div>'
+        if re.search(pattern, html):
+            html = replace_first(pattern, html,
+                                 lambda m: f'<div class="services_group_link">\n{services_html}\n      </div>')
+        else:
+            print("   ⚠️  Les 3 services statiques sont introuvables")
+    return html
+
+
+def inject_offer(html, offer):
+    if offer.get('title'):
+        pattern = r'(<h2 class="u-text-style-h2"[^>]*>\s*)Together, we can\.\.\.(\s*</h2>)'
+        if re.search(pattern, html):
+            html = replace_first(pattern, html, lambda m: m.group(1) + offer['title'] + m.group(2))
+        else:
+            print("   ⚠️  Titre \"Together, we can...\" introuvable")
+
+    points = offer.get('points') or []
+    if points:
+        points_html = ''.join(f'''
+         <div class="offer_text_wrp" data-w-id="6cfc2d39-7769-857a-c09f-9c09760358dd" fade-in="">
+          <div class="orange_dot">
+          </div>
+          <div class="u-text-style-regular diff01">
+           {js(point.get('text'))}
+          </div>
+         </div>''' for point in sorted(points, key=lambda point: point.get('order') or 0))
+
+        pattern = r'(<div class="offer_texts_group">\s*)((?:<div class="offer_text_wrp"[\s\S]*?</div>\s*){4})(\s*</div>)'
+        if re.search(pattern, html):
+            html = replace_first(pattern, html, lambda m: m.group(1) + points_html + m.group(3))
+        else:
+            print("   ⚠️  Points de l'offre introuvables")
+    return html
+
+
+def inject_testimonials(html, testimonials):
+    items = sorted(testimonials.get('testimonials') or [], key=lambda item: item.get('order') or 0)
+    if not items:
+        return html
+
+    parts = []
+    for item in items:
+        link = item.get('projectLink') or ''
+        target = 'target="_blank"' if link.startswith('http') else ''
+        parts.append(f'''
+        <div class="clientes-slide w-slide">
+         <div class="testimonials-card" data-w-id="7f8594a2-1a89-6150-e0ab-ef47ae7a4fc7">
+          <div class="testimonials-card-left">
+           <div class="testimonial-text u-color-dark">
+            "{js(item.get('text'))}"
+           </div>
+           <div class="g_section_space w-variant-41fc0c0a-cac3-53c9-9802-6a916e3fb342" data-wf--global-section-space--section-space="even">
+           </div>
+           <div class="testimonials-card-person-group">
+            <img alt="{js(item.get('clientName'))}" class="testimonials-avatar" loading="lazy" src="{js(item.get('clientPhoto'))}"/>
+            <div class="testimonials-person-info">
+             <div class="u-text-style-big">
+              {js(item.get('clientName'))}
+             </div>
+             <div class="u-text-style-1rem u-color-gray-900">
+              {js(item.get('clientTitle'))}
+             </div>
+            </div>
+           </div>
+          </div>
+          <div class="testimonials-card-right">
+           <div class="testimonial_card_img">
+            <img alt="{js(item.get('clientName'))} project" class="testimonials-person-thumb" loading="lazy" sizes="100vw" src="{js(item.get('projectImage'))}"/>
+           </div>
+           <div class="testimonials-card-right-group">
+            <div class="div-block-26">
+             <a class="c-global-link uline-double small-3 w-inline-block" fade-in="" href="{link}" {target}>
+              <div class="text-link is-footer small-4">
+               See the full case study
+              </div>
+              <div class="w-embed">
+              </div>
+             </a>
+            </div>
+           </div>
+           <a class="area_link w-inline-block" data-w-id="50f1e4da-acc4-76d9-1f3f-b24d9de50a3e" href="{link}" {target}>
+           </a>
+          </div>
+         </div>
+        </div>''')
+    testimonials_html = ''.join(parts)
+
+    pattern = r'(<div class="mask w-slider-mask">\s*)([\s\S]*?)(\s*</div>\s*<div class="left-arrow w-slider-arrow-left">)'
+    if re.search(pattern, html):
+        html = replace_first(pattern, html, lambda m: m.group(1) + testimonials_html + m.group(3))
+    else:
+        print("   ⚠️  Slider des témoignages introuvable")
+    return html
+
+
+def links_html(links, target=''):
+    return ''.join(f'''
+                                                                <li class="u-mb-1">
+                                                                        <a class="link" href="{js(link.get('url'))}"{target}>
+                                                                                {js(link.get('text'))}
+                                                                        </a>
+                                                                </li>''' for link in links)
+
+
+def inject_footer(html, footer):
+    if footer.get('title'):
+        pattern = r'(<div class="u-text-style-h4 u-color-gray-700" data-w-id="15828fe9-b698-9ed3-3a55-9a383fb763b2">)[\s\S]*?(</div>)'
+        if re.search(pattern, html):
+            html = replace_first(pattern, html,
+                                 lambda m: f'{m.group(1)}\n         {footer["title"]}\n        {m.group(2)}')
+        else:
+            print("   ⚠️  Titre du footer introuvable")
+
+    if footer.get('email'):
+        html = replace_first(r'(href="mailto:)[^"]*(")', html,
+                             lambda m: m.group(1) + footer['email'] + m.group(2))
+        html = replace_first(r'(<div class="text-link is-footer">\s*)hey@lawsonsydney\.work(\s*</div>)', html,
+                             lambda m: m.group(1) + footer['email'] + m.group(2))
+
+    links = footer.get('links')
+    if links:
+        html = replace_first(r'(<div class="u-color-gray-700 u-mb-2">\s*)Explore(\s*</div>)', html,
+                             lambda m: m.group(1) + 'Navigation' + m.group(2))
+        html = replace_first(r'(<div class="u-color-gray-700 u-mb-2">\s*)Socials(\s*</div>)', html,
+                             lambda m: m.group(1) + 'Réseaux Pro' + m.group(2))
+
+        lists = (
+            ('site', '15828fe9-b698-9ed3-3a55-9a383fb763bd', ''),
+            ('professional', '15828fe9-b698-9ed3-3a55-9a383fb763cd', ' target="_blank"'),
+            ('social', '15828fe9-b698-9ed3-3a55-9a383fb763da', ' target="_blank"'),
+        )
+        for name, node_id, target in lists:
+            items = links.get(name) or []
+            if not items:
+                continue
+            list_open = rf'<ul class="u-text-style-regular"\s+id="w-node-_{node_id}-3fb763ab"'
+            if name == 'social':
+                # Titre ajouté avant la liste des réseaux sociaux
+                html = replace_first(f'({list_open})', html, lambda m: (
+                    '<div class="u-mb-3">\n         <div class="u-color-gray-700 u-mb-2">\n'
+                    '          Réseaux Sociaux\n         </div>\n        </div>\n        ' + m.group(1)))
+            pattern = rf'({list_open}\s+role="list">\s*)([\s\S]*?)(\s*</ul>)'
+            if re.search(pattern, html):
+                items_html = links_html(items, target)
+                html = replace_first(pattern, html, lambda m: m.group(1) + items_html + m.group(3))
+            else:
+                print(f"   ⚠️  Liste de liens '{name}' introuvable")
+
+    if footer.get('copyright'):
+        pattern = (r"(<a class=\"footer-info-text\" href=\"privacy\.html\">\s*)"
+                   r"© 2025 Lawson Sydney — Designin' Incredibly Dope Shit Since '08\.")
+        flexible = r'(<a class="footer-info-text" href="privacy\.html">\s*)© 2025 Lawson Sydney[^<]*(\s*<span)'
+        if re.search(pattern, html):
+            html = replace_first(pattern, html, lambda m: m.group(1) + footer['copyright'])
+        elif re.search(flexible, html):
+            html = replace_first(flexible, html, lambda m: m.group(1) + footer['copyright'] + m.group(2))
+        else:
+            print("   ⚠️  Copyright du footer introuvable")
+    return html
+
+
+INJECTORS = {
+    'projects': inject_projects,
+    'hero': inject_hero,
+    'brands': inject_brands,
+    'services': inject_services,
+    'offer': inject_offer,
+    'testimonials': inject_testimonials,
+    'footer': inject_footer,
+}
+
+
+def section_content(name, response):
+    """Contenu utile d'une réponse de l'API ({'data': ...} sauf pour les projets)"""
+    if name == 'projects':
+        return response or []
+    return (response or {}).get('data') if isinstance(response, dict) else None
+
+
+def fetch_section(api_url, name):
+    """Réponse de l'API pour une section : (réponse, erreur)"""
+    try:
+        with urllib.request.urlopen(api_url + SECTION_ENDPOINTS[name], timeout=10) as response:
+            return json.load(response), None
+    except (urllib.error.URLError, OSError, ValueError) as error:
+        return None, error
+
+
+def load_sections(names, snapshot=None, api_url=CMS_API_URL):
+    """Réponses de l'API par section, depuis un instantané ou l'API (en parallèle)"""
+    if snapshot:
+        with open(snapshot, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {name: data.get(name) for name in names}
+    # Les sections sont indépendantes : une seule attente réseau au lieu de sept
+    with ThreadPoolExecutor(max_workers=len(names) or 1) as executor:
+        results = list(executor.map(lambda name: fetch_section(api_url, name), names))
+    responses = {}
+    for name, (response, error) in zip(names, results):
+        if error:
+            print(f"   ❌ API du CMS indisponible pour {SECTION_ENDPOINTS[name]} : {error}")
+        responses[name] = response
+    return responses
+
+
+def digest_of(value):
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def output_name(page):
+    return page.replace('.html', '-prerendered.html')
+
+
+def prerender_pages(root=SITE_ROOT, snapshot=None, api_url=CMS_API_URL, force=False,
+                    save_snapshot=None):
+    """Précalcule les pages CMS dont le gabarit ou une section a changé"""
+
+    names = sorted({name for sections in PRERENDERED_PAGES.values() for name in sections})
+    source = snapshot or api_url
+    print(f"📥 Sections du CMS : {', '.join(names)} (source : {source})")
+    responses = load_sections(names, snapshot, api_url)
+
+    if save_snapshot:
+        with open(save_snapshot, 'w', encoding='utf-8') as f:
+            json.dump(responses, f, ensure_ascii=False, indent=2)
+        print(f"💾 Instantané écrit dans {save_snapshot}")
+
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    rendered = 0
+    for page, sections in PRERENDERED_PAGES.items():
+        page_path = os.path.join(root, page)
+        if not os.path.exists(page_path):
+            print(f"⚠️  Fichier non trouvé : {page_path}")
+            continue
+        with open(page_path, 'r', encoding='utf-8') as f:
+            template = f.read()
+
+        entry = {
+            'output': output_name(page),
+            'template': hashlib.sha256(template.encode('utf-8')).hexdigest(),
+            'sections': {name: digest_of(section_content(name, responses[name])) for name in sections},
+        }
+        previous = manifest.get(page, {})
+        changed = [name for name in sections
+                   if previous.get('sections', {}).get(name) != entry['sections'][name]]
+        up_to_date = (not force and not changed and previous.get('template') == entry['template']
+                      and os.path.exists(os.path.join(root, entry['output'])))
+        if up_to_date:
+            print(f"✅ {page} : à jour")
+            continue
+
+        print(f"🔄 {page} : " + (f"sections modifiées : {', '.join(changed)}" if changed else "gabarit modifié"))
+        html = template
+        for name in sections:
+            content = section_content(name, responses[name])
+            if content is None:
+                print(f"   ⚠️  {name} : pas de données, contenu statique conservé")
+                continue
+            html = INJECTORS[name](html, content)
+
+        output_path = os.path.join(root, entry['output'])
+        os.replace(write_atomically(output_path, html), output_path)
+        manifest[page] = entry
+        rendered += 1
+        print(f"   📄 -> {entry['output']}")
+
+    os.replace(write_atomically(manifest_path, json.dumps(manifest, indent=2, sort_keys=True) + '\n'),
+               manifest_path)
+
+    print(f"\n📊 Résumé :")
+    print(f"   Pages régénérées : {rendered}")
+    print(f"   Pages à jour : {len(PRERENDERED_PAGES) - rendered}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Précalcule les pages enrichies par le CMS")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--snapshot', default=None,
+                        help="instantané JSON des réponses du CMS, par section")
+    parser.add_argument('--api', default=CMS_API_URL,
+                        help="URL de l'API du CMS (si pas d'instantané)")
+    parser.add_argument('--save-snapshot', default=None,
+                        help="écrire les réponses récupérées dans un instantané JSON")
+    parser.add_argument('--force', action='store_true',
+                        help="régénérer même les pages à jour")
+    args = parser.parse_args()
+
+    prerender_pages(args.root, args.snapshot, args.api, args.force, args.save_snapshot)
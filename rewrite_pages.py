@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Réécriture des références CSS/JS des pages HTML par lots, à partir d'une liste d'éditions
+Une seule lecture et une seule écriture par page, en parallèle ; toutes les pages sont
+préparées avant la première écriture, et un mode simulation affiche le diff
+"""
+
+import argparse
+import difflib
+import fnmatch
+import json
+import os
+import posixpath
+import re
+import sys
+
+from asset_graph import MAIN_PAGES, SITE_ROOT, normalize_reference, parallel_map
+from bundle_assets import write_atomically
+from clean_pages import expand_pages
+from inline_critical_css import parse_attrs
+
+# Éditions reconnues :
+#   {"op": "insert", "href": "css/x.css", "after": "css/y.css" | ["css/a.css", "css/b.css"],
+#    "tag": "stylesheet" | "script" | "preload" | "modulepreload", "attrs": {"defer": true}}
+#   {"op": "remove", "href": "css/x.css"}
+#   {"op": "move", "href": "js/x.js", "before": "js/y.js"}
+#   {"op": "set", "href": "js/x.js", "attrs": {"defer": true, "async": null}}
+# Chaque édition peut être limitée à certaines pages : "pages": ["work*.html"]
+OPERATIONS = ('insert', 'remove', 'move', 'set')
+TAGS = ('stylesheet', 'script', 'preload', 'modulepreload')
+
+# Commentaires (ignorés), scripts et styles avec leur contenu, <link>, fin de <head>/<body>
+TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|<(?P<tag>style|script)\b(?P<attrs>[^>]*)>(?P<content>.*?)</(?P=tag)\s*>'
+    r'|<link\b(?P<link>[^>]*)>'
+    r'|</(?P<close>head|body)\s*>',
+    re.DOTALL | re.IGNORECASE
+)
+LINE_END_PATTERN = re.compile(r'[ \t]*\r?\n')
+
+
+class Resource:
+    """Balise <link> ou <script src> de la page, conservée telle quelle tant qu'on n'y touche pas"""
+
+    __slots__ = ('kind', 'path', 'text')
+
+    def __init__(self, kind, path, text):
+        self.kind = kind    # 'stylesheet', 'script', 'preload', 'modulepreload', 'link', 'head', 'body'
+        self.path = path    # chemin relatif au site (None pour les marqueurs et les URL externes)
+        self.text = text
+
+
+def parse_document(page, content):
+    """Découpe la page en une liste alternant texte brut et Resource"""
+    document = []
+    last = 0
+    for match in TOKEN_PATTERN.finditer(content):
+        text = match.group(0)
+        if match.group('close'):
+            resource = Resource(match.group('close').lower(), None, text)
+        elif match.group('link') is not None:
+            attrs = parse_attrs(text)
+            rel = attrs.get('rel', '').lower().split()
+            kind = next((name for name in ('stylesheet', 'modulepreload', 'preload') if name in rel), 'link')
+            resource = Resource(kind, normalize_reference(page, attrs.get('href', '')), text)
+        elif (match.group('tag') or '').lower() == 'script':
+            src = parse_attrs(f'<script{match.group("attrs")}>').get('src')
+            if src is None:
+                continue  # script inline : reste dans le texte
+            resource = Resource('script', normalize_reference(page, src), text)
+        else:
+            continue  # commentaire ou <style>
+        document.append(content[last:match.start()])
+        document.append(resource)
+        last = match.end()
+    document.append(content[last:])
+    return document
+
+
+def serialize_document(document):
+    return ''.join(part if isinstance(part, str) else part.text for part in document)
+
+
+def set_attribute(tag, name, value):
+    """Ajoute, remplace ou retire un attribut d'une balise (True : attribut booléen)"""
+    opening_end = tag.index('>')
+    opening, rest = tag[:opening_end + 1], tag[opening_end + 1:]
+    pattern = re.compile(rf'\s{re.escape(name)}(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?(?=[\s/>])',
+                         re.IGNORECASE)
+    if value is None or value is False:
+        return pattern.sub('', opening, count=1) + rest
+
+    rendered = f' {name}' if value is True else f' {name}="{value}"'
+    if pattern.search(opening):
+        opening = pattern.sub(lambda m: rendered, opening, count=1)
+    else:
+        end = len(opening) - 2 if opening.endswith('/>') else len(opening) - 1
+        opening = opening[:end] + rendered + opening[end:]
+    return opening + rest
+
+
+def render_tag(tag, href, attrs):
+    text = {
+        'stylesheet': f'<link href="{href}" rel="stylesheet"/>',
+        'script': f'<script src="{href}"></script>',
+        'preload': f'<link rel="preload" href="{href}"/>',
+        'modulepreload': f'<link rel="modulepreload" href="{href}"/>',
+    }[tag]
+    for name, value in attrs.items():
+        text = set_attribute(text, name, value)
+    return text
+
+
+def find(document, path, kinds=None):
+    """Positions des ressources qui pointent vers path"""
+    return [index for index, part in enumerate(document)
+            if isinstance(part, Resource) and part.path == path
+            and (kinds is None or part.kind in kinds)]
+
+
+def find_anchor(document, anchors):
+    """Première ancre présente dans la page, parmi une ou plusieurs candidates"""
+    for anchor in [anchors] if isinstance(anchors, str) else anchors:
+        found = find(document, anchor, ('stylesheet', 'script', 'preload', 'modulepreload', 'link'))
+        if found:
+            return found[0]
+    return None
+
+
+def indentation(document, index):
+    """Indentation de la ligne où se trouve la ressource"""
+    before = document[index - 1] if index > 0 else ''
+    line = before.rsplit('\n', 1)[-1]
+    return line if not line.strip() else ''
+
+
+def detach(document, index):
+    """Retire une ressource ; la ligne disparaît aussi si elle ne contenait qu'elle"""
+    resource = document[index]
+    before, after = document[index - 1], document[index + 1]
+    head = before.rstrip(' \t')
+    if head.endswith('\n') and LINE_END_PATTERN.match(after):
+        before = head[:-2] if head.endswith('\r\n') else head[:-1]
+    document[index - 1:index + 2] = [before + after]
+    return resource
+
+
+def attach(document, resource, index, after):
+    """Place une ressource avant ou après celle d'indice index, sur sa propre ligne"""
+    own = indentation(document, index)
+    if after:
+        document[index + 1:index + 1] = ['\n' + own, resource]
+        return
+
+    indent = own
+    if document[index].kind in ('head', 'body'):
+        # Avant </head> ou </body> : même indentation que la ressource précédente
+        previous = next((i for i in range(index - 2, 0, -2)
+                         if document[i].kind not in ('head', 'body')), None)
+        if previous is not None:
+            indent = indentation(document, previous)
+    before = document[index - 1]
+    document[index - 1] = before[:len(before) - len(own)] + indent
+    document[index:index] = [resource, '\n' + own]
+
+
+def default_anchor(document, tag):
+    """Sans ancre : préchargements avant la première feuille, CSS en fin de <head>, JS en fin de <body>"""
+    if tag in ('preload', 'modulepreload'):
+        for index, part in enumerate(document):
+            if isinstance(part, Resource) and part.kind in ('stylesheet', 'script'):
+                return index, False
+    marker = 'head' if tag in ('stylesheet', 'preload', 'modulepreload') else 'body'
+    for index, part in enumerate(document):
+        if isinstance(part, Resource) and part.kind == marker:
+            return index, False
+    return None, False
+
+
+def locate(document, edit, tag):
+    """Position d'insertion (indice, après ?) demandée par l'édition, ou None"""
+    if 'after' in edit:
+        return find_anchor(document, edit['after']), True
+    if 'before' in edit:
+        return find_anchor(document, edit['before']), False
+    return default_anchor(document, tag)
+
+
+def tag_for(edit):
+    if edit.get('tag'):
+        return edit['tag']
+    return 'stylesheet' if edit['href'].endswith('.css') else 'script'
+
+
+def apply_edit(page, document, edit):
+    """Applique une édition ; renvoie un message, ou None si la page est déjà à jour"""
+    op, path = edit['op'], edit['href']
+    tag = tag_for(edit)
+    kinds = (tag,) if tag in ('preload', 'modulepreload') else ('stylesheet', 'script')
+
+    if op == 'insert':
+        if find(document, path, kinds):
+            return None
+        index, after = locate(document, edit, tag)
+        if index is None:
+            return f"⚠️  ancre introuvable pour {path}"
+        href = posixpath.relpath(path, posixpath.dirname(page) or '.')
+        attach(document, Resource(tag, path, render_tag(tag, href, edit.get('attrs', {}))), index, after)
+        return f"➕ {path}"
+
+    found = find(document, path, kinds if op != 'remove' else None)
+    if not found:
+        return None if op == 'remove' else f"⚠️  {path} absent de la page"
+
+    if op == 'remove':
+        for index in reversed(found):
+            detach(document, index)
+        return f"➖ {path}"
+
+    if op == 'set':
+        changed = False
+        for index in found:
+            resource = document[index]
+            text = resource.text
+            for name, value in edit.get('attrs', {}).items():
+                text = set_attribute(text, name, value)
+            changed |= text != resource.text
+            resource.text = text
+        return f"🔧 {path} : {', '.join(edit.get('attrs', {}))}" if changed else None
+
+    # move : déjà à sa place si seul du blanc le sépare de l'ancre
+    index, after = locate(document, edit, tag)
+    if index is None:
+        return f"⚠️  ancre introuvable pour {path}"
+    between = index + 1 if after else index - 1
+    if found[0] == (index + 2 if after else index - 2) and not document[between].strip():
+        return None
+    resource = detach(document, found[0])
+    index, after = locate(document, edit, tag)
+    attach(document, resource, index, after)
+    return f"↕️  {path}"
+
+
+def validate_edits(edits):
+    """Vérifie la liste d'éditions avant de toucher aux pages"""
+    for number, edit in enumerate(edits, 1):
+        if edit.get('op') not in OPERATIONS:
+            raise ValueError(f"édition {number} : opération inconnue {edit.get('op')!r}")
+        if not edit.get('href'):
+            raise ValueError(f"édition {number} : 'href' manquant")
+        if edit.get('tag') and edit['tag'] not in TAGS:
+            raise ValueError(f"édition {number} : balise inconnue {edit['tag']!r}")
+        if edit['op'] == 'move' and not ('after' in edit or 'before' in edit):
+            raise ValueError(f"édition {number} : 'move' demande 'after' ou 'before'")
+
+
+def rewrite_page(job):
+    """Applique toutes les éditions à une page en un seul passage
+
+    Renvoie (nouveau contenu ou None, messages, erreur).
+    """
+    root, page, edits = job
+    try:
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError as e:
+        return None, [], str(e)
+
+    document = parse_document(page, content)
+    messages = []
+    for edit in edits:
+        if 'pages' in edit and not any(fnmatch.fnmatch(page, pattern) for pattern in edit['pages']):
+            continue
+        message = apply_edit(page, document, edit)
+        if message:
+            messages.append(message)
+
+    rewritten = serialize_document(document)
+    return (rewritten if rewritten != content else None), messages, None
+
+
+def rewrite_pages(root=SITE_ROOT, patterns=MAIN_PAGES, edits=(), dry_run=False, workers=None):
+    """Applique les éditions à toutes les pages ; rien n'est écrit si une page échoue"""
+
+    validate_edits(edits)
+    pages = expand_pages(root, patterns)
+    results = parallel_map(rewrite_page, [(root, page, list(edits)) for page in pages],
+                           workers=workers)
+
+    rewrites = {}
+    errors = []
+    for page, (content, messages, error) in zip(pages, results):
+        if error:
+            errors.append((page, error))
+            continue
+        if content is None:
+            print(f"ℹ️  {page} déjà à jour" + (f" ({'; '.join(messages)})" if messages else ''))
+            continue
+        rewrites[page] = content
+        print(f"📝 {page} : {'; '.join(messages)}")
+
+    if errors:
+        for page, error in errors:
+            print(f"❌ {page} : {error}")
+        print("\n❌ Aucune page écrite")
+        return {}
+
+    if dry_run:
+        for page, content in rewrites.items():
+            with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+                original = f.read()
+            sys.stdout.writelines(difflib.unified_diff(
+                original.splitlines(keepends=True), content.splitlines(keepends=True),
+                fromfile=f'a/{page}', tofile=f'b/{page}'))
+        print(f"\nℹ️  Mode simulation : {len(rewrites)} pages à réécrire, aucun fichier écrit")
+        return rewrites
+
+    # Toutes les pages sont préparées avant le premier rename
+    staged = []
+    try:
+        for page, content in rewrites.items():
+            file_path = os.path.join(root, page)
+            staged.append((write_atomically(file_path, content), file_path))
+    except OSError:
+        for tmp_path, _ in staged:
+            os.remove(tmp_path)
+        raise
+    for tmp_path, file_path in staged:
+        os.replace(tmp_path, file_path)
+
+    print(f"\n✅ {len(rewrites)} pages réécrites sur {len(pages)}")
+    return rewrites
+
+
+def load_edits(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        edits = json.load(f)
+    return edits if isinstance(edits, list) else [edits]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Applique une liste d'éditions CSS/JS aux pages HTML")
+    parser.add_argument('edits', help="fichier JSON contenant la liste des éditions")
+    parser.add_argument('pages', nargs='*', default=MAIN_PAGES,
+                        help="pages ou globs relatifs au site (défaut : pages principales)")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--dry-run', action='store_true',
+                        help="afficher le diff sans rien écrire")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="nombre de processus (défaut : automatique, 1 = séquentiel)")
+    args = parser.parse_args()
+
+    try:
+        rewrite_pages(args.root, args.pages, load_edits(args.edits), args.dry_run, args.workers)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
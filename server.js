@@ -559,6 +559,14 @@ app.get('/index.html', (req, res) => {
 // Route pour la homepage
 app.get('/', async (req, res) => {
   try {
+    // Version précalculée par prerender_pages.py : aucun appel au CMS
+    try {
+      const prerendered = await fs.readFile(path.join(STATIC_DIR, 'index-prerendered.html'), 'utf8');
+      return res.send(prerendered);
+    } catch (err) {
+      // Pas de version précalculée, injection à la volée
+    }
+
     // Lire le template HTML original
     let htmlTemplate = await fs.readFile(path.join(STATIC_DIR, 'index.html'), 'utf8');
     
@@ -0,0 +1,39 @@
+"""
+Tests de optimize_scripts : scripts exécutés après l'analyse et déplacements
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimize_scripts import optimize_scripts, runs_after_parsing
+
+
+def test_listener_with_string_event_name():
+    code = "// init\ndocument.addEventListener('DOMContentLoaded', function() { run(')'); });\n"
+    assert runs_after_parsing(code)
+    assert runs_after_parsing('window.addEventListener("load", () => start());')
+
+
+def test_listener_followed_by_top_level_code():
+    assert not runs_after_parsing("document.addEventListener('DOMContentLoaded', run); run();")
+    assert not runs_after_parsing("document.addEventListener('click', run);")
+
+
+def test_moved_scripts_keep_their_order(tmp_path):
+    os.makedirs(tmp_path / 'js')
+    (tmp_path / 'js' / 'first.js').write_text("new Lib('#a');\n", encoding='utf-8')
+    (tmp_path / 'js' / 'second.js').write_text("new Lib('#b');\n", encoding='utf-8')
+    (tmp_path / 'js' / 'lib.js').write_text("var Lib = function() {};\n", encoding='utf-8')
+    (tmp_path / 'index.html').write_text(
+        '<html>\n<head>\n</head>\n<body>\n'
+        '  <script src="js/first.js"></script>\n'
+        '  <script src="js/second.js"></script>\n'
+        '  <script src="js/lib.js"></script>\n'
+        '</body>\n</html>\n', encoding='utf-8')
+
+    optimize_scripts(str(tmp_path), ['index.html'], preload_fonts=False)
+
+    content = (tmp_path / 'index.html').read_text(encoding='utf-8')
+    assert content.index('js/lib.js') < content.index('js/first.js') < content.index('js/second.js')
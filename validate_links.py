@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Script pour valider les liens et références internes du site
+Vérifie chaque référence de chaque fichier (pages, images, polices, vidéos, ancres)
+contre l'index du graphe des assets, et optionnellement les URL /uploads du CMS
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import urllib.parse
+
+from asset_graph import ANCHOR, SITE_ROOT, get_asset_graph
+
+# Préfixe servi par le proxy /uploads de server.js, absent du disque
+UPLOADS_PREFIX = 'uploads/'
+DEFAULT_CONCURRENCY = 16
+REQUEST_TIMEOUT = 10
+
+
+def target_exists(graph, target):
+    """Le fichier existe, sous son nom brut ou décodé (%20 -> espace)"""
+    return graph.exists(target) or graph.exists(urllib.parse.unquote(target))
+
+
+def anchor_exists(graph, target):
+    page, _, fragment = target.partition('#')
+    names = graph.names.get(page, ())
+    return '#' + fragment in names or '#' + urllib.parse.unquote(fragment) in names
+
+
+def collect_problems(graph):
+    """Un seul passage sur les arêtes du graphe ; chaque cible n'est testée qu'une fois"""
+    checked = {}
+    broken = []
+    anchors = []
+    uploads = {}
+    references = 0
+
+    for source in sorted(graph.edges):
+        for kind, target in graph.edges[source]:
+            references += 1
+            if kind == ANCHOR:
+                page = target.partition('#')[0]
+                # Une page absente est déjà signalée par le lien lui-même
+                if target_exists(graph, page) and not anchor_exists(graph, target):
+                    anchors.append({'source': source, 'target': target})
+                continue
+            if target.startswith(UPLOADS_PREFIX):
+                uploads.setdefault(target, []).append(source)
+                continue
+            if target not in checked:
+                checked[target] = target_exists(graph, target)
+            if not checked[target]:
+                broken.append({'source': source, 'kind': kind, 'target': target})
+
+    return references, len(checked), broken, anchors, uploads
+
+
+async def head_status(url, semaphore):
+    """Code HTTP d'une requête HEAD (None si le serveur ne répond pas)"""
+    parts = urllib.parse.urlsplit(url)
+    https = parts.scheme == 'https'
+    port = parts.port or (443 if https else 80)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+
+    async with semaphore:
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(parts.hostname, port, ssl=https or None), REQUEST_TIMEOUT)
+            writer.write(f'HEAD {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+                         f'Connection: close\r\n\r\n'.encode('ascii'))
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            return int(status_line.split()[1])
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            return None
+        finally:
+            # Délai dépassé ou réponse illisible : la connexion est fermée quand même
+            if writer is not None:
+                writer.close()
+                try:
+                    await asyncio.wait_for(writer.wait_closed(), REQUEST_TIMEOUT)
+                except (OSError, asyncio.TimeoutError):
+                    pass
+
+
+async def check_uploads(base_url, targets, concurrency=DEFAULT_CONCURRENCY):
+    """Teste les URL /uploads en parallèle, avec au plus `concurrency` connexions"""
+    semaphore = asyncio.Semaphore(concurrency)
+    base_url = base_url.rstrip('/')
+    paths = sorted(targets)
+    statuses = await asyncio.gather(*(head_status(f'{base_url}/{urllib.parse.quote(path)}', semaphore)
+                                      for path in paths))
+    return dict(zip(paths, statuses))
+
+
+def validate_links(root=SITE_ROOT, uploads_url=None, concurrency=DEFAULT_CONCURRENCY, graph=None):
+    """Renvoie le rapport de validation (dictionnaire sérialisable en JSON)"""
+
+    if graph is None:
+        graph = get_asset_graph(root)
+    references, targets, broken, anchors, uploads = collect_problems(graph)
+
+    upload_report = []
+    if uploads_url and uploads:
+        statuses = asyncio.run(check_uploads(uploads_url, uploads, concurrency))
+        for path, status in statuses.items():
+            if status is None or status >= 400:
+                upload_report.append({'target': path, 'status': status, 'sources': uploads[path]})
+
+    return {
+        'root': root,
+        'files': len(graph.edges),
+        'references': references,
+        'targets': targets,
+        'broken': broken,
+        'broken_anchors': anchors,
+        'uploads': {
+            'checked': bool(uploads_url),
+            'count': len(uploads),
+            'broken': upload_report,
+        },
+        'ok': not (broken or anchors or upload_report),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Valide les liens et références internes du site")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--uploads', default=None, metavar='URL',
+                        help="serveur à interroger pour les URL /uploads (ex : http://localhost:3001)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="nombre maximal de connexions simultanées pour /uploads")
+    parser.add_argument('--output', default=None,
+                        help="fichier JSON où écrire le rapport (défaut : sortie standard)")
+    args = parser.parse_args()
+
+    report = validate_links(args.root, args.uploads, args.concurrency)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    # Résumé lisible sur stderr : stdout reste du JSON pur
+    status = '✅' if report['ok'] else '❌'
+    print(f"{status} {report['references']} références, {len(report['broken'])} cassées, "
+          f"{len(report['broken_anchors'])} ancres introuvables, "
+          f"{len(report['uploads']['broken'])} uploads en erreur", file=sys.stderr)
+    sys.exit(0 if report['ok'] else 1)
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Mode surveillance : garde le graphe des assets en mémoire et, à chaque modification,
+ne relit que les fichiers touchés puis relance les analyses et étapes de build concernées
+Utilise inotify (Linux) et, à défaut, une scrutation périodique des dates de modification
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from asset_graph import (ANCHOR, SITE_ROOT, build_asset_graph, cache_path_for, load_cache,
+                         parallel_map, save_cache, scan_file, walk_site)
+from compress_assets import brotli, compress_file, is_target
+from crawl_site import DEFAULT_ROOTS, crawl_site
+from minify_assets import find_targets as find_minify_targets, minify_file
+from validate_links import UPLOADS_PREFIX, anchor_exists, target_exists
+
+# Attendre que les écritures cessent pendant ce délai avant de traiter le lot
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_INTERVAL = 1.0
+
+# Fichiers produits par les outils eux-mêmes : suivis dans le graphe, mais ils
+# ne relancent rien (sinon chaque compression déclencherait la suivante)
+GENERATED_SUFFIXES = ('.gz', '.br', '.tmp')
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_STRUCT = struct.Struct('iIII')
+EVENT_BUFFER = 64 * 1024
+
+
+class InotifyWatcher:
+    """Surveillance par inotify, via la libc : aucun parcours du site entre deux événements"""
+
+    def __init__(self, root):
+        self.root = root
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.directories = {}   # descripteur de surveillance -> préfixe du dossier ('css/')
+        self.add_tree('')
+
+    def add_tree(self, prefix):
+        """Surveille un dossier et ses sous-dossiers ; renvoie les fichiers qu'ils contiennent"""
+        files = []
+        stack = [prefix]
+        while stack:
+            prefix = stack.pop()
+            directory = os.path.join(self.root, prefix)
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                continue
+            self.directories[wd] = prefix
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        stack.append(prefix + entry.name + '/')
+                    elif entry.is_file():
+                        files.append(prefix + entry.name)
+        return files
+
+    def wait(self, timeout):
+        """Chemins modifiés pendant `timeout` secondes (None si des événements ont été perdus)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, EVENT_BUFFER)
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_STRUCT.unpack_from(data, offset)
+            offset += EVENT_STRUCT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            prefix = self.directories.get(wd)
+            if prefix is None or not name:
+                continue
+            path = prefix + name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self.add_tree(path + '/'))
+                else:
+                    changed.add(path + '/')   # dossier supprimé : tout son contenu
+            else:
+                changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """Repli portable : compare la date et la taille de chaque fichier à intervalle régulier"""
+
+    def __init__(self, root, entries, interval=DEFAULT_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.state = {path: (entry[0], entry[1]) for path, entry in entries.items()}
+
+    def wait(self, timeout):
+        time.sleep(self.interval if timeout is None else timeout)
+        try:
+            state = snapshot(self.root)
+        except FileNotFoundError:
+            return set()   # fichier supprimé pendant le parcours : réessayer au prochain tour
+        changed = {path for path, stamp in state.items() if self.state.get(path) != stamp}
+        changed.update(set(self.state) - set(state))
+        self.state = state
+        return changed
+
+
+def snapshot(root):
+    """Date de modification et taille de chaque fichier du site"""
+    return {path: (stat.st_mtime_ns, stat.st_size) for path, _, stat in walk_site(root)}
+
+
+def open_watcher(root, entries, polling=False, interval=DEFAULT_INTERVAL):
+    if not polling and hasattr(select, 'select'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError, TypeError):
+            pass   # pas de libc ou pas d'inotify (macOS, Windows...)
+    return PollingWatcher(root, entries, interval)
+
+
+def expand_changes(changes, entries):
+    """Remplace les dossiers supprimés par les fichiers qu'ils contenaient"""
+    paths = set()
+    for path in changes:
+        if path.endswith('/'):
+            paths.update(known for known in entries if known.startswith(path))
+        elif path:
+            paths.add(path)
+    return sorted(paths)
+
+
+def _refresh_job(job):
+    path, file_path, previous = job
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size, scan_file(path, file_path, previous)
+    except FileNotFoundError:
+        return None
+
+
+def refresh_graph(root, graph, entries, paths):
+    """Relit les fichiers modifiés et remplace leurs arêtes dans le graphe
+
+    Renvoie (fichiers dont le contenu a changé, fichiers supprimés). Un simple
+    `touch` met l'index à jour sans compter comme une modification.
+    """
+    jobs = [(path, os.path.join(root, path), entries.get(path)) for path in paths
+            if not os.path.isdir(os.path.join(root, path))]
+    results = parallel_map(_refresh_job, jobs)
+
+    updated, removed = [], []
+    for (path, file_path, previous), result in zip(jobs, results):
+        if result is None:
+            if path in entries:
+                graph.remove_file(path)
+                del entries[path]
+                removed.append(path)
+            continue
+        mtime, size, (digest, refs, names) = result
+        entries[path] = (mtime, size, digest, refs, names)
+        graph.update_file(path, size, digest, refs, names)
+        if previous is None or previous[2] != digest:
+            updated.append(path)
+    return updated, removed
+
+
+def dependent_pages(graph, paths):
+    """Pages qui chargent, directement ou non, l'un des fichiers (arêtes entrantes)
+
+    Un lien vers une page ne rend pas la page qui lie dépendante de son contenu :
+    la remontée s'arrête aux pages.
+    """
+    seen = set(paths)
+    stack = [path for path in paths if not path.endswith('.html')]
+    while stack:
+        for source in graph.incoming.get(stack.pop(), ()):
+            if source not in seen:
+                seen.add(source)
+                if not source.endswith('.html'):
+                    stack.append(source)
+    return sorted(path for path in seen if path.endswith('.html'))
+
+
+def check_links(graph, updated, removed):
+    """Références cassées par le lot : celles des fichiers modifiés et celles vers les supprimés"""
+    problems = []
+    for source in updated:
+        for kind, target in graph.edges.get(source, ()):
+            if kind == ANCHOR:
+                if target_exists(graph, target.partition('#')[0]) and not anchor_exists(graph, target):
+                    problems.append((source, target))
+            elif not target.startswith(UPLOADS_PREFIX) and not target_exists(graph, target):
+                problems.append((source, target))
+
+    # Une page modifiée a pu perdre les ids visés par les ancres des autres pages
+    pages = {path for path in updated if path.endswith('.html')}
+    if pages:
+        for target, sources in graph.incoming.items():
+            if '#' in target and target.partition('#')[0] in pages and not anchor_exists(graph, target):
+                problems.extend((source, target) for source in sorted(sources) if source not in pages)
+
+    for target in removed:
+        problems.extend((source, target) for source in graph.referrers(target))
+    return problems
+
+
+class SiteWatcher:
+    """État conservé entre deux lots : graphe, index, fichiers atteignables"""
+
+    def __init__(self, root, roots=DEFAULT_ROOTS, minify=False, compress=False,
+                 use_brotli=True, reports=False):
+        self.root = root
+        self.roots = roots
+        self.minify = minify
+        self.compress = compress
+        self.use_brotli = use_brotli and brotli is not None
+        self.reports = reports
+
+        start = time.perf_counter()
+        self.graph = build_asset_graph(root)
+        self.entries = load_cache(cache_path_for(root))
+        self.compressed = load_cache(cache_path_for(root, 'compress')) if compress else {}
+        self.reachable = set(crawl_site(self.graph, roots).depth)
+        print(f"📁 {len(self.graph.sizes)} fichiers indexés en "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def process(self, changes):
+        start = time.perf_counter()
+        updated, removed = refresh_graph(self.root, self.graph, self.entries,
+                                         expand_changes(changes, self.entries))
+        updated = [path for path in updated if not path.endswith(GENERATED_SUFFIXES)]
+        removed = [path for path in removed if not path.endswith(GENERATED_SUFFIXES)]
+        if not updated and not removed:
+            return
+
+        print(f"\n🔄 {time.strftime('%H:%M:%S')} - {len(updated)} modifié(s), {len(removed)} supprimé(s) :")
+        for path in updated:
+            print(f"   ✏️  {path}")
+        for path in removed:
+            print(f"   🗑️  {path}")
+
+        pages = dependent_pages(self.graph, updated + removed)
+        if pages:
+            print(f"   📄 Pages concernées : {len(pages)}")
+
+        problems = check_links(self.graph, updated, removed)
+        for source, target in problems:
+            print(f"   ❌ {source} -> {target} introuvable")
+
+        self.report_reachability()
+        if self.minify:
+            self.minify_changed(updated)
+        if self.compress:
+            self.compress_changed(updated, removed)
+        if self.reports and any(path.endswith(('.html', '.css', '.js')) for path in updated + removed):
+            self.run_reports()
+
+        print(f"⏱️  Traité en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def report_reachability(self):
+        """Fichiers devenus orphelins ou à nouveau atteignables depuis les racines"""
+        reachable = set(crawl_site(self.graph, self.roots).depth)
+        for path in sorted(self.reachable - reachable):
+            if self.graph.exists(path):
+                print(f"   ⚠️  {path} n'est plus atteignable depuis {', '.join(self.roots)}")
+        for path in sorted(reachable - self.reachable):
+            print(f"   ✅ {path} est atteignable")
+        self.reachable = reachable
+
+    def minify_changed(self, updated):
+        targets = set(find_minify_targets(self.root))
+        for path in updated:
+            if path not in targets:
+                continue
+            output_path, before, after, error = minify_file((self.root, path, False))
+            if error:
+                print(f"   ⚠️  {path} : {error}")
+            else:
+                print(f"   🗜️  {output_path} : {before/1024:.1f} KB -> {after/1024:.1f} KB")
+
+    def compress_changed(self, updated, removed):
+        for path in updated:
+            if not is_target(path):
+                continue
+            digest, sizes, changed = compress_file((self.root, path, self.compressed.get(path),
+                                                    self.use_brotli))
+            self.compressed[path] = (digest, sizes)
+            if changed:
+                print(f"   📦 {path} : gzip {(sizes.get('.gz') or 0)/1024:.1f} KB")
+        for path in removed:
+            self.compressed.pop(path, None)
+            for extension in GENERATED_SUFFIXES[:2]:
+                if os.path.exists(os.path.join(self.root, path + extension)):
+                    os.remove(os.path.join(self.root, path + extension))
+
+    def run_reports(self):
+        # Import différé : les analyseurs ne sont chargés que s'ils sont demandés
+        from analyze_unused_css import analyze_unused_css
+        from analyze_unused_html import analyze_unused_html
+        from analyze_unused_js import analyze_unused_js
+
+        print()
+        analyze_unused_css(self.graph)
+        analyze_unused_js(self.graph)
+        analyze_unused_html(self.graph, self.roots)
+
+    def save(self):
+        save_cache(cache_path_for(self.root), self.entries)
+        if self.compress:
+            save_cache(cache_path_for(self.root, 'compress'), self.compressed)
+
+
+def watch_site(root=SITE_ROOT, roots=DEFAULT_ROOTS, debounce=DEFAULT_DEBOUNCE, polling=False,
+               interval=DEFAULT_INTERVAL, **options):
+    """Boucle de surveillance : un lot de modifications est traité quand le site se calme"""
+
+    site = SiteWatcher(root, roots, **options)
+    watcher = open_watcher(root, site.entries, polling, interval)
+    mode = 'inotify' if isinstance(watcher, InotifyWatcher) else f'scrutation toutes les {interval:g} s'
+    print(f"👀 Surveillance de {root} ({mode}), Ctrl+C pour arrêter")
+
+    try:
+        while True:
+            changes = watcher.wait(None)
+            if changes is not None and not changes:
+                continue
+            while changes is not None:
+                more = watcher.wait(debounce)
+                if more is None:
+                    # Débordement pendant l'attente : le lot en cours est incomplet
+                    changes = None
+                    break
+                if not more:
+                    break
+                changes |= more
+            if changes is None:
+                # File d'événements saturée : comparer tout le site à l'index
+                state = snapshot(root)
+                changes = {path for path, stamp in state.items()
+                           if (site.entries.get(path) or (None, None))[:2] != stamp}
+                changes.update(set(site.entries) - set(state))
+            site.process(changes)
+    except KeyboardInterrupt:
+        print("\n👋 Arrêt de la surveillance")
+    finally:
+        site.save()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relance les analyses et le build à chaque modification")
+    parser.add_argument('roots', nargs='*', default=DEFAULT_ROOTS,
+                        help="fichiers de départ du parcours d'accessibilité")
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help="secondes de calme avant de traiter un lot de modifications")
+    parser.add_argument('--polling', action='store_true',
+                        help="scruter les dates de modification au lieu d'utiliser inotify")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help="intervalle de scrutation en secondes (avec --polling ou sans inotify)")
+    parser.add_argument('--minify', action='store_true',
+                        help="regénérer les *.min.css / *.min.js des fichiers modifiés")
+    parser.add_argument('--compress', action='store_true',
+                        help="regénérer les .gz / .br des fichiers modifiés")
+    parser.add_argument('--no-brotli', action='store_true')
+    parser.add_argument('--reports', action='store_true',
+                        help="relancer les analyses CSS/JS/HTML inutilisés après chaque lot")
+    args = parser.parse_args()
+
+    watch_site(args.root, args.roots, args.debounce, args.polling, args.interval,
+               minify=args.minify, compress=args.compress, use_brotli=not args.no_brotli,
+               reports=args.reports)